@@ -0,0 +1,160 @@
+# ====================================================
+# ADMISSION CONTROL (ASYNC SERVER)
+# ====================================================
+# Bounds the requests an event loop works on at once.
+# Up to max_in_flight requests run; up to max_queue
+# more wait (first come, first served) for a slot, for
+# at most queue_timeout seconds. Anything beyond that
+# is turned away at once with a Retry-After estimate,
+# so latency stays bounded when traffic spikes instead
+# of every request slowing down together.
+#
+# All methods run on the event loop thread, so no
+# locks are needed.
+# ====================================================
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class Overloaded(RuntimeError):
+    """Raised when a request is shed
+
+    reason: 'queue_full' (turned away on arrival, 429) or 'queue_timeout'
+    (waited queue_timeout seconds without getting a slot, 503).
+    retry_after: whole seconds the client should wait before retrying.
+    """
+
+    STATUS = {'queue_full': 429, 'queue_timeout': 503}
+
+    def __init__(self, reason, retry_after=1):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def status(self):
+        return self.STATUS.get(self.reason, 503)
+
+
+class AdmissionControl:
+    """In-flight limit with a bounded, time-limited wait queue
+
+    max_in_flight: requests processed at once.
+    max_queue: requests allowed to wait for a slot (0 = none).
+    queue_timeout: seconds a request may wait before it is shed.
+    """
+
+    def __init__(self, max_in_flight=8, max_queue=32, queue_timeout=1.0, smoothing=0.2):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = max(0.0, queue_timeout)
+        self.smoothing = smoothing
+
+        self.in_flight = 0
+        self._waiters = deque()
+
+        # Metrics
+        self.admitted = 0
+        self.shed = {'queue_full': 0, 'queue_timeout': 0}
+        self.service_seconds = None  # moving average of time spent holding a slot
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def retry_after(self):
+        """Seconds until the current backlog has likely drained (at least 1)"""
+        if self.service_seconds is None:
+            return 1
+        backlog = (len(self._waiters) + self.in_flight) / self.max_in_flight
+        return max(1, math.ceil(backlog * self.service_seconds))
+
+    def _shed(self, reason):
+        self.shed[reason] += 1
+        return Overloaded(reason, self.retry_after())
+
+    async def acquire(self):
+        """
+        Take a slot, waiting in the queue if needed
+        Returns: seconds spent waiting
+        Raises Overloaded when the queue is full or the wait times out.
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed('queue_full')
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(self.queue_timeout, self._expire, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The client went away; a slot handed over meanwhile goes to the
+            # next waiter (a waiter already shed never held one)
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        finally:
+            timer.cancel()
+        self.admitted += 1
+        return time.perf_counter() - started
+
+    def _expire(self, waiter):
+        if not waiter.done():
+            self._discard(waiter)
+            waiter.set_exception(self._shed('queue_timeout'))
+
+    def _discard(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        """Give the slot back, handing it straight to the oldest waiter"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # in_flight is unchanged: the slot changes hands
+                return
+        self.in_flight -= 1
+
+    def observe(self, seconds):
+        if self.service_seconds is None:
+            self.service_seconds = seconds
+        else:
+            self.service_seconds += self.smoothing * (seconds - self.service_seconds)
+
+    @asynccontextmanager
+    async def slot(self):
+        """async with admission.slot() as waited: ... (raises Overloaded)"""
+        waited = await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.observe(time.perf_counter() - started)
+            self.release()
+
+    def stats(self):
+        return {
+            'max_in_flight': self.max_in_flight,
+            'max_queue': self.max_queue,
+            'queue_timeout_ms': round(self.queue_timeout * 1000, 1),
+            'in_flight': self.in_flight,
+            'queue_depth': len(self._waiters),
+            'admitted': self.admitted,
+            'shed': dict(self.shed),
+            'service_ms': round(self.service_seconds * 1000, 2) if self.service_seconds is not None else None,
+        }
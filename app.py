@@ -9,29 +9,185 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import re
 import os
+import gc
+import atexit
+import threading
+import signal
+import time
 import warnings
+import hashlib
+from collections import namedtuple
+import importlib.util
+from urllib.parse import urlparse
+from phrase_matcher import PhraseMatcher
+from domain_index import DomainIndex, iter_domain_file
+from text_features import TextFeatures
+from micro_batcher import MicroBatcher, QueueFullError
+from stage_timing import StageClock
+from long_document import select_windows, softmax, aggregate_window_scores, AGGREGATIONS
+from metrics import Registry, CONTENT_TYPE as METRICS_CONTENT_TYPE, SIZE_BUCKETS
+from result_cache import ResultCache, content_key
+from verdict_store import VerdictStore
+from article_fetcher import ArticleFetcher, FetchError
+from rule_pack import RulePack, FileWatcher, SECTIONS as RULE_PACK_SECTIONS
+from model_registry import ModelRegistry
+from thread_budget import thread_budget, apply_env_budget, apply_torch_budget
+from sentiment import SentimentEngine
+from deadline import Deadline, StageCosts, parse_budget
+from response_format import (parse_fields, result_parts, select_fields, negotiate_encoding, compress,
+                             dumps as dump_json, orjson, RESULT_PARTS)
 warnings.filterwarnings('ignore')
 
-# ML and NLP imports
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-    import torch
-    from textstat import flesch_reading_ease, flesch_kincaid_grade
-    import nltk
-    from nltk.sentiment import SentimentIntensityAnalyzer
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize, sent_tokenize
-    import requests
-    from urllib.parse import urlparse
-    ML_AVAILABLE = True
-except ImportError as e:
+# ML and NLP imports are deferred: nothing heavy is imported until the ML
+# path is first used, and never in rule-only mode (RULE_ONLY=1)
+RULE_ONLY = os.environ.get("RULE_ONLY", "0") == "1"
+ML_BACKEND = os.environ.get("ML_BACKEND", "torch").lower()
+
+# Per-worker CPU thread budget for torch, ONNX Runtime, tokenizers and BLAS;
+# the environment part has to be in place before those libraries load
+ML_THREADS = thread_budget()
+apply_env_budget(ML_THREADS)
+
+def rebudget_threads():
+    """
+    Recompute the budget from the environment and resize torch's pool, for
+    a worker forked after the app was imported in the master (PRELOAD_MODELS)
+    Native pools read their variables at import, so those keep the master's
+    budget: give the worker count as WEB_CONCURRENCY rather than -w there.
+    """
+    global ML_THREADS
+    ML_THREADS = thread_budget()
+    if torch is not None:
+        apply_torch_budget(torch, ML_THREADS)
+    return ML_THREADS
+
+# Readability: the built-in single-pass engine (readability.py) or textstat
+READABILITY_ENGINE = os.environ.get("READABILITY_ENGINE", "builtin").lower()
+# Sentiment: VADER rules over a precompiled lexicon (sentiment.py) or nltk's analyzer
+SENTIMENT_ENGINE = os.environ.get("SENTIMENT_ENGINE", "builtin").lower()
+
+NLP_LIBRARIES = ('nltk', 'transformers') + (('textstat',) if READABILITY_ENGINE == 'textstat' else ())
+BACKEND_LIBRARIES = {'torch': ('torch',), 'onnx': ('onnxruntime',)}
+
+def _libraries_installed():
+    """Check the ML libraries can be found without importing them"""
+    required = NLP_LIBRARIES + BACKEND_LIBRARIES.get(ML_BACKEND, ('torch',))
+    missing = [name for name in required if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"Warning: Some ML libraries not available: {', '.join(missing)}")
+        print("Falling back to rule-based detection only")
+    return not missing
+
+if RULE_ONLY:
+    print("Rule-only mode: ML libraries will not be loaded")
+    ML_AVAILABLE = False
+else:
+    ML_AVAILABLE = _libraries_installed()
+
+# Bound by load_nlp_libraries() / load_torch_libraries() on first use
+pipeline = AutoTokenizer = AutoModelForSequenceClassification = torch = None
+readability_scores = None
+nltk = SentimentIntensityAnalyzer = stopwords = word_tokenize = sent_tokenize = None
+
+_library_lock = threading.Lock()
+
+def _import_failed(e):
+    global ML_AVAILABLE
     print(f"Warning: Some ML libraries not available: {e}")
     print("Falling back to rule-based detection only")
     ML_AVAILABLE = False
+    return False
+
+def load_nlp_libraries():
+    """Import NLTK and the readability engine on first use"""
+    global readability_scores
+    global nltk, SentimentIntensityAnalyzer, stopwords, word_tokenize, sent_tokenize
+    
+    if sent_tokenize is not None:
+        return True
+    if not ML_AVAILABLE:
+        return False
+    
+    with _library_lock:
+        if sent_tokenize is not None:
+            return True
+        try:
+            if READABILITY_ENGINE == 'textstat':
+                from textstat import flesch_reading_ease as _fre, flesch_kincaid_grade as _fkg
+                _readability = lambda text: (_fre(text), _fkg(text))
+            else:
+                from readability import readability_scores as _readability
+            import nltk as _nltk
+            from nltk.sentiment import SentimentIntensityAnalyzer as _sia
+            from nltk.corpus import stopwords as _stopwords
+            from nltk.tokenize import word_tokenize as _word_tokenize, sent_tokenize as _sent_tokenize
+        except ImportError as e:
+            return _import_failed(e)
+        
+        readability_scores = _readability
+        nltk, SentimentIntensityAnalyzer, stopwords = _nltk, _sia, _stopwords
+        word_tokenize = _word_tokenize
+        sent_tokenize = _sent_tokenize  # Set last: marks the group as loaded
+        return True
+
+def load_torch_libraries():
+    """Import transformers and torch on first use of the PyTorch backend"""
+    global pipeline, AutoTokenizer, AutoModelForSequenceClassification, torch
+    
+    if pipeline is not None:
+        return True
+    if not ML_AVAILABLE:
+        return False
+    
+    with _library_lock:
+        if pipeline is not None:
+            return True
+        try:
+            import torch as _torch
+            from transformers import (pipeline as _pipeline, AutoTokenizer as _tokenizer,
+                                      AutoModelForSequenceClassification as _model)
+        except ImportError as e:
+            print(f"Warning: PyTorch backend not available: {e}")
+            return False
+        
+        apply_torch_budget(_torch, ML_THREADS)
+        torch, AutoTokenizer, AutoModelForSequenceClassification = _torch, _tokenizer, _model
+        pipeline = _pipeline
+        return True
 
 app = Flask(__name__)
 CORS(app)
 
+# ====================================================
+# METRICS
+# ====================================================
+
+METRICS = Registry()
+REQUESTS_BY_VERDICT = METRICS.counter(
+    'fakenews_detections_total', 'Detections by verdict and whether served from cache',
+    ['verdict', 'cached'])
+DETECTION_SECONDS = METRICS.histogram(
+    'fakenews_detection_duration_seconds', 'End-to-end detect_fake_news latency')
+STAGE_SECONDS = METRICS.histogram(
+    'fakenews_stage_duration_seconds', 'Time spent in each pipeline stage', ['stage'])
+INPUT_CHARS = METRICS.histogram(
+    'fakenews_input_chars', 'Size of submitted texts in characters', buckets=SIZE_BUCKETS)
+MODEL_LOAD_SECONDS = METRICS.gauge(
+    'fakenews_model_load_seconds', 'Time taken by the last successful model load')
+CASCADE_SKIPPED = METRICS.counter(
+    'fakenews_cascade_skipped_total', 'Stages skipped by the cascade because the verdict was settled',
+    ['stage'])
+RESPONSE_BYTES = METRICS.histogram(
+    'fakenews_response_bytes', 'Size of prediction responses on the wire', ['encoding'], buckets=SIZE_BUCKETS)
+BUDGETED_REQUESTS = METRICS.counter(
+    'fakenews_budgeted_detections_total', 'Uncached detections run with a latency budget')
+DEGRADED = METRICS.counter(
+    'fakenews_degraded_total', 'Stages skipped because they would have overrun the latency budget', ['stage'])
+RULE_PACK_LOADS = METRICS.counter(
+    'fakenews_rule_pack_loads_total', 'Rule pack loads and reloads by outcome', ['outcome'])
+FETCHES = METRICS.counter(
+    'fakenews_article_fetches_total', 'Article fetches for URL-only requests by outcome', ['outcome'])
+
 # ====================================================
 # GLOBAL VARIABLES AND MODEL LOADING
 # ====================================================
@@ -42,12 +198,48 @@ tokenizer = None
 sentiment_analyzer = None
 fake_news_classifier = None
 
+# Batch inference settings
+ML_MAX_LENGTH = 512  # Model's max length in tokens
+ML_BATCH_SIZE = int(os.environ.get("ML_BATCH_SIZE", 16))
+MAX_BATCH_ITEMS = int(os.environ.get("MAX_BATCH_ITEMS", 256))
+
+# Long-document mode: score overlapping 512-token windows instead of truncating
+ML_LONG_DOCUMENTS = os.environ.get("ML_LONG_DOCUMENTS", "0") == "1"
+ML_WINDOW_OVERLAP = int(os.environ.get("ML_WINDOW_OVERLAP", 128))  # Tokens shared by neighbouring windows
+ML_MAX_WINDOWS = int(os.environ.get("ML_MAX_WINDOWS", 8))  # Bounds worst-case latency
+ML_WINDOW_AGGREGATION = os.environ.get("ML_WINDOW_AGGREGATION", "max").lower()
+ML_LONG_DOC_MAX_CHARS = int(os.environ.get("ML_LONG_DOC_MAX_CHARS", 200000))  # Bounds tokenizer work
+if ML_WINDOW_AGGREGATION not in AGGREGATIONS:
+    raise ValueError(f"ML_WINDOW_AGGREGATION must be one of {', '.join(AGGREGATIONS)}")
+
+# Micro-batching of concurrent single-item requests
+ML_MICRO_BATCHING = os.environ.get("ML_MICRO_BATCHING", "0") == "1"
+ML_BATCH_WAIT_MS = float(os.environ.get("ML_BATCH_WAIT_MS", 5))
+ML_QUEUE_MAX_DEPTH = int(os.environ.get("ML_QUEUE_MAX_DEPTH", 1000))
+
+# Transformer model used for fake news detection
+MODEL_NAME = "DavideRatti/fake_news_detector"
+
+# Inference backend (ML_BACKEND): 'torch' (transformers pipeline) or 'onnx' (int8 ONNX Runtime)
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", "onnx_model")
+ml_backend_in_use = None
+
+MODEL_REGISTRY = ModelRegistry()
+
 def initialize_models():
-    """Initialize ML models on first use"""
-    global ml_model, tokenizer, sentiment_analyzer, fake_news_classifier
-    
-    if not ML_AVAILABLE:
+    """
+    Initialize ML models on first use
+    Safe to call from many threads at once: models are loaded once per
+    process and later calls return the outcome of that load.
+    """
+    if not ML_AVAILABLE or not load_nlp_libraries():
         return False
+    return MODEL_REGISTRY.load('models', _load_models)
+
+def _load_models():
+    global ml_model, tokenizer, sentiment_analyzer, fake_news_classifier, ml_backend_in_use
+    
+    load_started = time.perf_counter()
     
     try:
         # Download NLTK data if not present
@@ -67,14 +259,34 @@ def initialize_models():
             nltk.download('stopwords', quiet=True)
         
         # Initialize sentiment analyzer
-        sentiment_analyzer = SentimentIntensityAnalyzer()
+        if SENTIMENT_ENGINE == 'vader':
+            sentiment_analyzer = SentimentIntensityAnalyzer()
+        else:
+            sentiment_analyzer = SentimentEngine.from_nltk()
         
         # Load transformer model for fake news detection
         # Using distilBERT trained on fake news or general NLU
         # IMPROVED: Using better model that's actually trained for fake news detection
-        model_name = "DavideRatti/fake_news_detector"  # Specifically trained for fake news
+        model_name = MODEL_NAME  # Specifically trained for fake news
         print("Loading ML model... This may take a moment on first run.")
         
+        if ML_BACKEND == 'onnx':
+            try:
+                from onnx_backend import load_classifier
+                fake_news_classifier = load_classifier(ONNX_MODEL_DIR, num_threads=ML_THREADS)
+                tokenizer = fake_news_classifier.tokenizer
+                ml_backend_in_use = 'onnx'
+                MODEL_LOAD_SECONDS.set(time.perf_counter() - load_started)
+                print("✓ ML models loaded successfully (ONNX Runtime, int8)")
+                return True
+            except Exception as e:
+                print(f"Warning: Could not load ONNX model: {e}")
+                print("Falling back to PyTorch backend")
+        
+        if not load_torch_libraries():
+            print("Falling back to rule-based detection")
+            return False
+        
         try:
             # Try to load the improved fake news detection model
             tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -87,6 +299,8 @@ def initialize_models():
                 tokenizer=tokenizer,
                 device=-1  # Use CPU (-1) or GPU (0) if available
             )
+            ml_backend_in_use = 'torch'
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - load_started)
             print("✓ ML models loaded successfully")
             return True
         except Exception as e:
@@ -98,6 +312,57 @@ def initialize_models():
         print(f"Error initializing models: {e}")
         return False
 
+# ====================================================
+# PRELOAD AND WARM-UP
+# ====================================================
+
+# Load models at import time (in the gunicorn master when preload_app is on)
+PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "0") == "1"
+
+WARM_UP_TEXT = ("The city council approved a new environmental protection law yesterday. "
+                "Environmental groups praised the decision.")
+
+models_ready = threading.Event()
+_warm_up_lock = threading.Lock()
+
+def preload_models():
+    """
+    Load tokenizer, model and VADER lexicon before workers fork
+    Objects loaded here are moved out of the garbage collector's reach so
+    forked workers keep sharing their pages copy-on-write.
+    """
+    loaded = initialize_models()
+    gc.collect()
+    gc.freeze()
+    return loaded
+
+def warm_up_models():
+    """
+    Run one inference so the first real request is not the slow one, and
+    warm-load stored verdicts into the result cache
+    """
+    with _warm_up_lock:
+        if models_ready.is_set():
+            return True
+        try:
+            if ML_AVAILABLE and sentiment_analyzer is None:
+                initialize_models()
+            # After the models load, so the store's entries match the version in use
+            warm_load_verdicts()
+            analyze_sentiment(WARM_UP_TEXT)
+            ml_classify_text(WARM_UP_TEXT)
+            _run_detection(WARM_UP_TEXT, None, _ML_NOT_RUN)
+        except Exception as e:
+            print(f"Warning: warm-up inference failed: {e}")
+        models_ready.set()
+        return True
+
+def start_warm_up():
+    """Warm up in the background; /ready reports 503 until it finishes"""
+    thread = threading.Thread(target=warm_up_models, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
+
 # ====================================================
 # EXPANDED KEYWORD DATABASE
 # ====================================================
@@ -138,6 +403,18 @@ FAKE_NEWS_KEYWORDS = [
     'incredible discovery', 'stunning revelation', 'disgusting truth'
 ]
 
+# Phrases that mark a claim as fact-checkable
+FACT_CHECKABLE_PHRASES = [
+    'study shows', 'research proves', 'scientists say',
+    'according to', 'official data', 'statistics show'
+]
+
+# Known fake news narratives (simplified similarity check)
+KNOWN_FAKE_PATTERNS = [
+    'covid vaccine causes', '5g causes', 'flat earth',
+    'moon landing fake', 'chemtrails', 'illuminati controls'
+]
+
 # Trusted news sources (expanded list)
 TRUSTED_SOURCES = [
     # Major international news outlets
@@ -171,20 +448,87 @@ UNTRUSTED_SOURCES = [
     'conspiracy-theory.com', 'satire-news.com'
 ]
 
+# Large reputation lists can be loaded from files (one domain per line)
+if os.environ.get("TRUSTED_SOURCES_FILE"):
+    TRUSTED_SOURCES.extend(iter_domain_file(os.environ["TRUSTED_SOURCES_FILE"]))
+if os.environ.get("UNTRUSTED_SOURCES_FILE"):
+    UNTRUSTED_SOURCES.extend(iter_domain_file(os.environ["UNTRUSTED_SOURCES_FILE"]))
+
+# Words that make an unknown domain look suspicious
+SUSPICIOUS_DOMAIN_PATTERNS = ['free', 'click', 'win', 'prize', 'lottery']
+
 # ====================================================
 # HELPER FUNCTIONS - KEYWORD DETECTION
 # ====================================================
 
-def check_suspicious_keywords(text):
+def _rule_lists():
+    return (FAKE_NEWS_KEYWORDS, KNOWN_FAKE_PATTERNS, FACT_CHECKABLE_PHRASES,
+            TRUSTED_SOURCES, UNTRUSTED_SOURCES, SUSPICIOUS_DOMAIN_PATTERNS)
+
+def build_rule_matcher(keywords, known_fake, fact_checkable):
+    """Compile the phrase lists into one automaton"""
+    return (
+        PhraseMatcher()
+        .add_all(keywords, 'keyword')
+        .add_all(known_fake, 'known_fake')
+        .add_all(fact_checkable, 'fact_checkable')
+        .build()
+    )
+
+# One immutable snapshot of the active rules: the lists, the structures
+# built from them and their content digest (the rules part of the cache
+# version). It is built only when the rules change (at import, by
+# bump_rules, or on a rule pack swap), so a request just reads the
+# reference: once (current_rules), handing the same object to every stage
+# and to its cache key, so a reload never mixes old and new rules.
+Rules = namedtuple('Rules', 'digest lists matcher trusted untrusted suspicious_domains pack')
+
+_rules_lock = threading.Lock()
+
+def build_rules(lists):
+    """Rules over a copy of the given lists (in _rule_lists order)"""
+    lists = tuple(tuple(l) for l in lists)
+    digest = hashlib.sha256(repr(lists).encode('utf-8')).hexdigest()[:16]
+    return Rules(digest, lists, build_rule_matcher(*lists[:3]),
+                 DomainIndex(lists[3]), DomainIndex(lists[4]), lists[5], None)
+
+_active_rules = build_rules(_rule_lists())
+
+def current_rules():
+    """The active Rules: the rule pack's when one is loaded, else the built-in lists'"""
+    return _active_rules
+
+def bump_rules():
+    """
+    Rebuild the Rules after a change to the built-in lists (call after
+    editing them); a loaded rule pack stays active
+    Returns: the active Rules
+    """
+    global _active_rules
+    rules = build_rules(_rule_lists())
+    with _rules_lock:
+        if _active_rules.pack is None:
+            _active_rules = rules
+        return _active_rules
+
+def scan_rule_phrases(text, rules=None):
+    """Scan text once for every rule phrase, grouped by category"""
+    return (rules or current_rules()).matcher.scan(text.lower())
+
+def get_text_features(text, rules=None):
+    """Build the shared per-request view of the text (rules: the request's Rules)"""
+    return TextFeatures(
+        text,
+        sentence_splitter=sent_tokenize if ML_AVAILABLE and load_nlp_libraries() else None,
+        matcher=(rules or current_rules()).matcher
+    )
+
+def check_suspicious_keywords(text, features=None):
     """Check if text contains suspicious keywords"""
-    text_lower = text.lower()
-    matched = []
-    count = 0
+    features = features or get_text_features(text)
     
-    for keyword in FAKE_NEWS_KEYWORDS:
-        if keyword in text_lower:
-            count += 1
-            matched.append(keyword)
+    matched = list(features.phrase_hits['keyword'])
+    count = len(matched)
     
     return count, matched
 
@@ -192,22 +536,33 @@ def check_suspicious_keywords(text):
 # ADVANCED NLP ANALYSIS
 # ====================================================
 
-def analyze_sentiment(text):
+def analyze_sentiment(text, features=None):
     """Analyze sentiment of the text"""
     if not ML_AVAILABLE or sentiment_analyzer is None:
         return {'compound': 0.0, 'pos': 0.0, 'neu': 0.0, 'neg': 0.0}
     
     try:
+        if isinstance(sentiment_analyzer, SentimentEngine):
+            # Reuses the request's whitespace tokens
+            return sentiment_analyzer.polarity_scores(text, features.tokens if features is not None else None)
         scores = sentiment_analyzer.polarity_scores(text)
         return scores
     except:
         return {'compound': 0.0, 'pos': 0.0, 'neu': 0.0, 'neg': 0.0}
 
+def analyze_sentiment_many(texts, features_list):
+    """Sentiment of a list of texts (one engine call for the batch and bulk paths)"""
+    if isinstance(sentiment_analyzer, SentimentEngine):
+        try:
+            return sentiment_analyzer.polarity_scores_many(texts, [f.tokens for f in features_list])
+        except Exception as e:
+            print(f"Batch sentiment failed, scoring texts one by one: {e}")
+    return [analyze_sentiment(text, features) for text, features in zip(texts, features_list)]
+
 def analyze_readability(text):
     """Analyze readability and writing quality"""
     try:
-        flesch_score = flesch_reading_ease(text)
-        fk_grade = flesch_kincaid_grade(text)
+        flesch_score, fk_grade = readability_scores(text)
         
         # IMPROVED: Only penalize EXTREMELY poor writing (not normal professional writing)
         # Professional/academic writing (score 30-60) is normal and legitimate
@@ -230,20 +585,21 @@ def analyze_readability(text):
     except:
         return {'flesch_score': 50, 'fk_grade': 10, 'suspicion_score': 0}
 
-def analyze_linguistic_patterns(text):
+def analyze_linguistic_patterns(text, features=None):
     """Analyze linguistic patterns that indicate fake news"""
+    features = features or get_text_features(text)
     score = 0
     details = []
     
     # Excessive capitalization
-    caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+    caps_ratio = features.upper_count / len(text) if text else 0
     if caps_ratio > 0.3:
         score += 25  # Increased from 20
         details.append("Excessive capitalization detected")
     
     # Excessive punctuation
-    exclamation_count = text.count('!')
-    question_count = text.count('?')
+    exclamation_count = features.exclamation_count
+    question_count = features.question_count
     if exclamation_count > 3:
         score += 20  # Increased from 15
         details.append(f"Excessive exclamation marks ({exclamation_count})")
@@ -252,28 +608,24 @@ def analyze_linguistic_patterns(text):
         details.append(f"Excessive question marks ({question_count})")
     
     # Text length analysis
-    word_count = len(text.split())
-    sentence_count = len(sent_tokenize(text)) if ML_AVAILABLE else text.count('.') + 1
+    word_count = features.word_count
     
     if word_count < 10:
         score += 15
         details.append("Text too short for reliable analysis")
-    elif word_count < 50 and sentence_count < 3:
+    elif word_count < 50 and features.sentence_count < 3:  # Sentences only split when needed
         score += 10
         details.append("Insufficient content depth")
     
     # Punctuation quality
-    if text.count('.') < word_count / 20 and word_count > 20:
+    if features.period_count < word_count / 20 and word_count > 20:
         score += 10
         details.append("Poor punctuation structure")
     
     # Check for repeated words/phrases (spam indicator) - IMPROVED
-    words = text.lower().split()
+    words = features.words_lower
     if len(words) > 0:
-        word_freq = {}
-        for word in words:
-            if len(word) > 3:  # Ignore short words
-                word_freq[word] = word_freq.get(word, 0) + 1
+        word_freq = features.word_frequencies  # Ignores short words
         
         max_repeat = max(word_freq.values()) if word_freq else 0
         repeat_percentage = (max_repeat / len(words)) * 100 if len(words) > 0 else 0
@@ -297,19 +649,39 @@ def check_writing_patterns(text):
 # ML MODEL PREDICTION
 # ====================================================
 
+def _truncate_for_model(text):
+    """Truncate text to model's max length (512 tokens typically)"""
+    if len(text) > ML_MAX_LENGTH * 4:  # Rough estimate: 4 chars per token
+        text = text[:ML_MAX_LENGTH * 4]
+    return text
+
 def ml_classify_text(text):
     """Use ML model to classify text"""
     if not ML_AVAILABLE or fake_news_classifier is None:
         return None
     
+    if ML_BATCHER is not None:
+        # Grouped with other concurrent requests into one forward pass
+        try:
+            return ML_BATCHER.submit(text)
+        except QueueFullError as e:
+            print(f"ML classification skipped: {e}")
+            return None
+        except Exception as e:
+            print(f"ML classification error: {e}")
+            return None
+    
+    if ML_LONG_DOCUMENTS:
+        return ml_classify_windowed([text])[0]
+    return _classify_single(text)
+
+def _classify_single(text):
+    """One unbatched forward pass"""
     try:
-        # Truncate text to model's max length (512 tokens typically)
-        max_length = 512
-        if len(text) > max_length * 4:  # Rough estimate: 4 chars per token
-            text = text[:max_length * 4]
+        text = _truncate_for_model(text)
         
         # Get classification
-        result = fake_news_classifier(text, truncation=True, max_length=512)
+        result = fake_news_classifier(text, truncation=True, max_length=ML_MAX_LENGTH)
         
         # The model returns sentiment, we'll interpret negative sentiment
         # as potentially fake news indicator (combined with other factors)
@@ -320,34 +692,132 @@ def ml_classify_text(text):
         print(f"ML classification error: {e}")
         return None
 
+def ml_classify_texts(texts, batch_size=None):
+    """
+    Classify many texts with padded, batched forward passes
+    Returns: list of results in input order (None where classification failed)
+    """
+    if not ML_AVAILABLE or fake_news_classifier is None or not texts:
+        return [None] * len(texts)
+    
+    batch_size = max(1, batch_size or ML_BATCH_SIZE)
+    if ML_LONG_DOCUMENTS:
+        return ml_classify_windowed(texts, batch_size)
+    truncated = [_truncate_for_model(text) for text in texts]
+    
+    try:
+        results = fake_news_classifier(
+            truncated,
+            batch_size=batch_size,
+            truncation=True,
+            max_length=ML_MAX_LENGTH
+        )
+        return [r[0] if isinstance(r, list) and r else r for r in results]
+    except Exception as e:
+        # One bad input should not fail the whole batch
+        print(f"Batched ML classification error: {e}")
+        return [_classify_single(text) for text in texts]
+
+def _model_tokenizer():
+    return getattr(fake_news_classifier, 'tokenizer', None) or tokenizer
+
+def _model_labels():
+    if ml_backend_in_use == 'onnx':
+        return fake_news_classifier.id2label
+    return {int(k): v for k, v in ml_model.config.id2label.items()}
+
+def _window_probabilities(windows):
+    """One padded forward pass over token windows; returns probability rows"""
+    encoded = _model_tokenizer().pad({'input_ids': windows},
+                                     return_tensors='np' if ml_backend_in_use == 'onnx' else 'pt')
+    if ml_backend_in_use == 'onnx':
+        logits = fake_news_classifier.logits_from_encoding(encoded).tolist()
+    else:
+        with torch.no_grad():
+            logits = ml_model(**encoded).logits.tolist()
+    return [softmax(row) for row in logits]
+
+def ml_classify_windowed(texts, batch_size=None):
+    """
+    Long-document classification
+    Each text is tokenized once into overlapping windows of ML_MAX_LENGTH
+    tokens (at most ML_MAX_WINDOWS, spread over the article); windows of
+    all texts are scored together in padded batches and combined per text
+    with ML_WINDOW_AGGREGATION.
+    Returns: list of {label, score, windows} in input order (None on failure)
+    """
+    batch_size = max(1, batch_size or ML_BATCH_SIZE)
+    try:
+        model_tokenizer = _model_tokenizer()
+        windows = []  # (text index, token ids)
+        for index, text in enumerate(texts):
+            encoded = model_tokenizer(
+                text[:ML_LONG_DOC_MAX_CHARS],
+                truncation=True,
+                max_length=ML_MAX_LENGTH,
+                stride=ML_WINDOW_OVERLAP,
+                return_overflowing_tokens=True
+            )
+            ids = encoded['input_ids']
+            windows.extend((index, ids[i]) for i in select_windows(len(ids), ML_MAX_WINDOWS))
+        
+        probabilities = []
+        for start in range(0, len(windows), batch_size):
+            probabilities.extend(_window_probabilities([ids for _, ids in windows[start:start + batch_size]]))
+        
+        labels = _model_labels()
+        results = []
+        for index in range(len(texts)):
+            rows = [(p, len(ids)) for (i, ids), p in zip(windows, probabilities) if i == index]
+            results.append(aggregate_window_scores([p for p, _ in rows], [n for _, n in rows],
+                                                   labels, ML_WINDOW_AGGREGATION))
+        return results
+    except Exception as e:
+        print(f"Long-document ML classification error: {e}")
+        return [None] * len(texts)
+
+ML_BATCHER = MicroBatcher(
+    lambda texts: ml_classify_texts(texts, batch_size=len(texts)),
+    max_batch_size=ML_BATCH_SIZE,
+    max_wait_ms=ML_BATCH_WAIT_MS,
+    max_queue_depth=ML_QUEUE_MAX_DEPTH,
+    name="ml-micro-batcher"
+) if ML_MICRO_BATCHING else None
+
+if ML_BATCHER is not None:
+    METRICS.gauge('fakenews_ml_queue_depth', 'Texts waiting for a batched forward pass',
+                  lambda: ML_BATCHER.queue_depth)
+
 # ====================================================
 # SOURCE RELIABILITY CHECKING
 # ====================================================
 
-def check_source_reliability(url):
-    """Check if URL domain is in trusted/untrusted list"""
+def check_source_reliability(url, rules=None):
+    """Check if URL domain is in trusted/untrusted list (rules: the request's Rules)"""
     if not url:
         return 'medium', []
     
     try:
         parsed = urlparse(url)
-        domain = parsed.netloc.replace('www.', '').lower()
+        domain = (parsed.hostname or '').lower()
+        if domain.startswith('www.'):
+            domain = domain[4:]
         
         details = []
+        rules = rules or current_rules()
         
-        # Check trusted sources
-        for trusted in TRUSTED_SOURCES:
-            if trusted in domain:
-                return 'high', [f"Source is from trusted domain: {trusted}"]
+        # Check trusted sources (domain or any subdomain of it)
+        trusted = rules.trusted.lookup(domain)
+        if trusted:
+            return 'high', [f"Source is from trusted domain: {trusted}"]
         
         # Check untrusted sources
-        for untrusted in UNTRUSTED_SOURCES:
-            if untrusted in domain:
-                return 'low', [f"Source is from known untrusted domain: {untrusted}"]
+        untrusted = rules.untrusted.lookup(domain)
+        if untrusted:
+            return 'low', [f"Source is from known untrusted domain: {untrusted}"]
         
         # Check for suspicious domain patterns
-        suspicious_patterns = ['free', 'click', 'win', 'prize', 'lottery']
-        for pattern in suspicious_patterns:
+        for pattern in rules.suspicious_domains:
             if pattern in domain:
                 details.append(f"Suspicious domain pattern detected: {pattern}")
         
@@ -355,11 +825,78 @@ def check_source_reliability(url):
     except:
         return 'medium', []
 
+# ====================================================
+# RULE PACKS
+# ====================================================
+
+# RULE_PACK_PATH: a compiled rule pack (rule_pack.py) used instead of the
+# built-in lists above. It is memory-mapped, so it loads in well under a
+# millisecond and all workers share its pages. A new version is swapped in
+# when the file is replaced (checked every RULE_PACK_WATCH_SECONDS, 0 = off)
+# or on RULE_PACK_SIGNAL, as one Rules object in a single assignment.
+# Requests already running keep the Rules they hold; the old mapping is
+# released when they are done.
+RULE_PACK_PATH = os.environ.get("RULE_PACK_PATH")
+RULE_PACK_WATCH_SECONDS = float(os.environ.get("RULE_PACK_WATCH_SECONDS", 2))
+RULE_PACK_SIGNAL = os.environ.get("RULE_PACK_SIGNAL", "SIGHUP")  # "" = no signal handler
+
+_rule_pack_lock = threading.Lock()
+_rule_pack_watch = (None, None)  # (pid, watcher)
+
+def apply_rule_pack(pack):
+    """Make a rule pack's lists, matcher and domain indexes the active rules"""
+    global _active_rules
+    lists = tuple(pack.lists[section] for section in RULE_PACK_SECTIONS)
+    rules = Rules(pack.digest[:16], lists, pack.matcher, pack.trusted, pack.untrusted,
+                  tuple(pack.lists['suspicious_domain']), pack)
+    with _rules_lock:
+        _active_rules = rules
+
+def reload_rule_pack(path=None):
+    """Map the rule pack file and swap it in; the current rules stay on any error"""
+    path = path or RULE_PACK_PATH
+    with _rule_pack_lock:
+        started = time.perf_counter()
+        try:
+            pack = RulePack.open(path)
+        except (OSError, ValueError) as e:
+            RULE_PACK_LOADS.inc(outcome='error')
+            print(f"Warning: could not load rule pack {path}: {e}")
+            return False
+        apply_rule_pack(pack)
+    RULE_PACK_LOADS.inc(outcome='ok')
+    print(f"✓ Rule pack {pack.name} ({pack.digest[:12]}) loaded in {(time.perf_counter() - started) * 1000:.2f} ms")
+    return True
+
+def _on_reload_signal(signum, frame):
+    # Reload off the signal handler, which may interrupt a request
+    threading.Thread(target=reload_rule_pack, name="rule-pack-reload", daemon=True).start()
+
+def watch_rule_pack():
+    """Reload the rule pack when its file changes or on RULE_PACK_SIGNAL (once per process)"""
+    global _rule_pack_watch
+    if not RULE_PACK_PATH or _rule_pack_watch[0] == os.getpid():
+        return
+    watcher = None
+    if RULE_PACK_WATCH_SECONDS > 0:
+        watcher = FileWatcher(RULE_PACK_PATH, reload_rule_pack, RULE_PACK_WATCH_SECONDS).start()
+    if RULE_PACK_SIGNAL:
+        try:
+            signal.signal(getattr(signal, RULE_PACK_SIGNAL), _on_reload_signal)
+        except (AttributeError, ValueError) as e:
+            # Unknown signal name, or not the main thread
+            print(f"Warning: no {RULE_PACK_SIGNAL} handler for rule pack reloads: {e}")
+    _rule_pack_watch = (os.getpid(), watcher)
+
+if RULE_PACK_PATH:
+    reload_rule_pack()
+    watch_rule_pack()
+
 # ====================================================
 # FACT-CHECKING INTEGRATION
 # ====================================================
 
-def fact_check_claim(text, url=None):
+def fact_check_claim(text, url=None, features=None):
     """Attempt to fact-check the claim using web search"""
     # This is a simplified version - in production, you'd use
     # fact-checking APIs like Google Fact Check API, Snopes API, etc.
@@ -373,15 +910,10 @@ def fact_check_claim(text, url=None):
     
     # Extract key claims from text (simplified)
     # In production, use NLP to extract factual claims
-    sentences = sent_tokenize(text) if ML_AVAILABLE else text.split('.')
+    features = features or get_text_features(text)
     
     # Check for common fact-checkable patterns
-    fact_checkable_phrases = [
-        'study shows', 'research proves', 'scientists say',
-        'according to', 'official data', 'statistics show'
-    ]
-    
-    has_claim = any(phrase in text.lower() for phrase in fact_checkable_phrases)
+    has_claim = bool(features.phrase_hits['fact_checkable'])
     
     if has_claim:
         fact_check_result['checked'] = True
@@ -397,29 +929,57 @@ def fact_check_claim(text, url=None):
 # SEMANTIC SIMILARITY CHECKING
 # ====================================================
 
-def check_semantic_similarity(text):
+# Near-duplicate index of known fake articles (built with near_duplicate.py)
+KNOWN_FAKE_INDEX = os.environ.get("KNOWN_FAKE_INDEX")
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", 0.5))
+
+def _load_near_duplicate_index():
+    from near_duplicate import NearDuplicateIndex
+    try:
+        index = NearDuplicateIndex.load(KNOWN_FAKE_INDEX)
+    except Exception as e:
+        print(f"Warning: Could not load known-fake index {KNOWN_FAKE_INDEX}: {e}")
+        raise
+    print(f"✓ Known-fake index loaded ({len(index)} articles)")
+    return index
+
+def get_near_duplicate_index():
+    """The known-fake article index, loaded once (None when not configured)"""
+    if not KNOWN_FAKE_INDEX:
+        return None
+    try:
+        return MODEL_REGISTRY.load('near_duplicate_index', _load_near_duplicate_index)
+    except Exception:
+        return None
+
+def check_semantic_similarity(text, features=None):
     """Check if text is similar to known fake news"""
-    # In a production system, you'd maintain a database of known fake news
-    # and use embeddings to check similarity
-    # For now, we'll use a simplified keyword-based approach
+    # Known fake phrases, plus near-duplicates of known fake articles
+    # when an index is configured (KNOWN_FAKE_INDEX)
     
-    known_fake_patterns = [
-        'covid vaccine causes', '5g causes', 'flat earth',
-        'moon landing fake', 'chemtrails', 'illuminati controls'
-    ]
+    features = features or get_text_features(text)
     
-    text_lower = text.lower()
-    matches = []
+    matches = list(features.phrase_hits['known_fake'])
+    confidence = min(len(matches) * 20, 80) if matches else 0.0
     
-    for pattern in known_fake_patterns:
-        if pattern in text_lower:
-            matches.append(pattern)
+    index = get_near_duplicate_index()
+    if index is not None:
+        duplicates = index.query(text, top_k=3, min_similarity=NEAR_DUPLICATE_THRESHOLD)
+        if duplicates:
+            matches.extend(f"near-duplicate of {doc_id}" for doc_id, _ in duplicates)
+            confidence = max(confidence, round(duplicates[0][1] * 100, 1))
+        return {
+            'similar': bool(matches),
+            'matches': matches,
+            'confidence': confidence,
+            'near_duplicates': [{'id': doc_id, 'similarity': similarity} for doc_id, similarity in duplicates]
+        }
     
     if matches:
         return {
             'similar': True,
             'matches': matches,
-            'confidence': min(len(matches) * 20, 80)
+            'confidence': confidence
         }
     
     return {
@@ -484,49 +1044,185 @@ def generate_explanation(keyword_count, matched_keywords, pattern_score, pattern
     return ". ".join(reasons)
 
 # ====================================================
-# MAIN DETECTION FUNCTION
+# RESULT CACHE
 # ====================================================
 
-def detect_fake_news(text, url=None):
+RESULT_CACHE = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_SIZE", 10000)),
+    ttl_seconds=float(os.environ.get("RESULT_CACHE_TTL", 3600))
+)
+
+METRICS.callback_counter('fakenews_cache_hits_total', 'Result cache hits', lambda: RESULT_CACHE.hits)
+METRICS.callback_counter('fakenews_cache_misses_total', 'Result cache misses', lambda: RESULT_CACHE.misses)
+METRICS.gauge('fakenews_cache_entries', 'Entries currently in the result cache', lambda: len(RESULT_CACHE))
+
+# Optional on-disk second level (VERDICT_STORE_PATH, a local SQLite file),
+# shared by all workers and kept across restarts
+VERDICT_STORE_PATH = os.environ.get("VERDICT_STORE_PATH")
+VERDICT_STORE_WARM_LOAD = os.environ.get("VERDICT_STORE_WARM_LOAD", "1") == "1"
+
+def _open_verdict_store():
+    if not VERDICT_STORE_PATH:
+        return None
+    try:
+        return VerdictStore(
+            VERDICT_STORE_PATH,
+            max_entries=int(os.environ.get("VERDICT_STORE_MAX_ENTRIES", 100000)),
+            flush_interval=float(os.environ.get("VERDICT_STORE_FLUSH_MS", 200)) / 1000.0,
+            max_pending=int(os.environ.get("VERDICT_STORE_MAX_PENDING", 10000))
+        )
+    except Exception as e:
+        print(f"Warning: could not open verdict store {VERDICT_STORE_PATH}: {e}")
+        return None
+
+VERDICT_STORE = _open_verdict_store()
+
+if VERDICT_STORE is not None:
+    atexit.register(VERDICT_STORE.flush, 5.0)  # Commit queued writes on shutdown
+    METRICS.callback_counter('fakenews_verdict_store_hits_total', 'Verdict store hits',
+                             lambda: VERDICT_STORE.hits)
+    METRICS.callback_counter('fakenews_verdict_store_misses_total', 'Verdict store misses',
+                             lambda: VERDICT_STORE.misses)
+    METRICS.callback_counter('fakenews_verdict_store_dropped_total', 'Results not stored because the write queue was full',
+                             lambda: VERDICT_STORE.dropped)
+
+def rules_version(rules=None):
     """
-    Advanced fake news detection using multiple methods
-    Returns: dict with result, confidence, and explanation
+    Fingerprint of the rule lists and loaded models
+    Any change to a rule list or model yields a new version, so cached
+    results from the old configuration are never served.
+    rules: the request's Rules (default: the active ones)
     """
-    if not text or len(text.strip()) < 10:
-        return {
-            'result': 'Doubtful',
-            'confidence': 50.0,
-            'explanation': 'Text is too short to analyze properly',
-            'details': {}
-        }
-    
-    # Initialize models if not already done
-    if ML_AVAILABLE and sentiment_analyzer is None:
-        initialize_models()
-    
-    # Step 1: Keyword detection
-    keyword_count, matched_keywords = check_suspicious_keywords(text)
-    
-    # Step 2: Linguistic pattern analysis
-    pattern_score, pattern_details = analyze_linguistic_patterns(text)
-    
-    # Step 3: Source reliability
-    source_level, source_details = check_source_reliability(url)
-    
-    # Step 4: NLP Analysis
-    sentiment_scores = analyze_sentiment(text)
-    readability = analyze_readability(text)
-    
-    # Step 5: ML Model classification
-    ml_result = ml_classify_text(text)
-    
-    # Step 6: Fact-checking
-    fact_check = fact_check_claim(text, url)
+    ml = f"{MODEL_NAME}@{ml_backend_in_use}"
+    if ML_LONG_DOCUMENTS:
+        ml += f"+windows-{ML_WINDOW_AGGREGATION}-{ML_MAX_WINDOWS}-{ML_WINDOW_OVERLAP}"
+    models = (ml if fake_news_classifier is not None else 'no-ml',
+              'vader' if sentiment_analyzer is not None else 'no-vader')
+    version = f"{(rules or current_rules()).digest}:{models[0]}:{models[1]}"
+    index = get_near_duplicate_index()
+    if index is not None:
+        version += f":known-fake-{len(index)}"
+    return version + ':cascade' if CASCADE_MODE else version
+
+def result_cache_key(text, url=None, parts=RESULT_PARTS, rules=None):
+    """Cache key of a result; results without some RESULT_PARTS are cached apart"""
+    version = rules_version(rules)
+    if parts != RESULT_PARTS:
+        version += '|' + ('+'.join(parts) or 'compact')
+    return content_key(text, url, version)
+
+def _lookup_key(text, url, parts, rules=None):
+    """Cache key to read: the full result's when it is cached, else the one for these parts"""
+    key = result_cache_key(text, url, rules=rules)
+    if parts == RESULT_PARTS or is_cached(key):
+        return key
+    return result_cache_key(text, url, parts, rules)
+
+def _load_stored(key):
+    """Copy a verdict store entry into the memory cache; returns it, or None"""
+    if VERDICT_STORE is None:
+        return None
+    try:
+        stored = VERDICT_STORE.get(key)
+    except Exception as e:
+        print(f"Warning: verdict store read failed: {e}")
+        return None
+    if stored is not None:
+        RESULT_CACHE.put(key, stored)
+    return stored
+
+def is_cached(key):
+    """Is there a result for the key in memory or in the verdict store?"""
+    return RESULT_CACHE.contains(key) or _load_stored(key) is not None
+
+def cached_result(key):
+    """Cached result for the key (memory first, then the verdict store), or None"""
+    return RESULT_CACHE.get(key) or _load_stored(key)
+
+def remember_result(key, result, rules=None):
+    """Cache a result in memory and queue it for the verdict store (rules: those the key was made with)"""
+    RESULT_CACHE.put(key, result)
+    if VERDICT_STORE is not None:
+        VERDICT_STORE.put(key, rules_version(rules), result)
+
+def warm_load_verdicts():
+    """Fill the memory cache with the newest stored results of the current version"""
+    if VERDICT_STORE is None or not VERDICT_STORE_WARM_LOAD or not RESULT_CACHE.enabled:
+        return 0
+    try:
+        loaded = VERDICT_STORE.load_into(RESULT_CACHE, rules_version(), RESULT_CACHE.max_entries)
+    except Exception as e:
+        print(f"Warning: verdict store warm-load failed: {e}")
+        return 0
+    print(f"✓ Loaded {loaded} stored verdicts into the result cache")
+    return loaded
+
+# ====================================================
+# SCORING
+# ====================================================
+
+# Cascade mode: run the transformer, VADER and readability only when their
+# points could still move the verdict across a threshold
+CASCADE_MODE = os.environ.get("CASCADE_MODE", "0") == "1"
+
+# Smallest and largest number of points each optional stage can add
+ML_POINTS_RANGE = (-10, 15)
+READABILITY_POINTS_RANGE = (0.0, 5 * 0.15)
+
+def sentiment_points_range(keyword_count):
+    return (-3, 5) if keyword_count >= 1 else (-3, 0)
+
+def sentiment_points(sentiment_scores, keyword_count):
+    """Points added for the sentiment of the text"""
+    # Sentiment analysis: REDUCED weight, only count if combined with other factors
+    # CRITICAL FIX: Don't penalize legitimate emotional content (tragedies, celebrations)
+    compound_sentiment = sentiment_scores.get('compound', 0)
     
-    # Step 7: Semantic similarity
-    similarity = check_semantic_similarity(text)
+    # Only add sentiment score if we have other suspicious indicators
+    # This prevents legitimate emotional news from being flagged as fake
+    if keyword_count >= 1:  # Only consider sentiment if suspicious keywords present
+        if compound_sentiment < -0.8:  # EXTREME negative (raised threshold)
+            return 5  # Reduced from 15
+        elif compound_sentiment > 0.85:  # EXTREME positive (raised threshold)
+            return 3  # Reduced from 15
     
-    # Step 8: Calculate comprehensive fake news score (0-100)
+    # Give slight bonus for neutral sentiment
+    if -0.2 <= compound_sentiment <= 0.2:
+        return -3  # Small bonus for neutral tone
+    return 0
+
+def readability_points(readability):
+    """Readability issues: up to 15 points"""
+    return readability.get('suspicion_score', 0) * 0.15
+
+def ml_points(ml_result):
+    """Points added for the transformer's classification"""
+    # ML model: NEW LOGIC - uses improved fake news classifier
+    # (Assuming the new model actually classifies fake vs real, not sentiment)
+    if not ml_result:
+        return 0
+    ml_label = ml_result.get('label', '')
+    ml_score = ml_result.get('score', 0)
+    
+    # With DavideRatti/fake_news_detector, labels should be 'Fake' or 'Real'
+    if 'FAKE' in ml_label.upper() and ml_score > 0.75:
+        # Strong fake classification from specialized model
+        return 15  # Contribute to fake score
+    elif 'REAL' in ml_label.upper() and ml_score > 0.75:
+        # Strong real classification from specialized model
+        return -10  # Reduce fake score (more likely real)
+    elif 'REAL' in ml_label.upper() and ml_score > 0.6:
+        # Moderate confidence this is real
+        return -5
+    return 0
+
+def compute_fake_score(keyword_count, pattern_score, source_level, sentiment_pts, readability_pts,
+                       ml_pts, fact_check, similarity):
+    """
+    Comprehensive fake news score (0-100)
+    The score never decreases when any of the point arguments grows, so
+    the extremes of each stage's range bound the final score.
+    """
     fake_score = 0
     
     # Keywords: up to 45 points (each keyword is significant)
@@ -547,42 +1243,9 @@ def detect_fake_news(text, url=None):
     elif source_level == 'high':
         fake_score -= 20  # Trusted source significantly reduces suspicion
     
-    # Sentiment analysis: REDUCED weight, only count if combined with other factors
-    # CRITICAL FIX: Don't penalize legitimate emotional content (tragedies, celebrations)
-    compound_sentiment = sentiment_scores.get('compound', 0)
-    
-    # Only add sentiment score if we have other suspicious indicators
-    # This prevents legitimate emotional news from being flagged as fake
-    if keyword_count >= 1:  # Only consider sentiment if suspicious keywords present
-        if compound_sentiment < -0.8:  # EXTREME negative (raised threshold)
-            fake_score += 5  # Reduced from 15
-        elif compound_sentiment > 0.85:  # EXTREME positive (raised threshold)
-            fake_score += 3  # Reduced from 15
-    
-    # Give slight bonus for neutral sentiment
-    if -0.2 <= compound_sentiment <= 0.2:
-        fake_score -= 3  # Small bonus for neutral tone
-    
-    # Readability issues: up to 15 points
-    readability_suspicion = readability.get('suspicion_score', 0)
-    fake_score += readability_suspicion * 0.15
-    
-    # ML model: NEW LOGIC - uses improved fake news classifier
-    # (Assuming the new model actually classifies fake vs real, not sentiment)
-    if ml_result:
-        ml_label = ml_result.get('label', '')
-        ml_score = ml_result.get('score', 0)
-        
-        # With DavideRatti/fake_news_detector, labels should be 'Fake' or 'Real'
-        if 'FAKE' in ml_label.upper() and ml_score > 0.75:
-            # Strong fake classification from specialized model
-            fake_score += 15  # Contribute to fake score
-        elif 'REAL' in ml_label.upper() and ml_score > 0.75:
-            # Strong real classification from specialized model
-            fake_score -= 10  # Reduce fake score (more likely real)
-        elif 'REAL' in ml_label.upper() and ml_score > 0.6:
-            # Moderate confidence this is real
-            fake_score -= 5
+    fake_score += sentiment_pts
+    fake_score += readability_pts
+    fake_score += ml_pts
     
     # Fact-checking: up to 15 points
     if fact_check.get('checked') and fact_check.get('verdict') == 'needs_verification':
@@ -610,13 +1273,15 @@ def detect_fake_news(text, url=None):
         # Very clean content - should be doubtful or real, not fake
         fake_score = max(0, fake_score - 8)
     
-    fake_score = max(0, min(100, fake_score))  # Clamp between 0-100
-    
-    # Step 9: Determine result with IMPROVED thresholds
-    # CRITICAL FIX: Raise thresholds to prevent real news from being misclassified as FAKE
-    # Old thresholds were too aggressive (Fake >= 35, Real <= 20)
-    # New thresholds: only classify as FAKE when we have strong evidence
-    
+    return max(0, min(100, fake_score))  # Clamp between 0-100
+
+def verdict_for_score(fake_score, source_level):
+    """
+    Map the score to (result, confidence)
+    CRITICAL FIX: Raise thresholds to prevent real news from being misclassified as FAKE
+    Old thresholds were too aggressive (Fake >= 35, Real <= 20)
+    New thresholds: only classify as FAKE when we have strong evidence
+    """
     # FAKE: Score >= 60 (RAISED from 35) - requires stronger evidence of fake news
     if fake_score >= 60:
         result = 'Fake'
@@ -641,33 +1306,566 @@ def detect_fake_news(text, url=None):
         confidence = 50 + (distance_from_real / max_distance) * 10  # 50% to 60% range
         confidence = max(50, min(65, confidence))  # Keep in 50-65% range for doubtful
     
-    # Step 10: Generate comprehensive explanation
-    explanation = generate_explanation(
-        keyword_count, matched_keywords, pattern_score, pattern_details,
-        source_level, source_details, sentiment_scores, readability,
-        ml_result, fact_check, similarity
+    return result, confidence
+
+def verdict_settled(keyword_count, pattern_score, source_level, fact_check, similarity,
+                    sentiment_range, readability_range, ml_range):
+    """
+    True when the verdict is the same at both ends of the score bounds
+    Each *_range is the (min, max) points the stage could still add
+    (a pair of equal values once the stage has run).
+    """
+    bounds = [compute_fake_score(keyword_count, pattern_score, source_level,
+                                 sentiment_range[end], readability_range[end], ml_range[end],
+                                 fact_check, similarity)
+              for end in (0, 1)]
+    return verdict_for_score(bounds[0], source_level)[0] == verdict_for_score(bounds[1], source_level)[0]
+
+def _sentiment_is_costly():
+    return ML_AVAILABLE and sentiment_analyzer is not None
+
+def _readability_is_costly():
+    return readability_scores is not None
+
+def _ml_is_costly():
+    return ML_AVAILABLE and fake_news_classifier is not None
+
+def ml_could_change_verdict(text, url=None, rules=None):
+    """
+    Cascade check used before batched ML: can the transformer still move
+    this text's verdict, assuming nothing about sentiment and readability?
+    """
+    if not CASCADE_MODE:
+        return True
+    features = get_text_features(text, rules)
+    keyword_count, _ = check_suspicious_keywords(text, features)
+    pattern_score, _ = analyze_linguistic_patterns(text, features)
+    source_level, _ = check_source_reliability(url, rules)
+    return not verdict_settled(keyword_count, pattern_score, source_level,
+                               fact_check_claim(text, url, features), check_semantic_similarity(text, features),
+                               sentiment_points_range(keyword_count), READABILITY_POINTS_RANGE, ML_POINTS_RANGE)
+
+# ====================================================
+# LATENCY BUDGETS
+# ====================================================
+
+# Clients may send a latency budget (X-Latency-Budget-Ms header or
+# `latency_budget_ms` in the body). When the transformer is not expected to
+# finish inside what is left of it, the ML stage is skipped and the rule-only
+# verdict is returned with `degraded: true` (and not cached).
+LATENCY_BUDGET_HEADER = 'x-latency-budget-ms'
+DEFAULT_LATENCY_BUDGET_MS = float(os.environ.get("DEFAULT_LATENCY_BUDGET_MS", 0))  # 0 = no budget
+STAGE_COST_TTL = float(os.environ.get("STAGE_COST_TTL", 10))  # Seconds before a stale estimate is dropped
+
+STAGE_COSTS = StageCosts(ttl=STAGE_COST_TTL)
+
+# Stages still to run after the transformer
+AFTER_ML_STAGES = ('fact_check', 'similarity', 'scoring', 'explanation')
+
+def request_deadline(data, headers):
+    """Deadline of a request from its budget header / body field (else the default); None for no budget"""
+    budget = headers.get(LATENCY_BUDGET_HEADER, data.get('latency_budget_ms'))
+    if budget is not None:
+        return Deadline(parse_budget(budget))
+    return Deadline(DEFAULT_LATENCY_BUDGET_MS) if DEFAULT_LATENCY_BUDGET_MS > 0 else None
+
+def ml_fits_deadline(deadline, after=AFTER_ML_STAGES):
+    """Can the transformer (and the stages after it) still finish before the deadline?"""
+    if deadline is None or not _ml_is_costly():
+        return True
+    estimate = STAGE_COSTS.estimate('ml')
+    if estimate is None:
+        return True  # No recent measurement: run it and measure
+    if ML_BATCHER is not None:
+        # Full batches queued ahead of this text
+        estimate *= 1 + ML_BATCHER.queue_depth // ML_BATCHER.max_batch_size
+    return estimate + STAGE_COSTS.total(after) <= deadline.remaining()
+
+# ====================================================
+# ARTICLE FETCHING
+# ====================================================
+
+# A /predict request with a url and no text is scored on the article at the
+# URL (article_fetcher.py). Fetch time is recorded as the `fetch` stage and
+# comes out of the request's latency budget.
+ARTICLE_FETCH = os.environ.get("ARTICLE_FETCH", "1") == "1"
+
+ARTICLE_FETCHER = ArticleFetcher(
+    max_per_host=int(os.environ.get("FETCH_MAX_PER_HOST", 4)),
+    timeout=(float(os.environ.get("FETCH_CONNECT_TIMEOUT", 3.05)), float(os.environ.get("FETCH_READ_TIMEOUT", 10))),
+    max_seconds=float(os.environ.get("FETCH_MAX_SECONDS", 15)),
+    max_bytes=int(os.environ.get("FETCH_MAX_BYTES", 2 * 1024 * 1024)),
+    cache_size=int(os.environ.get("FETCH_CACHE_SIZE", 1000)),
+    fresh_seconds=float(os.environ.get("FETCH_CACHE_FRESH_SECONDS", 60)),
+    allow_private_hosts=os.environ.get("FETCH_ALLOW_PRIVATE", "0") == "1"
+)
+
+def fetch_article(url, deadline=None):
+    """Fetch and extract the article at a URL (raises FetchError)"""
+    started = time.perf_counter()
+    try:
+        article = ARTICLE_FETCHER.fetch(url, deadline.remaining() if deadline is not None else None)
+    except FetchError:
+        FETCHES.inc(outcome='error')
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage='fetch')
+    FETCHES.inc(outcome=article.source)
+    return article
+
+def with_article(result, article, fields):
+    """Add what was fetched to a full response"""
+    if fields is None and 'error' not in result:
+        result = dict(result, article=article.info())
+    return result
+
+# ====================================================
+# MAIN DETECTION FUNCTION
+# ====================================================
+
+# Marks an ML result that has not been computed yet
+_ML_NOT_RUN = object()
+# Marks an ML pass skipped to meet the request's latency budget
+_ML_DEGRADED = object()
+
+def detect_fake_news(text, url=None, ml_result=_ML_NOT_RUN, fields=None, deadline=None, rules=None):
+    """
+    Advanced fake news detection using multiple methods
+    ml_result: precomputed classifier output (used by batch prediction)
+    fields: response fields to return (see response_format.parse_fields);
+            the explanation and details are only built when requested
+    deadline: optional Deadline; the ML stage is skipped (degraded: true)
+              when it would overrun it
+    rules: Rules to use (default: the active ones, read once for the request)
+    Returns: dict with result, confidence, and explanation
+    """
+    # Initialize models first so the cache key reflects what is loaded
+    if ML_AVAILABLE and sentiment_analyzer is None:
+        initialize_models()
+    
+    started = time.perf_counter()
+    INPUT_CHARS.observe(len(text or ''))
+    
+    parts = result_parts(fields)
+    rules = rules or current_rules()
+    cache_key = _lookup_key(text or '', url, parts, rules)
+    cached = cached_result(cache_key)
+    if cached is not None:
+        REQUESTS_BY_VERDICT.inc(verdict=cached['result'], cached='true')
+        DETECTION_SECONDS.observe(time.perf_counter() - started)
+        return select_fields(cached, fields)
+    
+    if deadline is not None:
+        BUDGETED_REQUESTS.inc()
+    result = _run_detection(text, url, ml_result, parts=parts, deadline=deadline, rules=rules)
+    if not result.get('degraded'):
+        remember_result(cache_key, result, rules)
+    REQUESTS_BY_VERDICT.inc(verdict=result['result'], cached='false')
+    DETECTION_SECONDS.observe(time.perf_counter() - started)
+    return select_fields(result, fields)
+
+def _run_detection(text, url, ml_result, timings=None, parts=RESULT_PARTS, deadline=None, rules=None):
+    """
+    Run every analysis stage (uncached)
+    timings: optional dict filled with seconds spent per stage
+    parts: which of the explanation and details to build
+    deadline: optional Deadline the ML stage must fit in
+    rules: Rules every stage uses (default: the active ones)
+    """
+    if is_too_short(text):
+        return _too_short_result()
+    
+    stages = StageClock()
+    analysis = _analyze(text, url, ml_result, stages, deadline=deadline, rules=rules or current_rules())
+    
+    # Step 8: Calculate comprehensive fake news score (0-100)
+    fake_score = compute_fake_score(
+        analysis['keyword_count'], analysis['pattern_score'], analysis['source_level'],
+        sentiment_points(analysis['sentiment'], analysis['keyword_count'])
+        if analysis['sentiment'] is not None else 0,
+        readability_points(analysis['readability']) if analysis['readability'] is not None else 0.0,
+        ml_points(analysis['ml_result']), analysis['fact_check'], analysis['similarity']
     )
     
-    # Prepare detailed breakdown
-    details = {
+    # Step 9: Determine result with IMPROVED thresholds
+    result, confidence = verdict_for_score(fake_score, analysis['source_level'])
+    
+    stages.lap('scoring')
+    response = _finish_detection(analysis, fake_score, result, confidence, stages, timings, parts)
+    
+    # Update the cost estimates (a precomputed or skipped ML pass took no time here)
+    ml_ran = ml_result is _ML_NOT_RUN and not analysis['degraded']
+    STAGE_COSTS.observe_all(stages.times, skip=() if ml_ran else ('ml',))
+    return response
+
+def is_too_short(text):
+    """Texts this short get the fixed Doubtful result; no stage (or model) runs on them"""
+    return not text or len(text.strip()) < 10
+
+def _too_short_result():
+    return {
+        'result': 'Doubtful',
+        'confidence': 50.0,
+        'explanation': 'Text is too short to analyze properly',
+        'details': {}
+    }
+
+def _analyze(text, url, ml_result, stages, features=None, sentiment_scores=None, deadline=None, rules=None):
+    """
+    Steps 1-7: every analysis stage of one text
+    features / sentiment_scores: already computed by the batch path
+    deadline: optional Deadline; the ML stage is skipped if it would overrun it
+    rules: the request's Rules
+    Returns: dict of stage outputs (None for stages the cascade skipped)
+    """
+    # Text is lowered, split and scanned once, then shared by every stage
+    features = features or get_text_features(text, rules)
+    
+    # Step 1: Keyword detection
+    keyword_count, matched_keywords = check_suspicious_keywords(text, features)
+    stages.lap('keywords')
+    
+    # Step 2: Linguistic pattern analysis
+    pattern_score, pattern_details = analyze_linguistic_patterns(text, features)
+    stages.lap('linguistic')
+    
+    # Step 3: Source reliability
+    source_level, source_details = check_source_reliability(url, rules)
+    stages.lap('source')
+    
+    if CASCADE_MODE:
+        sentiment_scores, readability, ml_result, fact_check, similarity, skipped, degraded = _run_cascade_stages(
+            text, url, features, keyword_count, pattern_score, source_level, ml_result, stages, deadline)
+    else:
+        skipped = degraded = None
+        
+        # Step 4: NLP Analysis
+        if sentiment_scores is None:
+            sentiment_scores = analyze_sentiment(text, features)
+            stages.lap('sentiment')
+        readability = analyze_readability(text)
+        stages.lap('readability')
+        
+        # Step 5: ML Model classification (unless it would overrun the deadline)
+        if ml_result is _ML_NOT_RUN and not ml_fits_deadline(deadline):
+            ml_result = _ML_DEGRADED
+        if ml_result is _ML_DEGRADED:
+            ml_result, degraded = None, ['ml']
+            DEGRADED.inc(stage='ml')
+        elif ml_result is _ML_NOT_RUN:
+            ml_result = ml_classify_text(text)
+        stages.lap('ml')
+        
+        # Step 6: Fact-checking
+        fact_check = fact_check_claim(text, url, features)
+        stages.lap('fact_check')
+        
+        # Step 7: Semantic similarity
+        similarity = check_semantic_similarity(text, features)
+        stages.lap('similarity')
+    
+    return {
         'keyword_count': keyword_count,
-        'pattern_score': round(pattern_score, 2),
-        'source_reliability': source_level,
+        'matched_keywords': matched_keywords,
+        'pattern_score': pattern_score,
+        'pattern_details': pattern_details,
+        'source_level': source_level,
+        'source_details': source_details,
         'sentiment': sentiment_scores,
         'readability': readability,
-        'ml_classification': ml_result,
+        'ml_result': ml_result,
         'fact_check': fact_check,
-        'similarity_check': similarity,
-        'final_score': round(fake_score, 2)
+        'similarity': similarity,
+        'skipped': skipped,
+        'degraded': degraded
     }
+
+def _finish_detection(analysis, fake_score, result, confidence, stages, timings=None, parts=RESULT_PARTS):
+    """Step 10 and the response: explanation, stage metrics and detailed breakdown (as far as requested)"""
+    response = {'result': result, 'confidence': round(confidence, 2)}
     
-    return {
-        'result': result,
-        'confidence': round(confidence, 2),
-        'explanation': explanation,
-        'source_credibility': source_level,
-        'details': details
+    # Step 10: Generate comprehensive explanation
+    if 'explanation' in parts:
+        response['explanation'] = generate_explanation(
+            analysis['keyword_count'], analysis['matched_keywords'], analysis['pattern_score'],
+            analysis['pattern_details'], analysis['source_level'], analysis['source_details'],
+            analysis['sentiment'], analysis['readability'], analysis['ml_result'],
+            analysis['fact_check'], analysis['similarity']
+        )
+        stages.lap('explanation')
+    for stage, seconds in stages.times.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    if timings is not None:
+        timings.update(stages.times)
+    
+    response['source_credibility'] = analysis['source_level']
+    if analysis['degraded']:
+        response['degraded'] = True
+    if 'details' not in parts:
+        return response
+    
+    # Prepare detailed breakdown
+    details = {
+        'keyword_count': analysis['keyword_count'],
+        'pattern_score': round(analysis['pattern_score'], 2),
+        'source_reliability': analysis['source_level'],
+        'sentiment': analysis['sentiment'],
+        'readability': analysis['readability'],
+        'ml_classification': analysis['ml_result'],
+        'fact_check': analysis['fact_check'],
+        'similarity_check': analysis['similarity'],
+        'final_score': round(fake_score, 2)
     }
+    if analysis['skipped'] is not None:
+        details['cascade'] = {'skipped': analysis['skipped']}
+    if analysis['degraded']:
+        details['degraded'] = {'skipped': analysis['degraded']}
+    
+    response['details'] = details
+    return response
+
+def _run_cascade_stages(text, url, features, keyword_count, pattern_score, source_level, ml_result, stages,
+                        deadline=None):
+    """
+    Steps 4-7 in cascade order
+    The cheap rule stages run first; readability, VADER and the transformer
+    (cheapest first) then run only while the score bounds still span
+    more than one verdict. Skipped stages add no points, which keeps the
+    score inside the bounds and the verdict unchanged. A transformer pass
+    that is still needed but would overrun the deadline is skipped as
+    degraded.
+    Returns: (sentiment, readability, ml_result, fact_check, similarity,
+              skipped stage names, degraded stage names or None)
+    """
+    skip_ml = ml_result is _ML_DEGRADED
+    if skip_ml:
+        ml_result = _ML_NOT_RUN
+
+    fact_check = fact_check_claim(text, url, features)
+    stages.lap('fact_check')
+    similarity = check_semantic_similarity(text, features)
+    stages.lap('similarity')
+    
+    # Stages that cost nothing here (libraries not loaded, ML result given)
+    # run as usual and contribute their exact points to the bounds
+    sentiment_scores = readability = None
+    if not _readability_is_costly():
+        readability = analyze_readability(text)
+        stages.lap('readability')
+    if not _sentiment_is_costly():
+        sentiment_scores = analyze_sentiment(text, features)
+        stages.lap('sentiment')
+    if ml_result is _ML_NOT_RUN and not _ml_is_costly():
+        ml_result = None
+    
+    def ranges():
+        sentiment = (sentiment_points_range(keyword_count) if sentiment_scores is None
+                     else (sentiment_points(sentiment_scores, keyword_count),) * 2)
+        readability_range = (READABILITY_POINTS_RANGE if readability is None
+                             else (readability_points(readability),) * 2)
+        ml = ML_POINTS_RANGE if ml_result is _ML_NOT_RUN else (ml_points(ml_result),) * 2
+        return sentiment, readability_range, ml
+    
+    def settled():
+        return verdict_settled(keyword_count, pattern_score, source_level, fact_check, similarity, *ranges())
+    
+    if readability is None and not settled():
+        readability = analyze_readability(text)
+        stages.lap('readability')
+    if sentiment_scores is None and not settled():
+        sentiment_scores = analyze_sentiment(text, features)
+        stages.lap('sentiment')
+    degraded = None
+    if ml_result is _ML_NOT_RUN and not settled():
+        if not skip_ml and ml_fits_deadline(deadline, ('scoring', 'explanation')):
+            ml_result = ml_classify_text(text)
+            stages.lap('ml')
+        else:
+            ml_result, degraded = None, ['ml']
+            DEGRADED.inc(stage='ml')
+    
+    skipped = []
+    if readability is None:
+        skipped.append('readability')
+    if sentiment_scores is None:
+        skipped.append('sentiment')
+    if ml_result is _ML_NOT_RUN:
+        skipped.append('ml')
+        ml_result = None
+    for stage in skipped:
+        CASCADE_SKIPPED.inc(stage=stage)
+    return sentiment_scores, readability, ml_result, fact_check, similarity, skipped, degraded
+
+def detect_fake_news_batch(items, batch_size=None, fields=None):
+    """
+    Score a list of {text, url} items
+    Rule stages run per item; the transformer sees all texts in batches.
+    fields: response fields to return for every item (as in detect_fake_news)
+    Returns: list of results in input order, {'error': ...} for bad items
+    """
+    if ML_AVAILABLE and sentiment_analyzer is None:
+        initialize_models()
+    
+    parts = result_parts(fields)
+    rules = current_rules()  # The same rules for every item
+    results = [None] * len(items)
+    to_classify = []  # (index, text, url)
+    
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i] = {'error': 'Item must be an object with "text"'}
+            continue
+        text = item.get('text', '')
+        if not text or not isinstance(text, str):
+            results[i] = {'error': 'Text is required'}
+            continue
+        to_classify.append((i, text, item.get('url', None)))
+    
+    # Short texts and cached results never reach the model
+    # (and, in cascade mode, texts whose verdict the model cannot change)
+    ml_indices = [k for k, (_, text, url) in enumerate(to_classify)
+                  if not is_too_short(text) and not is_cached(_lookup_key(text, url, parts, rules))
+                  and ml_could_change_verdict(text, url, rules)]
+    ml_results = ml_classify_texts([to_classify[k][1] for k in ml_indices], batch_size)
+    ml_by_item = dict(zip(ml_indices, ml_results))
+    
+    # Stages run per item; scoring and verdicts for the whole batch are
+    # one vectorized pass over a feature matrix
+    from vector_scoring import feature_row, score_rows
+    
+    queued = []   # (index, position in to_classify, cache key)
+    pending = []  # (index, cache key, analysis, stage clock)
+    for k, (i, text, url) in enumerate(to_classify):
+        try:
+            started = time.perf_counter()
+            INPUT_CHARS.observe(len(text))
+            cache_key = _lookup_key(text, url, parts, rules)
+            cached = cached_result(cache_key)
+            if cached is not None:
+                results[i] = cached
+                REQUESTS_BY_VERDICT.inc(verdict=cached['result'], cached='true')
+                DETECTION_SECONDS.observe(time.perf_counter() - started)
+            elif is_too_short(text):
+                results[i] = _too_short_result()
+                remember_result(cache_key, results[i], rules)
+                REQUESTS_BY_VERDICT.inc(verdict=results[i]['result'], cached='false')
+                DETECTION_SECONDS.observe(time.perf_counter() - started)
+            else:
+                queued.append((i, k, cache_key))
+        except Exception as e:
+            print(f"Error in batch item {i}: {e}")
+            results[i] = {'error': str(e)}
+    
+    # Sentiment of every remaining text in one engine call (in cascade mode
+    # it runs per item, only where it can still move the verdict)
+    features = [get_text_features(to_classify[k][1], rules) for _, k, _ in queued]
+    sentiments = [None] * len(queued)
+    sentiment_share = None
+    if queued and not CASCADE_MODE and _sentiment_is_costly():
+        sentiment_started = time.perf_counter()
+        sentiments = analyze_sentiment_many([to_classify[k][1] for _, k, _ in queued], features)
+        sentiment_share = (time.perf_counter() - sentiment_started) / len(queued)
+    
+    for (i, k, cache_key), text_features, sentiment_scores in zip(queued, features, sentiments):
+        try:
+            _, text, url = to_classify[k]
+            stages = StageClock()
+            if sentiment_share is not None:
+                stages.record('sentiment', sentiment_share)
+            analysis = _analyze(text, url, ml_by_item.get(k, _ML_NOT_RUN), stages,
+                                text_features, sentiment_scores, rules=rules)
+            pending.append((i, cache_key, analysis, stages))
+        except Exception as e:
+            print(f"Error in batch item {i}: {e}")
+            results[i] = {'error': str(e)}
+    
+    scoring_started = time.perf_counter()
+    scored = score_rows([
+        feature_row(a['keyword_count'], a['pattern_score'], a['source_level'], a['sentiment'],
+                    a['readability'], a['ml_result'], a['fact_check'], a['similarity'])
+        for _, _, a, _ in pending
+    ])
+    scoring_share = (time.perf_counter() - scoring_started) / len(pending) if pending else 0.0
+    
+    for (i, cache_key, analysis, stages), (fake_score, result, confidence) in zip(pending, scored):
+        try:
+            stages.record('scoring', scoring_share)
+            results[i] = _finish_detection(analysis, fake_score, result, confidence, stages, parts=parts)
+            remember_result(cache_key, results[i], rules)
+            REQUESTS_BY_VERDICT.inc(verdict=result, cached='false')
+            DETECTION_SECONDS.observe(sum(stages.times.values()))
+        except Exception as e:
+            print(f"Error in batch item {i}: {e}")
+            results[i] = {'error': str(e)}
+    
+    return [select_fields(r, fields) for r in results]
+
+# ====================================================
+# RESPONSES
+# ====================================================
+
+# Prediction responses are encoded with orjson when it is installed
+# (JSON_ENCODER=stdlib keeps Flask's jsonify) and compressed with Brotli
+# or gzip, as the client's Accept-Encoding allows, from COMPRESS_MIN_BYTES up
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "orjson" if orjson is not None else "stdlib").lower()
+RESPONSE_COMPRESSION = os.environ.get("RESPONSE_COMPRESSION", "1") == "1"
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 512))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 4))
+
+def json_response(payload, status=200):
+    """Encode (and, if accepted and worth it, compress) a JSON response"""
+    if JSON_ENCODER == 'orjson' and orjson is not None:
+        response = app.response_class(dump_json(payload), status=status, mimetype='application/json')
+    else:
+        response = jsonify(payload)
+        response.status_code = status
+    
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding')) if RESPONSE_COMPRESSION else None
+    if encoding and response.content_length >= COMPRESS_MIN_BYTES:
+        response.set_data(compress(response.get_data(), encoding, GZIP_LEVEL, BROTLI_QUALITY))
+        response.headers['Content-Encoding'] = encoding
+    if RESPONSE_COMPRESSION:
+        response.vary.add('Accept-Encoding')
+    RESPONSE_BYTES.observe(response.content_length, encoding=response.headers.get('Content-Encoding', 'identity'))
+    return response
+
+def requested_fields(data, args):
+    """Response fields from `fields` / `verbose` in the query string (args), else in the JSON body"""
+    return parse_fields(args.get('fields', data.get('fields')), args.get('verbose', data.get('verbose')))
+
+# Request validation shared by the Flask views and the async server
+# (asgi_app.py); a ValueError carries the message for a 400 response
+
+def predict_args(data, args, headers):
+    """(text, url, fields, deadline) of a /predict request"""
+    if not data:
+        raise ValueError('No data provided')
+    
+    text = data.get('text', '')
+    url = data.get('url', None)
+    
+    if not text and not (url and ARTICLE_FETCH):
+        raise ValueError('Text is required' if not ARTICLE_FETCH else 'Text or url is required')
+    
+    return text, url, requested_fields(data, args), request_deadline(data, headers)
+
+def predict_batch_args(data, args):
+    """(items, batch_size, fields) of a /predict_batch request"""
+    if not data:
+        raise ValueError('No data provided')
+    
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        raise ValueError('Items must be a non-empty list')
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f'Too many items (max {MAX_BATCH_ITEMS})')
+    
+    batch_size = data.get('batch_size')
+    if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+        raise ValueError('batch_size must be a positive integer')
+    
+    return items, batch_size, requested_fields(data, args)
 
 # ====================================================
 # API ENDPOINTS
@@ -677,41 +1875,102 @@ def detect_fake_news(text, url=None):
 def health_check():
     """Health check endpoint"""
     ml_status = "available" if (ML_AVAILABLE and fake_news_classifier is not None) else "unavailable"
+    rules = current_rules()
     return jsonify({
         'status': 'ok',
         'service': 'advanced-fake-news-detection',
-        'ml_models': ml_status
+        'ml_models': ml_status,
+        'ml_backend': ml_backend_in_use,
+        'ml_threads': ML_THREADS,
+        'model_loads': MODEL_REGISTRY.stats(),
+        'rules_version': rules_version(rules),
+        'rule_pack': rules.pack.info() if rules.pack is not None else None,
+        'cache': RESULT_CACHE.stats(),
+        'verdict_store': VERDICT_STORE.stats() if VERDICT_STORE is not None else None,
+        'stage_cost_ms': STAGE_COSTS.snapshot(),
+        'article_fetcher': ARTICLE_FETCHER.stats() if ARTICLE_FETCH else None,
+        'micro_batching': ML_BATCHER.stats() if ML_BATCHER is not None else None
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return METRICS.render(), 200, {'Content-Type': METRICS_CONTENT_TYPE}
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: 200 only after the warm-up inference has finished"""
+    ready = models_ready.is_set()
+    ml_status = "available" if (ML_AVAILABLE and fake_news_classifier is not None) else "unavailable"
+    return jsonify({
+        'ready': ready,
+        'ml_models': ml_status
+    }), (200 if ready else 503)
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """
     Main prediction endpoint
-    Expected input: { "text": "...", "url": "..." (optional) }
-    Returns: { "result": "...", "confidence": ..., "explanation": "...", "details": {...} }
+    Expected input: { "text": "...", "url": "..." (optional; alone, the article at the URL is scored),
+                      "fields": "result,confidence" or "verbose": false (optional, also as query parameters),
+                      "latency_budget_ms": 200 (optional, or the X-Latency-Budget-Ms header) }
+    Returns: { "result": "...", "confidence": ..., "explanation": "...", "details": {...} },
+             plus "degraded": true when the ML stage was skipped to meet the budget
+             and "article": {...} when the text was fetched from the url
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        text = data.get('text', '')
-        url = data.get('url', None)
+        try:
+            text, url, fields, deadline = predict_args(request.get_json(), request.args, request.headers)
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
         
+        article = None
         if not text:
-            return jsonify({'error': 'Text is required'}), 400
+            try:
+                article = fetch_article(url, deadline)
+            except FetchError as e:
+                return json_response({'error': str(e)}, e.status)
+            text = article.text
         
         # Perform detection
-        result = detect_fake_news(text, url)
+        result = detect_fake_news(text, url, fields=fields, deadline=deadline)
+        if article is not None:
+            result = with_article(result, article, fields)
         
-        return jsonify(result), 200
+        return json_response(result)
     
     except Exception as e:
         import traceback
         print(f"Error in prediction: {e}")
         print(traceback.format_exc())
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Batch prediction endpoint
+    Expected input: { "items": [{ "text": "...", "url": "..." }, ...], "batch_size": 16 (optional),
+                      "fields" / "verbose" (optional, as for /predict) }
+    Returns: { "results": [...], "count": ... } in input order, per-item errors inline
+    """
+    try:
+        try:
+            items, batch_size, fields = predict_batch_args(request.get_json(), request.args)
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        
+        results = detect_fake_news_batch(items, batch_size, fields)
+        
+        return json_response({'results': results, 'count': len(results)})
+    
+    except Exception as e:
+        import traceback
+        print(f"Error in batch prediction: {e}")
+        print(traceback.format_exc())
+        return json_response({'error': str(e)}, 500)
+
+if PRELOAD_MODELS:
+    preload_models()
 
 # ====================================================
 # RUN SERVER
@@ -728,7 +1987,8 @@ if __name__ == '__main__':
         initialize_models()
     else:
         print("ML libraries not available. Using rule-based detection only.")
-        print("To enable ML features, install: pip install transformers torch textstat nltk")
+        print("To enable ML features, install: pip install transformers torch pyphen nltk")
+    warm_up_models()
 
     port = int(os.environ.get("PORT", 10000))  # 👈 IMPORTANT LINE
     print(f"Service running on port {port}")
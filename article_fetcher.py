@@ -0,0 +1,491 @@
+# ====================================================
+# ARTICLE FETCHER
+# ====================================================
+# Fetches a news article by URL for URL-only scoring
+# and extracts its text.
+#
+# - One pooled requests.Session per process
+#   (keep-alive), with a cap on concurrent fetches per
+#   host, connect/read timeouts and an overall time
+#   limit per fetch (a site trickling its body out
+#   cannot hold a thread past it).
+# - Extracted articles are cached per URL: reused
+#   without a request while fresh, then revalidated
+#   with a conditional GET (If-None-Match /
+#   If-Modified-Since); a 304 reuses the cached text.
+# - Only http(s) URLs are fetched, responses are
+#   capped at max_bytes, and hosts resolving to
+#   private, loopback or link-local addresses are
+#   refused unless allow_private_hosts is set (this
+#   is checked on every redirect as well). As the
+#   host is resolved again to connect, the address
+#   actually connected to is checked too, before
+#   anything is sent (no DNS rebinding).
+# ====================================================
+
+import os
+import re
+import socket
+import ipaddress
+import threading
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+TEXT_TYPES = HTML_TYPES + ('text/plain',)
+
+# Elements whose text is never part of the article
+SKIP_TAGS = frozenset({'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form',
+                       'svg', 'iframe', 'button', 'template', 'select'})
+BLOCK_TAGS = frozenset({'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote', 'pre', 'div',
+                        'section', 'article', 'main', 'br', 'tr', 'td', 'figcaption'})
+# Paragraphs outside <article> shorter than this are taken for boilerplate
+MIN_PARAGRAPH_CHARS = 40
+MIN_ARTICLE_CHARS = 200
+WHITESPACE = re.compile(r'\s+')
+CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+
+
+class FetchError(Exception):
+    """A URL that could not be turned into article text
+
+    status: HTTP status for the API response (400 bad URL, 422 no article
+    text, 502 upstream failure, 503 host busy, 504 timeout).
+    """
+
+    def __init__(self, message, status=502):
+        super().__init__(message)
+        self.status = status
+
+
+class Article:
+    __slots__ = ('url', 'title', 'text', 'etag', 'last_modified', 'fetched_at', 'source')
+
+    def __init__(self, url, title, text, etag=None, last_modified=None, fetched_at=0.0, source='network'):
+        self.url = url
+        self.title = title
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.source = source  # 'network', 'revalidated' (304) or 'cache'
+
+    def info(self):
+        return {'url': self.url, 'title': self.title, 'chars': len(self.text), 'source': self.source}
+
+
+# ====================================================
+# TEXT EXTRACTION
+# ====================================================
+
+class _ArticleParser(HTMLParser):
+    """Collects the title, paragraphs (noting which are inside <article>) and all visible text blocks"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.article_depth = 0
+        self.in_title = False
+        self.title_parts = []
+        self.meta_title = None
+        self.paragraph = None
+        self.paragraphs = []  # (text, inside <article>)
+        self.block = []
+        self.blocks = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == 'title':
+            self.in_title = True
+        elif tag == 'meta' and self.meta_title is None:
+            attrs = dict(attrs)
+            if attrs.get('property') == 'og:title' and attrs.get('content'):
+                self.meta_title = attrs['content']
+        if tag == 'article':
+            self.article_depth += 1
+        if tag in BLOCK_TAGS:
+            self._end_block()
+        if tag == 'p':
+            self._end_paragraph()
+            self.paragraph = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == 'title':
+            self.in_title = False
+        if tag == 'p':
+            self._end_paragraph()
+        if tag in BLOCK_TAGS:
+            self._end_block()
+        if tag == 'article':
+            self._end_paragraph()
+            self.article_depth = max(0, self.article_depth - 1)
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title_parts.append(data)
+        elif not self.skip_depth:
+            self.block.append(data)
+            if self.paragraph is not None:
+                self.paragraph.append(data)
+
+    def _end_paragraph(self):
+        if self.paragraph is not None:
+            text = _clean(''.join(self.paragraph))
+            if text:
+                self.paragraphs.append((text, self.article_depth > 0))
+            self.paragraph = None
+
+    def _end_block(self):
+        text = _clean(''.join(self.block))
+        if text:
+            self.blocks.append(text)
+        self.block = []
+
+    def close(self):
+        super().close()
+        self._end_paragraph()
+        self._end_block()
+
+
+def _clean(text):
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def extract_article(html):
+    """
+    (title, body text) of an HTML page
+    Paragraphs inside <article> when they hold enough text, else the page's
+    longer paragraphs, else every visible text block.
+    """
+    parser = _ArticleParser()
+    parser.feed(html)
+    parser.close()
+    title = _clean(parser.meta_title or ''.join(parser.title_parts))
+
+    in_article = [text for text, inside in parser.paragraphs if inside]
+    if sum(map(len, in_article)) >= MIN_ARTICLE_CHARS:
+        paragraphs = in_article
+    else:
+        paragraphs = [text for text, _ in parser.paragraphs if len(text) >= MIN_PARAGRAPH_CHARS]
+        if not paragraphs:
+            paragraphs = parser.blocks
+    return title, '\n\n'.join(paragraphs)
+
+
+def article_text(title, body):
+    """Text to score: the headline (often the most telling part) and the body"""
+    if title and not body.startswith(title):
+        return f"{title}\n\n{body}" if body else title
+    return body
+
+# ====================================================
+# FETCHER
+# ====================================================
+
+def _is_public_address(address):
+    return ipaddress.ip_address(address.split('%')[0]).is_global
+
+
+def _is_public_host(host):
+    """Does every address the host resolves to lie in public address space?"""
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except socket.gaierror:
+        return False
+    return all(_is_public_address(info[4][0]) for info in infos)
+
+
+def _public_only_adapter(**kwargs):
+    """
+    requests adapter whose connections refuse a peer outside public
+    address space (checked on the connected socket, before the request
+    or TLS handshake is sent)
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def checked(sock):
+        address = sock.getpeername()[0]
+        if not _is_public_address(address):
+            sock.close()
+            raise FetchError(f"Refusing to fetch from non-public address {address}", 400)
+        return sock
+
+    class PublicHTTPConnection(HTTPConnection):
+        def _new_conn(self):
+            return checked(super()._new_conn())
+
+    class PublicHTTPSConnection(HTTPSConnection):
+        def _new_conn(self):
+            return checked(super()._new_conn())
+
+    class PublicHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = PublicHTTPConnection
+
+    class PublicHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = PublicHTTPSConnection
+
+    class PublicOnlyAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **pool_kwargs):
+            super().init_poolmanager(*args, **pool_kwargs)
+            self.poolmanager.pool_classes_by_scheme = {'http': PublicHTTPConnectionPool,
+                                                       'https': PublicHTTPSConnectionPool}
+
+    return PublicOnlyAdapter(**kwargs)
+
+
+class ArticleFetcher:
+    """Pooled, cached article fetcher
+
+    max_per_host: concurrent fetches per host; more wait up to the timeout.
+    timeout: (connect, read) seconds for each request.
+    max_seconds: overall seconds per fetch, redirects and body included.
+    max_bytes: response bodies are cut off at this size.
+    cache_size / fresh_seconds: URLs whose extracted text is kept, and how
+    long an entry is reused before it is revalidated.
+    """
+
+    def __init__(self, max_per_host=4, timeout=(3.05, 10.0), max_seconds=15.0, max_bytes=2 * 1024 * 1024,
+                 cache_size=1000, fresh_seconds=60.0, max_redirects=5, allow_private_hosts=False,
+                 user_agent="fake-news-detector/1.0 (+article fetcher)"):
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.cache_size = cache_size
+        self.fresh_seconds = fresh_seconds
+        self.max_redirects = max_redirects
+        self.allow_private_hosts = allow_private_hosts
+        self.user_agent = user_agent
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._pid = None
+        self._host_slots = {}  # host -> [semaphore, fetches holding or waiting for it]
+        self._cache = OrderedDict()  # url -> Article
+
+        # Metrics
+        self.outcomes = {'network': 0, 'revalidated': 0, 'cache': 0, 'error': 0}
+
+    # ------------------------------------------------
+    # Session and host limits
+    # ------------------------------------------------
+
+    def _get_session(self):
+        # Pooled connections must not be shared across a fork
+        if self._session is not None and self._pid == os.getpid():
+            return self._session
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                if self.allow_private_hosts:
+                    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=self.max_per_host)
+                else:
+                    adapter = _public_only_adapter(pool_connections=64, pool_maxsize=self.max_per_host)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = self.user_agent
+                session.headers['Accept'] = 'text/html,application/xhtml+xml,text/plain;q=0.8'
+                self._session = session
+                self._pid = os.getpid()
+                self._host_slots = {}
+        return self._session
+
+    def _enter_host(self, host, timeout):
+        """Take one of the host's fetch slots; False if none frees up in time"""
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = [threading.BoundedSemaphore(self.max_per_host), 0]
+            slot[1] += 1
+        if slot[0].acquire(timeout=timeout):
+            return True
+        self._leave_host(host, release=False)
+        return False
+
+    def _leave_host(self, host, release=True):
+        with self._lock:
+            slot = self._host_slots[host]
+            if release:
+                slot[0].release()
+            slot[1] -= 1
+            if not slot[1]:
+                # Only hosts being fetched keep an entry
+                del self._host_slots[host]
+
+    # ------------------------------------------------
+    # Cache
+    # ------------------------------------------------
+
+    def _cached(self, url):
+        with self._lock:
+            article = self._cache.get(url)
+            if article is not None:
+                self._cache.move_to_end(url)
+            return article
+
+    def _store(self, url, article):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[url] = article
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    # ------------------------------------------------
+    # Fetching
+    # ------------------------------------------------
+
+    def _check_url(self, url):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise FetchError(f"Not an http(s) URL: {url}", 400)
+        if not self.allow_private_hosts and not _is_public_host(parsed.hostname):
+            raise FetchError(f"Refusing to fetch from non-public host {parsed.hostname}", 400)
+        return parsed.hostname
+
+    def fetch(self, url, timeout=None):
+        """
+        Article at the URL (cached, revalidated or freshly fetched)
+        timeout: overall seconds allowed (caps max_seconds and the read
+                 timeout), e.g. what is left of a request's latency budget
+        Raises FetchError.
+        """
+        try:
+            return self._fetch(url, timeout)
+        except FetchError:
+            self.outcomes['error'] += 1
+            raise
+
+    def _fetch(self, url, timeout):
+        cached = self._cached(url)
+        if cached is not None and time.monotonic() - cached.fetched_at < self.fresh_seconds:
+            self.outcomes['cache'] += 1
+            return _with_source(cached, 'cache')
+
+        import requests
+        from urllib3.exceptions import HTTPError as ReadError, TimeoutError as ReadTimeout
+        connect_timeout, read_timeout = self.timeout
+        limit = self.max_seconds if timeout is None else min(timeout, self.max_seconds)
+        if limit <= 0:
+            raise FetchError("No time left to fetch the article", 504)
+        deadline = time.monotonic() + limit
+
+        headers = {}
+        # Only validators the URL itself answered with (not a redirect target's)
+        if cached is not None and cached.url == url:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        session = self._get_session()
+        current = url
+        for _ in range(self.max_redirects + 1):
+            host = self._check_url(current)
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise FetchError(f"Timed out fetching {current}", 504)
+            if not self._enter_host(host, min(connect_timeout, left)):
+                raise FetchError(f"Too many concurrent fetches for {host}", 503)
+            try:
+                # Validators belong to the cached URL: never sent to a redirect target
+                response = session.get(current, headers=headers if current == url else None,
+                                       timeout=(min(connect_timeout, left), min(read_timeout, left)),
+                                       stream=True, allow_redirects=False)
+                try:
+                    if response.is_redirect:
+                        location = response.headers.get('Location')
+                        current = urljoin(current, location)
+                        continue
+                    if response.status_code == 304 and cached is not None and current == url:
+                        cached.fetched_at = time.monotonic()
+                        self.outcomes['revalidated'] += 1
+                        return _with_source(cached, 'revalidated')
+                    article = self._read_article(current, response, deadline)
+                finally:
+                    response.close()
+            except (requests.Timeout, ReadTimeout):
+                raise FetchError(f"Timed out fetching {current}", 504) from None
+            except (requests.RequestException, ReadError) as e:
+                raise FetchError(f"Could not fetch {current}: {e}", 502) from None
+            finally:
+                self._leave_host(host)
+            if 'no-store' not in response.headers.get('Cache-Control', ''):
+                self._store(url, article)
+            self.outcomes['network'] += 1
+            return article
+        raise FetchError(f"Too many redirects fetching {url}", 502)
+
+    def _read_body(self, url, response, deadline):
+        """The body up to max_bytes, read before the deadline (504 after it)"""
+        # One socket read at a time (read1, urllib3 2), each allowed only
+        # what is left, so a body trickling in never outlasts the deadline.
+        # urllib3 1.26's read() would wait for a whole chunk instead.
+        raw = response.raw
+        sock = getattr(raw.connection, 'sock', None)
+        chunks, size = [], 0
+        while size < self.max_bytes:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise FetchError(f"Timed out reading {url}", 504)
+            if sock is not None:
+                sock.settimeout(min(left, self.timeout[1]))
+            chunk = raw.read1(64 * 1024, decode_content=True)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return b''.join(chunks)[:self.max_bytes]
+
+    def _read_article(self, url, response, deadline):
+        if response.status_code != 200:
+            raise FetchError(f"{url} returned HTTP {response.status_code}", 502)
+        content_type, _, params = response.headers.get('Content-Type', 'text/html').partition(';')
+        content_type = content_type.strip().lower()
+        if content_type not in TEXT_TYPES:
+            raise FetchError(f"{url} is not an HTML or text page ({content_type})", 422)
+
+        # No charset given: UTF-8 (requests would assume ISO-8859-1 for text/*)
+        raw = self._read_body(url, response, deadline)
+        charset = CHARSET.search(params)
+        try:
+            body = raw.decode(charset.group(1) if charset else 'utf-8', errors='replace')
+        except LookupError:
+            body = raw.decode('utf-8', errors='replace')
+
+        if content_type in HTML_TYPES:
+            title, text = extract_article(body)
+        else:
+            title, text = '', _clean(body)
+        text = article_text(title, text)
+        if not text:
+            raise FetchError(f"No article text found at {url}", 422)
+        return Article(url, title, text, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                       time.monotonic())
+
+    def stats(self):
+        return {
+            'cached_urls': len(self._cache),
+            'cache_size': self.cache_size,
+            'max_per_host': self.max_per_host,
+            'fetches': dict(self.outcomes)
+        }
+
+
+def _with_source(article, source):
+    return Article(article.url, article.title, article.text, article.etag, article.last_modified,
+                   article.fetched_at, source)
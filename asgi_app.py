@@ -0,0 +1,316 @@
+# ====================================================
+# ASYNC SERVING MODE (ASGI)
+# ====================================================
+# Production entry point for an ASGI server:
+#   gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi_app:app
+#   python asgi_app.py          (single uvicorn process)
+#
+# /predict and /predict_batch are served here.
+# Requests pass admission control on the event loop
+# first (admission.py): MAX_IN_FLIGHT run at once, up
+# to MAX_QUEUE_DEPTH more wait at most QUEUE_TIMEOUT_MS,
+# the rest get 429 / 503 with Retry-After right away.
+# Detection itself (rule stages, transformer and whole
+# batches) runs on a bounded thread pool of
+# INFERENCE_WORKERS threads, so the loop stays free.
+# A request's latency budget (see app.py) runs from
+# its arrival, so time spent waiting for a slot or a
+# pool thread is taken out of it.
+# URL-only requests fetch their article on a separate
+# pool of FETCH_WORKERS threads, so slow sites do not
+# hold up inference. Every other route is passed to
+# the Flask app unchanged.
+# ====================================================
+
+import os
+import sys
+import io
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+import app as service
+from admission import AdmissionControl, Overloaded
+from article_fetcher import FetchError
+from response_format import negotiate_encoding, compress, dumps as dump_json, orjson
+
+MAX_IN_FLIGHT = int(os.environ.get("MAX_IN_FLIGHT", 8))
+MAX_QUEUE_DEPTH = int(os.environ.get("MAX_QUEUE_DEPTH", 32))
+QUEUE_TIMEOUT_MS = float(os.environ.get("QUEUE_TIMEOUT_MS", 1000))
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", 2 * 1024 * 1024))
+# Forward passes already use every core (ML_THREADS), so more workers only
+# help when they wait on the micro-batcher instead of computing
+INFERENCE_WORKERS = int(os.environ.get(
+    "INFERENCE_WORKERS", service.ML_BATCH_SIZE if service.ML_BATCHER is not None else 1))
+# Fetch threads mostly wait on the network
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", 16))
+
+ADMISSION = AdmissionControl(MAX_IN_FLIGHT, MAX_QUEUE_DEPTH, QUEUE_TIMEOUT_MS / 1000.0)
+EXECUTOR = ThreadPoolExecutor(max_workers=max(1, INFERENCE_WORKERS), thread_name_prefix="inference")
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, FETCH_WORKERS), thread_name_prefix="fetch")
+
+# ====================================================
+# METRICS
+# ====================================================
+
+REQUESTS_SHED = service.METRICS.counter(
+    'fakenews_requests_shed_total', 'Requests turned away by admission control', ['reason'])
+ADMISSION_WAIT_SECONDS = service.METRICS.histogram(
+    'fakenews_admission_wait_seconds', 'Time admitted requests waited for a slot')
+service.METRICS.gauge('fakenews_requests_in_flight', 'Requests being processed',
+                      lambda: ADMISSION.in_flight)
+service.METRICS.gauge('fakenews_admission_queue_depth', 'Requests waiting for a slot',
+                      lambda: ADMISSION.queue_depth)
+
+# ====================================================
+# HTTP HELPERS
+# ====================================================
+
+class BodyTooLarge(Exception):
+    pass
+
+
+async def read_body(receive, limit=None):
+    """Request body bytes; raises BodyTooLarge past `limit` bytes"""
+    limit = MAX_BODY_BYTES if limit is None else limit
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            raise BodyTooLarge()
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+def request_headers(scope):
+    """{lowercase header name: value}"""
+    return {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope.get('headers', ())}
+
+
+def query_args(scope):
+    return dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+
+
+def parse_json(body):
+    """JSON object of a request body (None if missing or invalid)"""
+    try:
+        data = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def send_response(send, status, body, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.encode('latin-1'), str(value).encode('latin-1')) for name, value in headers]
+                   + [(b'content-length', str(len(body)).encode('latin-1'))],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, payload, status=200, accept_encoding=None, headers=()):
+    """JSON response encoded and compressed as app.json_response does"""
+    body = dump_json(payload)
+    headers = [('content-type', 'application/json')] + list(headers)
+    if service.RESPONSE_COMPRESSION:
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding and len(body) >= service.COMPRESS_MIN_BYTES:
+            body = compress(body, encoding, service.GZIP_LEVEL, service.BROTLI_QUALITY)
+            headers.append(('content-encoding', encoding))
+        else:
+            encoding = None
+        headers.append(('vary', 'Accept-Encoding'))
+    else:
+        encoding = None
+    service.RESPONSE_BYTES.observe(len(body), encoding=encoding or 'identity')
+    await send_response(send, status, body, headers)
+
+# ====================================================
+# PREDICTION
+# ====================================================
+
+def _needs_inference(text, url, fields, rules=None):
+    """Would detect_fake_news run the transformer for this request?"""
+    if not service._ml_is_costly() or service.is_too_short(text):
+        return False
+    key = service._lookup_key(text, url, service.result_parts(fields), rules)
+    return not service.is_cached(key) and service.ml_could_change_verdict(text, url, rules)
+
+
+def detect(text, url, fields, deadline, submitted):
+    """detect_fake_news on an EXECUTOR thread, skipping the transformer when it would overrun the budget"""
+    rules = service.current_rules()  # Read once: the ML decision and detection see the same rules
+    ml_result = service._ML_NOT_RUN
+    if service.models_ready.is_set() or not service.ML_AVAILABLE:
+        if _needs_inference(text, url, fields, rules):
+            if service.ml_fits_deadline(deadline):
+                ml_result = service.ml_classify_text(text)
+                # Time in the pool queue counts: it is what the next request will wait too
+                service.STAGE_COSTS.observe('ml', time.perf_counter() - submitted)
+            else:
+                ml_result = service._ML_DEGRADED
+    return service.detect_fake_news(text, url, ml_result, fields, deadline, rules)
+
+
+async def predict(text, url, fields, deadline):
+    loop = asyncio.get_running_loop()
+    if not text:
+        article = await loop.run_in_executor(FETCH_EXECUTOR, service.fetch_article, url, deadline)
+        result = await predict(article.text, url, fields, deadline)
+        return service.with_article(result, article, fields)
+    # Every stage (cache and store reads included) runs off the event loop
+    return await loop.run_in_executor(EXECUTOR, detect, text, url, fields, deadline, time.perf_counter())
+
+
+async def predict_batch(items, batch_size, fields):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTOR, service.detect_fake_news_batch, items, batch_size, fields)
+
+
+async def handle_prediction(scope, receive, send, path):
+    headers = request_headers(scope)
+    accept_encoding = headers.get('accept-encoding')
+    try:
+        body = await read_body(receive)
+    except BodyTooLarge:
+        await send_json(send, {'error': f'Request body too large (max {MAX_BODY_BYTES} bytes)'}, 413, accept_encoding)
+        return
+    try:
+        data = parse_json(body) or {}
+        if path == '/predict':
+            args = service.predict_args(data, query_args(scope), headers)
+        else:
+            args = service.predict_batch_args(data, query_args(scope))
+    except ValueError as e:
+        await send_json(send, {'error': str(e)}, 400, accept_encoding)
+        return
+
+    try:
+        async with ADMISSION.slot() as waited:
+            ADMISSION_WAIT_SECONDS.observe(waited)
+            if path == '/predict':
+                payload = await predict(*args)
+            else:
+                results = await predict_batch(*args)
+                payload = {'results': results, 'count': len(results)}
+    except Overloaded as e:
+        REQUESTS_SHED.inc(reason=e.reason)
+        await send_json(send, {'error': 'Server overloaded, retry later', 'reason': e.reason},
+                        e.status, accept_encoding, [('retry-after', e.retry_after)])
+        return
+    except FetchError as e:
+        await send_json(send, {'error': str(e)}, e.status, accept_encoding)
+        return
+    except Exception as e:
+        import traceback
+        print(f"Error in prediction: {e}")
+        print(traceback.format_exc())
+        await send_json(send, {'error': str(e)}, 500, accept_encoding)
+        return
+    await send_json(send, payload, 200, accept_encoding)
+
+# ====================================================
+# WSGI BRIDGE (OTHER ROUTES)
+# ====================================================
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in request_headers(scope).items():
+        key = name.upper().replace('-', '_')
+        if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[key] = value
+        else:
+            environ['HTTP_' + key] = value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    """Returns: (status code, [(name, value)], body bytes)"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'], started['headers'] = status, headers
+
+    iterable = wsgi_app(environ, start_response)
+    try:
+        body = b''.join(iterable)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    return int(started['status'].split(' ', 1)[0]), started['headers'], body
+
+
+async def handle_wsgi(scope, receive, send):
+    # Health, readiness and metrics are cheap: served inline, never queued
+    # behind inference
+    try:
+        body = await read_body(receive)
+    except BodyTooLarge:
+        await send_json(send, {'error': f'Request body too large (max {MAX_BODY_BYTES} bytes)'}, 413)
+        return
+    status, headers, body = call_wsgi(service.app, wsgi_environ(scope, body))
+    headers = [(name.lower(), value) for name, value in headers if name.lower() != 'content-length']
+    await send_response(send, status, body, headers)
+
+# ====================================================
+# ASGI APPLICATION
+# ====================================================
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            if not service.models_ready.is_set():
+                service.start_warm_up()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            EXECUTOR.shutdown(wait=False)
+            FETCH_EXECUTOR.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    elif scope['type'] == 'http':
+        if scope['method'] == 'POST' and scope['path'] in ('/predict', '/predict_batch'):
+            await handle_prediction(scope, receive, send, scope['path'])
+        else:
+            await handle_wsgi(scope, receive, send)
+    else:
+        raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get("PORT", 10000)))
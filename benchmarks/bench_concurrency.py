@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress benchmark - model loads and throughput as workers scale
+Starts 1, 2, 4, ... worker processes (each with its ML_THREADS share of the
+cores, as under gunicorn with WEB_CONCURRENCY workers). Inside every worker
+several threads send their first requests at the same moment, then keep
+scoring the test corpus for a fixed time. Reports model loads per worker
+(must be 1, or 0 without ML), total and per-worker throughput.
+Run: python benchmarks/bench_concurrency.py [--workers 1,2,4] [--threads 4] [--seconds 3]
+"""
+
+import sys
+import os
+import argparse
+import multiprocessing
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+def worker(threads, seconds, queue):
+    import app
+    from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+    items = [(e['text'], e['url']) for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES]
+
+    barrier = threading.Barrier(threads)
+    counts = [0] * threads
+
+    def run(index):
+        barrier.wait()
+        # First requests race on model loading
+        app.detect_fake_news(*items[index % len(items)])
+        deadline = time.perf_counter() + seconds
+        done = 0
+        while time.perf_counter() < deadline:
+            text, url = items[done % len(items)]
+            # Uncached, as every request would be for fresh articles
+            app._run_detection(text, url, app._ML_NOT_RUN)
+            done += 1
+        counts[index] = done
+
+    pool = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    queue.put({
+        'items': sum(counts),
+        'loads': sum(entry['loads'] for entry in app.MODEL_REGISTRY.stats().values()),
+        'ml_threads': app.ML_THREADS
+    })
+
+def run_scenario(workers, threads, seconds):
+    os.environ['WEB_CONCURRENCY'] = str(workers)
+    os.environ.pop('ML_THREADS', None)
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    processes = [context.Process(target=worker, args=(threads, seconds, queue)) for _ in range(workers)]
+    for p in processes:
+        p.start()
+    reports = [queue.get() for _ in processes]
+    for p in processes:
+        p.join()
+    return reports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4) if n <= (os.cpu_count() or 1)) or '1')
+    parser.add_argument('--threads', type=int, default=4, help='request threads per worker')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("CONCURRENCY STRESS BENCHMARK")
+    print("=" * 70)
+    print(f"{'workers':>7} {'ML threads':>10} {'loads/worker':>12} {'items/s':>9} {'per worker':>11}")
+    duplicate_loads = False
+    for workers in [int(n) for n in args.workers.split(',')]:
+        reports = run_scenario(workers, args.threads, args.seconds)
+        loads = sorted({r['loads'] for r in reports})
+        duplicate_loads |= any(n > 1 for n in loads)
+        total = sum(r['items'] for r in reports) / args.seconds
+        print(f"{workers:>7} {reports[0]['ml_threads']:>10} {'/'.join(map(str, loads)):>12} "
+              f"{total:>9.1f} {total / workers:>11.1f}")
+    print("\n[FAIL] duplicate model loads" if duplicate_loads else "\n[OK] models loaded at most once per worker")
+    return not duplicate_loads
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Domain index benchmark - lookup time vs list size
+Compares the reversed-label suffix index with the old substring scan.
+Run: python benchmarks/bench_domain_index.py
+"""
+
+import sys
+import os
+import random
+import string
+import tempfile
+import time
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from domain_index import load_domain_list
+
+LIST_SIZES = [100, 10000, 100000, 500000]
+QUERIES = ['news.bbc.co.uk', 'www.example.com', 'a.b.c.d.example.org', 'cheap.org']
+LOOKUPS = 2000
+
+def random_domain(rng):
+    name = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 14)))
+    return f"{name}.{rng.choice(['com', 'net', 'org', 'co.uk', 'info'])}"
+
+def main():
+    rng = random.Random(7)
+
+    print("=" * 70)
+    print(f"DOMAIN INDEX BENCHMARK ({LOOKUPS} lookups per size)")
+    print("=" * 70)
+    print(f"{'domains':>10} {'load (s)':>10} {'index (us/lookup)':>19} {'scan (us/lookup)':>18}")
+
+    for size in LIST_SIZES:
+        domains = [random_domain(rng) for _ in range(size)]
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('\n'.join(domains))
+            path = f.name
+        try:
+            start = time.perf_counter()
+            index = load_domain_list(path)
+            load = time.perf_counter() - start
+        finally:
+            os.remove(path)
+
+        indexed = timeit.timeit(lambda: [index.lookup(q) for q in QUERIES], number=LOOKUPS // len(QUERIES))
+        # The old scan is too slow to repeat on big lists
+        scan_rounds = max(1, (LOOKUPS // len(QUERIES)) // max(1, size // 100))
+        scanned = timeit.timeit(lambda: [[d for d in domains if d in q] for q in QUERIES], number=scan_rounds)
+
+        print(f"{size:>10} {load:>10.2f} {indexed / LOOKUPS * 1e6:>19.2f} "
+              f"{scanned / (scan_rounds * len(QUERIES)) * 1e6:>18.2f}")
+
+if __name__ == '__main__':
+    main()
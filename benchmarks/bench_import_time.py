@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark - cold start and memory of `import app`
+Each scenario runs in a fresh interpreter several times; reports the best
+import wall time, peak RSS and which heavy modules ended up loaded.
+Run: python benchmarks/bench_import_time.py
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RUNS = 5
+HEAVY_MODULES = ('torch', 'transformers', 'nltk', 'textstat', 'pyphen')
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import app
+{extra}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'seconds': elapsed,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'loaded': [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+SCENARIOS = [
+    ('rule-only (RULE_ONLY=1)', {'RULE_ONLY': '1'}, ''),
+    ('default, nothing used yet', {}, ''),
+    ('default + ML libraries loaded', {}, 'app.load_nlp_libraries(); app.load_torch_libraries()'),
+]
+
+def run(env_overrides, extra):
+    env = dict(os.environ, **env_overrides)
+    code = CHILD.format(root=ROOT, extra=extra, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    print("=" * 70)
+    print(f"IMPORT-TIME BENCHMARK (best of {RUNS} fresh interpreters)")
+    print("=" * 70)
+    print(f"{'scenario':<32} {'import (ms)':>12} {'RSS (MB)':>10}  heavy modules loaded")
+    for name, env, extra in SCENARIOS:
+        runs = [run(env, extra) for _ in range(RUNS)]
+        best = min(runs, key=lambda r: r['seconds'])
+        loaded = ', '.join(best['loaded']) or '-'
+        print(f"{name:<32} {best['seconds'] * 1000:>12.1f} {min(r['rss_mb'] for r in runs):>10.1f}  {loaded}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate index benchmark - build time, query latency, memory and file size
+Indexes synthetic 150-word articles drawn from the test examples'
+vocabulary, then queries lightly edited copies of indexed articles and
+unrelated texts.
+Run: python benchmarks/bench_near_duplicate.py [--docs 100000]
+"""
+
+import sys
+import os
+import argparse
+import random
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from near_duplicate import NearDuplicateIndex
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+ARTICLE_WORDS = 150
+
+def vocabulary():
+    words = set()
+    for example in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES:
+        words.update(example['text'].lower().split())
+    return sorted(words)
+
+def article(rng, pool, number):
+    return ' '.join(rng.choice(pool) for _ in range(ARTICLE_WORDS))
+
+def edit(rng, text):
+    """Light edit: drop two words and swap two others"""
+    words = text.split()
+    for _ in range(2):
+        del words[rng.randrange(len(words))]
+        words[rng.randrange(len(words))] = 'allegedly'
+    return ' '.join(words)
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--docs', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = vocabulary()
+    index = NearDuplicateIndex()
+    started = time.perf_counter()
+    texts = {}
+
+    def corpus():
+        for number in range(args.docs):
+            text = article(rng, pool, number)
+            if number % max(1, args.docs // args.queries) == 0:
+                texts[number] = text
+            yield f"doc-{number}", text
+
+    index.add_many(corpus())
+    build = time.perf_counter() - started
+
+    edited = [(f"doc-{n}", edit(rng, t)) for n, t in list(texts.items())[:args.queries]]
+    unrelated = [article(random.Random(n), pool, -n) for n in range(1, 101)]
+    for _, text in edited[:20]:
+        index.query(text)
+
+    latencies, found = [], 0
+    for doc_id, text in edited:
+        began = time.perf_counter()
+        matches = index.query(text, top_k=1)
+        latencies.append(time.perf_counter() - began)
+        found += bool(matches) and matches[0][0] == doc_id
+    unrelated_latencies = []
+    for text in unrelated:
+        began = time.perf_counter()
+        index.query(text)
+        unrelated_latencies.append(time.perf_counter() - began)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.npz')
+        began = time.perf_counter()
+        index.save(path)
+        save = time.perf_counter() - began
+        size = os.path.getsize(path)
+        began = time.perf_counter()
+        NearDuplicateIndex.load(path)
+        load = time.perf_counter() - began
+
+    memory = index._signatures.nbytes + index._keys.nbytes + index._key_docs.nbytes
+    print("=" * 70)
+    print(f"NEAR-DUPLICATE INDEX BENCHMARK ({len(index)} documents)")
+    print("=" * 70)
+    print(f"build:                {build:.1f} s ({len(index) / build:.0f} docs/s)")
+    print(f"edited-copy queries:  p50 {percentile(latencies, 50):.3f} ms, p99 {percentile(latencies, 99):.3f} ms, "
+          f"recall {found / len(edited):.1%}")
+    print(f"unrelated queries:    p50 {percentile(unrelated_latencies, 50):.3f} ms, "
+          f"p99 {percentile(unrelated_latencies, 99):.3f} ms")
+    print(f"index arrays:         {memory / 2 ** 20:.1f} MB in memory, {size / 2 ** 20:.1f} MB on disk")
+    print(f"save / load:          {save:.2f} s / {load:.2f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+ONNX backend parity and performance check against the PyTorch pipeline
+Reports label agreement and score drift on the reference corpus, plus
+latency and resident memory of each backend.
+Run: python onnx_backend.py export && python benchmarks/bench_onnx_backend.py
+"""
+
+import sys
+import os
+import json
+import subprocess
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from onnx_backend import DEFAULT_MODEL_NAME, DEFAULT_ONNX_DIR, load_classifier
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+LATENCY_ROUNDS = 5
+
+def reference_corpus():
+    texts = [e['text'] for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES]
+    # Long articles hit the 512-token truncation path
+    texts.append(' '.join(texts) * 3)
+    return texts
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def load_backend(name):
+    if name == 'onnx':
+        return load_classifier(DEFAULT_ONNX_DIR)
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+    tokenizer = AutoTokenizer.from_pretrained(DEFAULT_MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(DEFAULT_MODEL_NAME)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer, device=-1)
+
+def measure(name):
+    """Load one backend in this process and report memory and latency"""
+    before = rss_mb()
+    start = time.perf_counter()
+    classifier = load_backend(name)
+    load_seconds = time.perf_counter() - start
+    texts = reference_corpus()
+    classifier(texts[0], truncation=True, max_length=512)  # warm-up
+
+    latencies = []
+    for _ in range(LATENCY_ROUNDS):
+        for text in texts:
+            start = time.perf_counter()
+            classifier(text, truncation=True, max_length=512)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    classifier(texts, batch_size=8, truncation=True, max_length=512)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'backend': name,
+        'load_seconds': round(load_seconds, 2),
+        'rss_mb': round(rss_mb() - before, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'batch_texts_per_second': round(len(texts) / batch_seconds, 1)
+    }
+
+def probabilities(classifier, texts):
+    if hasattr(classifier, 'logits'):
+        logits = classifier.logits(texts)
+        probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return probs / probs.sum(axis=-1, keepdims=True), classifier.id2label
+    model, tokenizer = classifier.model, classifier.tokenizer
+    import torch
+    with torch.no_grad():
+        encoded = tokenizer(texts, padding=True, truncation=True, max_length=512, return_tensors='pt')
+        probs = torch.softmax(model(**encoded).logits, dim=-1).numpy()
+    return probs, model.config.id2label
+
+def parity():
+    texts = reference_corpus()
+    torch_probs, labels = probabilities(load_backend('torch'), texts)
+    onnx_probs, _ = probabilities(load_backend('onnx'), texts)
+
+    agree = (torch_probs.argmax(axis=-1) == onnx_probs.argmax(axis=-1))
+    drift = np.abs(torch_probs - onnx_probs).max(axis=-1)
+    return {
+        'texts': len(texts),
+        'label_agreement': round(float(agree.mean()), 4),
+        'disagreements': [texts[i][:60] for i in np.flatnonzero(~agree)],
+        'mean_score_drift': round(float(drift.mean()), 4),
+        'max_score_drift': round(float(drift.max()), 4),
+        'labels': {int(k): v for k, v in labels.items()}
+    }
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--measure':
+        print(json.dumps(measure(sys.argv[2])))
+        return
+
+    print("=" * 70)
+    print("ONNX BACKEND PARITY")
+    print("=" * 70)
+    report = parity()
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+    print("\n" + "=" * 70)
+    print("LATENCY AND MEMORY (each backend in a fresh process)")
+    print("=" * 70)
+    print(f"{'backend':>8} {'load (s)':>9} {'RSS (MB)':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'batch/s':>8}")
+    for name in ('torch', 'onnx'):
+        output = subprocess.run([sys.executable, __file__, '--measure', name],
+                                capture_output=True, text=True, check=True).stdout
+        row = json.loads(output.strip().splitlines()[-1])
+        print(f"{name:>8} {row['load_seconds']:>9} {row['rss_mb']:>9} {row['p50_ms']:>9} "
+              f"{row['p99_ms']:>9} {row['batch_texts_per_second']:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Overload benchmark - latency of a traffic spike with and without admission limits
+Sends a burst of concurrent /predict requests to the ASGI app (asgi_app.py)
+with a stand-in transformer pass of fixed duration on the inference pool,
+once with admission control as configured and once unbounded, and reports
+served / shed counts and latency percentiles of each. With --budget-ms
+every request carries a latency budget, and requests whose transformer
+pass would overrun it are answered rule-only (degraded).
+Run: python benchmarks/bench_overload.py [--requests 200] [--inference-ms 20] [--budget-ms 250]
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app
+import asgi_app
+from admission import AdmissionControl
+from deadline import StageCosts
+
+async def request(text, budget_ms=None):
+    body = json.dumps({'text': text}).encode('utf-8')
+    headers = [(b'x-latency-budget-ms', str(budget_ms).encode())] if budget_ms else []
+    scope = {'type': 'http', 'method': 'POST', 'path': '/predict', 'query_string': b'', 'headers': headers}
+    chunks = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return chunks.pop(0) if chunks else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    started = time.perf_counter()
+    await asgi_app.app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    status = sent[0]['status']
+    degraded = status == 200 and json.loads(sent[1]['body']).get('degraded', False)
+    return status, elapsed, degraded
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+async def spike(count, spacing, budget_ms=None):
+    tasks = []
+    for n in range(count):
+        text = f"Breaking news report number {n}: officials confirmed the figures."
+        tasks.append(asyncio.ensure_future(request(text, budget_ms)))
+        await asyncio.sleep(spacing)
+    return await asyncio.gather(*tasks)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--inference-ms', type=float, default=20)
+    parser.add_argument('--spacing-ms', type=float, default=1, help='gap between request arrivals')
+    parser.add_argument('--budget-ms', type=float, default=None, help='latency budget sent with each request')
+    args = parser.parse_args()
+
+    def inference(text):
+        time.sleep(args.inference_ms / 1000)  # Stand-in for a forward pass
+        return None
+
+    app._ml_is_costly = lambda: True
+    app.ml_could_change_verdict = lambda text, url=None: True
+    app.ml_classify_text = inference
+
+    limits = [('bounded', asgi_app.ADMISSION),
+              ('unbounded', AdmissionControl(max_in_flight=10 ** 6, max_queue=0))]
+
+    print("=" * 70)
+    print(f"OVERLOAD BENCHMARK ({args.requests} requests, {args.spacing_ms:g} ms apart, "
+          f"{args.inference_ms:g} ms inference, {asgi_app.INFERENCE_WORKERS} inference worker(s)"
+          + (f", {args.budget_ms:g} ms budget)" if args.budget_ms else ")"))
+    print("=" * 70)
+    print(f"bounded: MAX_IN_FLIGHT={asgi_app.MAX_IN_FLIGHT} MAX_QUEUE_DEPTH={asgi_app.MAX_QUEUE_DEPTH} "
+          f"QUEUE_TIMEOUT_MS={asgi_app.QUEUE_TIMEOUT_MS:g}")
+    print()
+    print(f"{'mode':>10} {'served':>7} {'degraded':>9} {'429':>5} {'503':>5} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'max ms':>9} {'shed p99 ms':>12}")
+    for name, admission in limits:
+        asgi_app.ADMISSION = admission
+        app.RESULT_CACHE.clear()
+        app.STAGE_COSTS = StageCosts()
+        responses = asyncio.run(spike(args.requests, args.spacing_ms / 1000, args.budget_ms))
+        served = [seconds * 1000 for status, seconds, _ in responses if status == 200]
+        shed = [seconds * 1000 for status, seconds, _ in responses if status != 200]
+        degraded = sum(1 for _, _, d in responses if d)
+        count = lambda code: sum(1 for status, _, _ in responses if status == code)
+        print(f"{name:>10} {len(served):>7} {degraded:>9} {count(429):>5} {count(503):>5} {percentile(served, 50):>9.1f} "
+              f"{percentile(served, 99):>9.1f} {max(served, default=float('nan')):>9.1f} {percentile(shed, 99):>12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Phrase matcher benchmark - scan time vs number of phrases
+Compares the single-pass automaton with one `in` check per phrase.
+Run: python benchmarks/bench_phrase_matcher.py
+"""
+
+import sys
+import os
+import random
+import string
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from phrase_matcher import PhraseMatcher
+from app import FAKE_NEWS_KEYWORDS
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES
+
+PATTERN_COUNTS = [50, 500, 5000, 20000]
+REPEATS = 20
+
+def random_phrase(rng):
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+             for _ in range(rng.randint(2, 4))]
+    return ' '.join(words)
+
+def main():
+    rng = random.Random(42)
+    article = ' '.join(e['text'] for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES) * 4
+    text_lower = article.lower()
+
+    print("=" * 70)
+    print(f"PHRASE MATCHER BENCHMARK ({len(article)} chars, best of {REPEATS})")
+    print("=" * 70)
+    print(f"{'patterns':>10} {'build (ms)':>12} {'automaton (ms)':>16} {'substring loop (ms)':>20}")
+
+    for count in PATTERN_COUNTS:
+        phrases = list(FAKE_NEWS_KEYWORDS)
+        while len(phrases) < count:
+            phrases.append(random_phrase(rng))
+
+        build = timeit.timeit(lambda: PhraseMatcher().add_all(phrases, 'keyword').build(), number=1)
+        matcher = PhraseMatcher().add_all(phrases, 'keyword').build()
+
+        scan = min(timeit.repeat(lambda: matcher.scan(text_lower), number=1, repeat=REPEATS))
+        loop = min(timeit.repeat(lambda: [p for p in phrases if p in text_lower],
+                                 number=1, repeat=REPEATS))
+
+        print(f"{count:>10} {build * 1000:>12.1f} {scan * 1000:>16.3f} {loop * 1000:>20.3f}")
+
+if __name__ == '__main__':
+    main()
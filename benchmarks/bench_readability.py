@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Readability benchmark - textstat vs the built-in single-pass engine
+Articles of growing length are built from shuffled sentences of the test
+corpus; every call gets a new article, so textstat's per-text caches do
+not help. Reports both engines' time and the largest score difference.
+Run: python benchmarks/bench_readability.py
+"""
+
+import sys
+import os
+import random
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import textstat
+import readability
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+WORD_COUNTS = [100, 1000, 10000]
+ARTICLES = 20
+
+def articles(rng, words):
+    sentences = [s.strip() + '.' for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+                 for s in e['text'].split('.') if s.strip()]
+    result = []
+    for _ in range(ARTICLES):
+        parts, count = [], 0
+        while count < words:
+            sentence = rng.choice(sentences)
+            parts.append(sentence)
+            count += len(sentence.split())
+        result.append(' '.join(parts))
+    return result
+
+def run_textstat(texts):
+    for text in texts:
+        textstat.flesch_reading_ease(text)
+        textstat.flesch_kincaid_grade(text)
+
+def run_builtin(texts):
+    for text in texts:
+        readability.readability_scores(text)
+
+def main():
+    rng = random.Random(18)
+    print("=" * 70)
+    print(f"READABILITY BENCHMARK ({ARTICLES} articles per size, best of 5)")
+    print("=" * 70)
+    print(f"{'words':>7} {'textstat (ms)':>14} {'built-in (ms)':>14} {'speedup':>8} {'max diff':>9}")
+    for words in WORD_COUNTS:
+        texts = articles(rng, words)
+        textstat_ms = min(timeit.repeat(lambda: (textstat.textstat._cache_clear(), run_textstat(texts)),
+                                        number=1, repeat=5)) / ARTICLES * 1000
+        builtin_ms = min(timeit.repeat(lambda: run_builtin(texts), number=1, repeat=5)) / ARTICLES * 1000
+        diff = max(abs(a - b) for text in texts
+                   for a, b in zip((textstat.flesch_reading_ease(text), textstat.flesch_kincaid_grade(text)),
+                                   readability.readability_scores(text)))
+        print(f"{words:>7} {textstat_ms:>14.3f} {builtin_ms:>14.3f} {textstat_ms / builtin_ms:>7.1f}x {diff:>9.2f}")
+    print(f"\nSyllable memo: {readability.cache_info()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Response benchmark - CPU per request and bytes on the wire
+Sends the test corpus to /predict (Flask test client, result cache
+cleared before each request) as full and compact (verbose=false)
+responses, with each JSON encoder and content coding.
+Run: python benchmarks/bench_responses.py [--rounds 20]
+"""
+
+import sys
+import os
+import argparse
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app
+import response_format
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+def run(client, items, query, encoding, rounds):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    wire = 0
+    cpu_started = time.process_time()
+    for _ in range(rounds):
+        for item in items:
+            app.RESULT_CACHE.clear()
+            wire += len(client.post('/predict' + query, json=item, headers=headers).get_data())
+    requests = rounds * len(items)
+    return (time.process_time() - cpu_started) / requests * 1000, wire / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    items = [{'text': e['text'], 'url': e['url']}
+             for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES]
+    client = app.app.test_client()
+    encoders = ['stdlib'] + (['orjson'] if response_format.orjson is not None else [])
+    encodings = [None, 'gzip'] + (['br'] if response_format.brotli is not None else [])
+
+    print("=" * 70)
+    print(f"RESPONSE BENCHMARK ({len(items)} texts x {args.rounds} rounds, uncached)")
+    print("=" * 70)
+    print(f"{'response':>9} {'encoder':>8} {'encoding':>9} {'CPU ms/request':>15} {'bytes/response':>15}")
+    saved = app.JSON_ENCODER
+    try:
+        for name, query in (('full', ''), ('compact', '?verbose=false')):
+            for encoder in encoders:
+                app.JSON_ENCODER = encoder
+                run(client, items, query, None, 1)  # warm-up
+                for encoding in encodings:
+                    cpu_ms, size = run(client, items, query, encoding, args.rounds)
+                    print(f"{name:>9} {encoder:>8} {encoding or 'identity':>9} {cpu_ms:>15.3f} {size:>15.0f}")
+    finally:
+        app.JSON_ENCODER = saved
+
+if __name__ == '__main__':
+    main()
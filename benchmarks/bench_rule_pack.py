@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Rule pack benchmark - startup cost of mapped rule packs vs building from lists
+For growing phrase and domain lists, compares building the PhraseMatcher and
+DomainIndex from Python lists (what every worker does with the built-in
+lists) with mapping a compiled pack, plus scan and lookup times of each.
+Run: python benchmarks/bench_rule_pack.py [--domains 1000,100000] [--phrases 150,5000]
+"""
+
+import sys
+import os
+import argparse
+import random
+import string
+import tempfile
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app
+from phrase_matcher import PhraseMatcher
+from domain_index import DomainIndex
+from rule_pack import RulePack, compile_rules, write_pack
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES
+
+REPEATS = 10
+
+def random_word(rng, low=3, high=9):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--domains', default='1000,100000')
+    parser.add_argument('--phrases', default='150,5000')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    text_lower = (' '.join(e['text'] for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES) * 4).lower()
+    hosts = ['news.bbc.com', 'www.example.org', 'a.b.c.hoax-site.com', 'cheap.org']
+    path = os.path.join(tempfile.mkdtemp(), 'rules.pack')
+
+    print("=" * 70)
+    print(f"RULE PACK BENCHMARK ({len(text_lower)} chars scanned, best of {REPEATS})")
+    print("=" * 70)
+    print(f"{'phrases':>8} {'domains':>8} {'pack KB':>8} {'build ms':>9} {'map ms':>8} "
+          f"{'scan ms':>8} {'mapped':>8} {'lookup us':>10} {'mapped':>8}")
+
+    for phrases in map(int, args.phrases.split(',')):
+        for domains in map(int, args.domains.split(',')):
+            lists = dict(zip(('keyword', 'known_fake', 'fact_checkable', 'trusted', 'untrusted', 'suspicious_domain'),
+                             (list(x) for x in app._rule_lists())))
+            while len(lists['keyword']) < phrases:
+                lists['keyword'].append(f"{random_word(rng)} {random_word(rng)}")
+            while len(lists['trusted']) < domains:
+                lists['trusted'].append(f"{random_word(rng, 4, 12)}.{rng.choice(['com', 'org', 'net', 'co.uk'])}")
+            data = compile_rules(lists)
+            write_pack(data, path)
+
+            def build():
+                matcher = PhraseMatcher()
+                for category in ('keyword', 'known_fake', 'fact_checkable'):
+                    matcher.add_all(lists[category], category)
+                return matcher.build(), DomainIndex(lists['trusted']), DomainIndex(lists['untrusted'])
+
+            build_ms = min(timeit.repeat(build, number=1, repeat=3)) * 1000
+            map_ms = min(timeit.repeat(lambda: RulePack.open(path), number=1, repeat=REPEATS)) * 1000
+            matcher, trusted, _ = build()
+            pack = RulePack.open(path)
+            pack.matcher.scan(text_lower)  # Memoize the transitions, as after the first requests
+            scan = min(timeit.repeat(lambda: matcher.scan(text_lower), number=1, repeat=REPEATS)) * 1000
+            mapped_scan = min(timeit.repeat(lambda: pack.matcher.scan(text_lower), number=1, repeat=REPEATS)) * 1000
+            lookup = min(timeit.repeat(lambda: [trusted.lookup(h) for h in hosts], number=100, repeat=REPEATS))
+            mapped_lookup = min(timeit.repeat(lambda: [pack.trusted.lookup(h) for h in hosts], number=100,
+                                              repeat=REPEATS))
+            per_lookup = 1e6 / (100 * len(hosts))
+
+            print(f"{phrases:>8} {domains:>8} {len(data) // 1024:>8} {build_ms:>9.1f} {map_ms:>8.2f} "
+                  f"{scan:>8.3f} {mapped_scan:>8.3f} {lookup * per_lookup:>10.2f} {mapped_lookup * per_lookup:>8.2f}")
+
+if __name__ == '__main__':
+    main()
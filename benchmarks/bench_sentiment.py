@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Sentiment benchmark - nltk's VADER analyzer vs the precompiled engine
+Articles of growing length from the test corpus, scored one at a time by
+both and as one batch by the engine. Uses the VADER lexicon when it is
+downloaded, otherwise a lexicon generated from the corpus vocabulary.
+Run: python benchmarks/bench_sentiment.py
+"""
+
+import sys
+import os
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import nltk.data
+from nltk.sentiment import SentimentIntensityAnalyzer
+from sentiment import SentimentEngine, compile_lexicon
+from test_sentiment import lexicons, EXAMPLES
+
+WORD_COUNTS = [100, 1000, 10000]
+ARTICLES = 10
+
+def main():
+    found, _ = lexicons()
+    name, lexicon_file = found[0]
+    reference = SentimentIntensityAnalyzer(lexicon_file=lexicon_file)
+    engine = SentimentEngine(compile_lexicon(nltk.data.load(lexicon_file)))
+    words = ' '.join(e['text'] for e in EXAMPLES).split()
+
+    print("=" * 70)
+    print(f"SENTIMENT BENCHMARK ({name}, {ARTICLES} articles per size, best of 3)")
+    print("=" * 70)
+    print(f"{'words':>7} {'nltk (ms)':>10} {'engine (ms)':>12} {'batch (ms)':>11} {'speedup':>8}")
+    for count in WORD_COUNTS:
+        texts = [' '.join(words[(i * 37 + j) % len(words)] for j in range(count)) for i in range(ARTICLES)]
+        nltk_ms = min(timeit.repeat(lambda: [reference.polarity_scores(t) for t in texts],
+                                    number=1, repeat=3)) / ARTICLES * 1000
+        engine_ms = min(timeit.repeat(lambda: [engine.polarity_scores(t) for t in texts],
+                                      number=1, repeat=3)) / ARTICLES * 1000
+        batch_ms = min(timeit.repeat(lambda: engine.polarity_scores_many(texts),
+                                     number=1, repeat=3)) / ARTICLES * 1000
+        print(f"{count:>7} {nltk_ms:>10.3f} {engine_ms:>12.3f} {batch_ms:>11.3f} {nltk_ms / engine_ms:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
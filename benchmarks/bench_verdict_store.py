@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Verdict store benchmark - cold restart with and without the on-disk store
+Scores the test corpus once to fill a temporary store, then compares an
+empty memory cache (a restart) scored from scratch, from the store and
+after a warm-load, plus the cost of a single store read.
+Run: python benchmarks/bench_verdict_store.py [--rounds 20]
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app
+from verdict_store import VerdictStore
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+def score_all(items):
+    started = time.perf_counter()
+    for item in items:
+        app.detect_fake_news(item['text'], item['url'])
+    return (time.perf_counter() - started) / len(items) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    items = FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+    store = VerdictStore(os.path.join(tempfile.mkdtemp(), 'verdicts.db'))
+
+    print("=" * 70)
+    print(f"VERDICT STORE BENCHMARK ({len(items)} texts, best of {args.rounds})")
+    print("=" * 70)
+
+    app.RESULT_CACHE.clear()
+    app.VERDICT_STORE = None
+    uncached = min(app.RESULT_CACHE.clear() or score_all(items) for _ in range(args.rounds))
+
+    app.VERDICT_STORE = store
+    score_all(items)
+    store.flush()
+    from_store = min(app.RESULT_CACHE.clear() or score_all(items) for _ in range(args.rounds))
+
+    warm = []
+    for _ in range(args.rounds):
+        app.RESULT_CACHE.clear()
+        started = time.perf_counter()
+        app.warm_load_verdicts()
+        load_ms = (time.perf_counter() - started) * 1000
+        warm.append((score_all(items), load_ms))
+    warm_ms, load_ms = min(warm)
+
+    key = app.result_cache_key(items[0]['text'], items[0]['url'])
+    started = time.perf_counter()
+    for _ in range(10000):
+        store.get(key)
+    read_us = (time.perf_counter() - started) / 10000 * 1e6
+
+    print(f"{'after restart, no store':<32} {uncached:>8.3f} ms/request")
+    print(f"{'after restart, read from store':<32} {from_store:>8.3f} ms/request")
+    print(f"{'after warm-load':<32} {warm_ms:>8.3f} ms/request (load: {load_ms:.1f} ms)")
+    print(f"{'store point read':<32} {read_us:>8.1f} us")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite for the detection pipeline
+
+Runs the test corpora (test_examples.py plus the texts used by
+comprehensive_test.py, quick_test.py, test_examples_simple.py and
+test_random_text.py) and synthetic 1 KB / 10 KB / 100 KB articles through
+the uncached pipeline in rule-only, ML and cascade modes. Reports
+per-stage and end-to-end latency percentiles, throughput and peak memory,
+and writes everything to a JSON file so two commits can be compared.
+Cascade mode also reports how many texts skipped the transformer and the
+latency saved against ML mode.
+
+Run:
+  python benchmarks/run_benchmarks.py                       # writes bench_results.json
+  python benchmarks/run_benchmarks.py --output new.json --compare bench_results.json
+"""
+
+import sys
+import os
+import argparse
+import ast
+import gc
+import json
+import platform
+import random
+import resource
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import app
+from stage_timing import PIPELINE_STAGES
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+SCRIPT_CORPORA = ['comprehensive_test.py', 'quick_test.py', 'test_examples_simple.py', 'test_random_text.py']
+SYNTHETIC_SIZES = {'synthetic_1kb': 1024, 'synthetic_10kb': 10 * 1024, 'synthetic_100kb': 100 * 1024}
+PERCENTILES = (50, 90, 99)
+
+# ====================================================
+# CORPORA
+# ====================================================
+
+def _script_items(filename):
+    """
+    Pull the (text, url) pairs a test script passes to detect_fake_news
+    Scripts run their tests on import, so their source is parsed instead.
+    """
+    with open(os.path.join(ROOT, filename), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    items = []
+    names = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names.setdefault(target.id, []).append((node.lineno, node.value.value))
+
+    def resolve(expr, lineno):
+        if isinstance(expr, ast.Constant):
+            return expr.value
+        if isinstance(expr, ast.Name):
+            earlier = [value for line, value in names.get(expr.id, []) if line <= lineno]
+            return earlier[-1] if earlier else None
+        return None
+
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id == 'detect_fake_news' and node.args):
+            text = resolve(node.args[0], node.lineno)
+            url = resolve(node.args[1], node.lineno) if len(node.args) > 1 else None
+            if isinstance(text, str):
+                items.append((text, url))
+    return items
+
+def synthetic_article(size, seed):
+    """Deterministic article of about `size` bytes mixing real and fake sentences"""
+    rng = random.Random(seed)
+    sentences = []
+    for example in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES:
+        sentences.extend(s.strip() + '.' for s in example['text'].split('.') if s.strip())
+    parts = []
+    length = 0
+    while length < size:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(parts)[:size]
+
+def build_corpora(seed):
+    examples = FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+    corpora = {'test_examples': [(e['text'], e['url']) for e in examples]}
+    for filename in SCRIPT_CORPORA:
+        corpora[filename[:-3]] = _script_items(filename)
+    for name, size in SYNTHETIC_SIZES.items():
+        corpora[name] = [(synthetic_article(size, seed + i), 'https://example.com/article') for i in range(3)]
+    return corpora
+
+# ====================================================
+# MEASUREMENT
+# ====================================================
+
+def percentiles(samples):
+    if not samples:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    ordered = sorted(samples)
+    return {f"p{p}": round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 4)
+            for p in PERCENTILES}
+
+def run_item(text, url, mode, timings):
+    # Rule-only mode hands the pipeline an empty ML result, so no forward pass runs
+    ml_result = None if mode == 'rules' else app._ML_NOT_RUN
+    app.CASCADE_MODE = mode == 'cascade'
+    return app._run_detection(text, url, ml_result, timings)
+
+def measure_corpus(items, mode, repeat):
+    end_to_end = []
+    stage_samples = {stage: [] for stage in PIPELINE_STAGES}
+
+    # Warm-up pass, then time with the collector off (as timeit does)
+    short_circuited = 0
+    for text, url in items:
+        result = run_item(text, url, mode, {})
+        if 'ml' in result['details'].get('cascade', {}).get('skipped', ()):
+            short_circuited += 1
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text, url in items:
+                timings = {}
+                began = time.perf_counter()
+                run_item(text, url, mode, timings)
+                end_to_end.append(time.perf_counter() - began)
+                for stage, seconds in timings.items():
+                    stage_samples[stage].append(seconds)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+
+    # Separate pass: tracemalloc slows the pipeline down too much to time it
+    tracemalloc.start()
+    for text, url in items:
+        run_item(text, url, mode, {})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = {
+        'items': len(items),
+        'bytes': sum(len(text.encode('utf-8')) for text, _ in items),
+        'end_to_end_ms': percentiles(end_to_end),
+        'stages_ms': {stage: percentiles(samples) for stage, samples in stage_samples.items() if samples},
+        'throughput_items_per_s': round(len(end_to_end) / elapsed, 2) if elapsed else 0.0,
+        'peak_traced_memory_kb': round(peak / 1024, 1)
+    }
+    if mode == 'cascade':
+        stats['short_circuited'] = round(short_circuited / len(items), 4) if items else 0.0
+    return stats
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'ml_available': bool(app.ML_AVAILABLE and app.fake_news_classifier is not None),
+        'rules_version': app.rules_version()
+    }
+
+# ====================================================
+# COMPARISON
+# ====================================================
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """
+    Flag latency percentiles that grew by more than `threshold` (fraction)
+    and by more than `min_delta_ms` (so microsecond stages don't flap)
+    Returns: list of human-readable regression lines
+    """
+    regressions = []
+    for mode, corpora in current['results'].items():
+        for corpus, stats in corpora.items():
+            old = baseline.get('results', {}).get(mode, {}).get(corpus)
+            if not old:
+                continue
+            pairs = [('end_to_end', stats['end_to_end_ms'], old['end_to_end_ms'])]
+            pairs += [(stage, values, old['stages_ms'].get(stage, {}))
+                      for stage, values in stats['stages_ms'].items()]
+            for name, new_values, old_values in pairs:
+                for key, new_ms in new_values.items():
+                    old_ms = old_values.get(key)
+                    if old_ms and new_ms - old_ms > min_delta_ms and new_ms > old_ms * (1 + threshold):
+                        regressions.append(f"{mode}/{corpus}/{name} {key}: {old_ms:.3f} -> {new_ms:.3f} ms "
+                                           f"(+{(new_ms / old_ms - 1) * 100:.0f}%)")
+    return regressions
+
+def cascade_report(results):
+    """Short-circuit fraction and p50 latency saved by cascade mode, per corpus"""
+    report = {}
+    for corpus, stats in results.get('cascade', {}).items():
+        full = results.get('ml', {}).get(corpus)
+        entry = {'short_circuited': stats['short_circuited']}
+        if full:
+            before, after = full['end_to_end_ms']['p50'], stats['end_to_end_ms']['p50']
+            entry['p50_saved_ms'] = round(before - after, 4)
+            entry['p50_saved_pct'] = round((before - after) / before * 100, 1) if before else 0.0
+        report[corpus] = entry
+    return report
+
+# ====================================================
+# MAIN
+# ====================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.20, help='allowed slowdown (default 0.20 = 20%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                        help='ignore slowdowns smaller than this many ms (default 0.05)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--modes', default='rules,ml,cascade', help='comma-separated: rules, ml, cascade')
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    if app.ML_AVAILABLE and app.sentiment_analyzer is None:
+        app.initialize_models()
+
+    corpora = build_corpora(args.seed)
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    if app.fake_news_classifier is None:
+        for mode in ('ml', 'cascade'):
+            if mode in modes:
+                print(f"ML model unavailable - skipping {mode} mode")
+                modes.remove(mode)
+
+    report = {
+        'environment': environment(),
+        'config': {'repeat': args.repeat, 'seed': args.seed, 'modes': modes},
+        'results': {}
+    }
+
+    print("=" * 70)
+    print("DETECTION PIPELINE BENCHMARK")
+    print("=" * 70)
+    for mode in modes:
+        report['results'][mode] = {}
+        print(f"\n[{mode.upper()} MODE]")
+        print(f"{'corpus':<24} {'items':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'items/s':>9} {'peak KB':>9}")
+        for name, items in corpora.items():
+            stats = measure_corpus(items, mode, args.repeat)
+            report['results'][mode][name] = stats
+            e2e = stats['end_to_end_ms']
+            print(f"{name:<24} {stats['items']:>5} {e2e['p50']:>9.3f} {e2e['p90']:>9.3f} {e2e['p99']:>9.3f} "
+                  f"{stats['throughput_items_per_s']:>9.1f} {stats['peak_traced_memory_kb']:>9.1f}")
+
+    app.CASCADE_MODE = False
+    if 'cascade' in modes:
+        report['cascade'] = cascade_report(report['results'])
+        print("\n[CASCADE]")
+        print(f"{'corpus':<24} {'skipped ML':>10} {'p50 saved ms':>13} {'saved %':>8}")
+        for name, entry in report['cascade'].items():
+            print(f"{name:<24} {entry['short_circuited']:>10.1%} {entry.get('p50_saved_ms', 0.0):>13.3f} "
+                  f"{entry.get('p50_saved_pct', 0.0):>8.1f}")
+
+    report['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {args.output} (peak RSS {report['peak_rss_mb']} MB)")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        print("\n" + "=" * 70)
+        print(f"COMPARISON WITH {args.compare} ({baseline['environment'].get('commit')})")
+        print("=" * 70)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"[OK] No latency regressions above {args.threshold:.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Bulk scoring of JSONL archives
+
+Streams a JSONL file of {id, text, url} records through a pool of worker
+processes (each loads the models once) and writes one JSONL result line
+per record. Only a bounded number of chunks is in flight at a time, so
+memory stays flat whatever the size of the input.
+
+Run:
+  python bulk_score.py archive.jsonl -o scored.jsonl --workers 4
+  python bulk_score.py archive.jsonl -o scored.jsonl --resume      # continue an interrupted run
+  python bulk_score.py archive.jsonl --order completion > scored.jsonl
+  python bulk_score.py archive.jsonl -o verdicts.jsonl --fields result,confidence
+
+Output lines look like {"id": ..., "offset": 12, "result": {...}} (or
+"error" instead of "result"); offset is the record's 0-based line number
+in the input file.
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from response_format import parse_fields
+
+# ====================================================
+# WORKER PROCESS
+# ====================================================
+
+_worker_app = None
+
+def _init_worker(threads):
+    """Import the service and load its models once per worker process"""
+    global _worker_app
+    # Library warnings must not end up in the JSONL written to stdout
+    sys.stdout = sys.stderr
+    # Workers share the cores instead of each sizing its pools to all of them
+    os.environ.setdefault('ML_THREADS', str(threads))
+    import app as service
+    if service.ML_AVAILABLE and service.sentiment_analyzer is None:
+        service.initialize_models()
+    _worker_app = service
+
+def _score_chunk(chunk, batch_size, fields=None):
+    """Score a list of (offset, id, text, url, error); returns output records in chunk order"""
+    valid = [entry for entry in chunk if entry[4] is None]
+    results = _worker_app.detect_fake_news_batch([{'text': text, 'url': url} for _, _, text, url, _ in valid],
+                                                 batch_size, fields)
+    by_offset = {entry[0]: result for entry, result in zip(valid, results)}
+    records = []
+    for offset, record_id, _, _, error in chunk:
+        result = by_offset.get(offset)
+        if error is None and result is not None and 'error' in result:
+            error = result['error']
+        if error is not None:
+            records.append({'id': record_id, 'offset': offset, 'error': error})
+        else:
+            records.append({'id': record_id, 'offset': offset, 'result': result})
+    return records
+
+# ====================================================
+# INPUT / RESUME
+# ====================================================
+
+def read_records(path, id_field, text_field, url_field, skip_before=0, skip=()):
+    """
+    Yield (offset, id, text, url, error) for each non-blank input line
+    Lines before `skip_before` and offsets in `skip` were already scored.
+    Unparseable lines carry an error message so they still get an output line.
+    """
+    with open(path, encoding='utf-8') as f:
+        for offset, line in enumerate(f):
+            if offset < skip_before or offset in skip or not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield offset, None, None, None, 'Invalid JSON record'
+                continue
+            if not isinstance(record, dict):
+                yield offset, None, None, None, 'Record must be a JSON object'
+                continue
+            yield offset, record.get(id_field), record.get(text_field), record.get(url_field), None
+
+def resume_point(path, input_path, start=0):
+    """
+    Inspect an earlier (possibly interrupted) output file
+    A trailing partial line is cut off. Returns (first offset not yet
+    scored, set of offsets scored beyond it) - with completion order the
+    set holds at most the records that were in flight.
+    """
+    if not os.path.exists(path):
+        return start, set()
+
+    with open(path, 'rb+') as f:
+        data_end = f.seek(0, os.SEEK_END)
+        # Walk back to the last newline to drop a half-written record
+        position = data_end
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            newline = f.read(step).rfind(b'\n')
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != data_end:
+            f.truncate(position)
+
+    prefix = start
+    ahead = set()
+    with open(input_path, encoding='utf-8') as source, open(path, encoding='utf-8') as f:
+        pending = iter(source)
+        for _ in range(start):
+            next(pending, None)
+        current = next(pending, None)  # input line at `prefix`
+        for line in f:
+            if line.strip():
+                ahead.add(json.loads(line)['offset'])
+            # Blank input lines produce no output, so step over them too
+            while current is not None and (prefix in ahead or not current.strip()):
+                ahead.discard(prefix)
+                prefix += 1
+                current = next(pending, None)
+    return prefix, ahead
+
+# ====================================================
+# DRIVER
+# ====================================================
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class Progress:
+    """Records/s readout on stderr, refreshed at most every `interval` seconds"""
+
+    def __init__(self, enabled=True, interval=1.0):
+        self.enabled = enabled
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last = 0.0
+        self.done = 0
+
+    def update(self, count, final=False):
+        self.done += count
+        now = time.perf_counter()
+        if not self.enabled or (not final and now - self.last < self.interval):
+            return
+        self.last = now
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        sys.stderr.write(f"\rscored {self.done} records in {elapsed:.1f}s ({rate:.1f} records/s)")
+        if final:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+def run(args, out):
+    skip_before, skip = (args.start, set())
+    if args.resume and args.output != '-':
+        skip_before, skip = resume_point(args.output, args.input, args.start)
+
+    chunks = _chunks(read_records(args.input, args.id_field, args.text_field, args.url_field,
+                                  skip_before, skip),
+                     args.chunk_size)
+    progress = Progress(enabled=not args.quiet)
+    max_in_flight = args.workers * args.prefetch
+
+    def emit(records):
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+        progress.update(len(records))
+
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(threads,)) as pool:
+        in_flight = deque()
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                in_flight.append(pool.submit(_score_chunk, chunk, args.batch_size, args.fields))
+            if not in_flight:
+                break
+            if args.order == 'input':
+                emit(in_flight.popleft().result())
+            else:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.remove(future)
+                    emit(future.result())
+
+    progress.update(0, final=True)
+    return progress.done
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('input', help='JSONL file of {id, text, url} records')
+    parser.add_argument('-o', '--output', default='-', help='output JSONL file (default stdout)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--order', choices=('input', 'completion'), default='input',
+                        help='write results in input order or as soon as they are ready')
+    parser.add_argument('--chunk-size', type=int, default=16, help='records sent to a worker at once')
+    parser.add_argument('--batch-size', type=int, default=None, help='transformer batch size inside a worker')
+    parser.add_argument('--prefetch', type=int, default=2, help='chunks in flight per worker')
+    parser.add_argument('--start', type=int, default=0, help='skip input lines before this 0-based offset')
+    parser.add_argument('--resume', action='store_true',
+                        help='append to --output, skipping records it already holds')
+    parser.add_argument('--id-field', default='id')
+    parser.add_argument('--text-field', default='text')
+    parser.add_argument('--url-field', default='url')
+    parser.add_argument('--fields', default=None,
+                        help='comma-separated result fields to keep, e.g. result,confidence (default: all)')
+    parser.add_argument('--quiet', action='store_true', help='no progress readout')
+    args = parser.parse_args(argv)
+    try:
+        args.fields = parse_fields(args.fields)
+    except ValueError as e:
+        parser.error(str(e))
+    args.workers = max(1, args.workers)
+    args.chunk_size = max(1, args.chunk_size)
+    args.prefetch = max(1, args.prefetch)
+
+    if args.output == '-':
+        return run(args, sys.stdout)
+    with open(args.output, 'a' if args.resume else 'w', encoding='utf-8') as out:
+        return run(args, out)
+
+if __name__ == '__main__':
+    main()
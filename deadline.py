@@ -0,0 +1,91 @@
+# ====================================================
+# LATENCY BUDGETS AND STAGE COST ESTIMATES
+# ====================================================
+# A request may carry a latency budget. Each pipeline
+# stage keeps a running cost estimate (moving average
+# plus twice the moving deviation, as TCP estimates
+# retransmission timeouts), so the service can tell
+# before starting an expensive stage whether it can
+# still finish inside the budget.
+#
+# Estimates nobody has refreshed for `ttl` seconds are
+# forgotten: a stage that has been skipped for a while
+# is tried again and measured afresh, so a spike does
+# not keep it switched off after it is over.
+# ====================================================
+
+import math
+import threading
+import time
+
+
+def parse_budget(value):
+    """Latency budget in milliseconds from a header or JSON value; raises ValueError"""
+    if isinstance(value, bool):
+        raise ValueError('latency budget must be a positive number of milliseconds')
+    try:
+        budget = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('latency budget must be a positive number of milliseconds') from None
+    if not math.isfinite(budget) or budget <= 0:
+        raise ValueError('latency budget must be a positive number of milliseconds')
+    return budget
+
+
+class Deadline:
+    """A point in time a request should be answered by"""
+
+    __slots__ = ('budget_ms', 'expires')
+
+    def __init__(self, budget_ms, started=None):
+        self.budget_ms = budget_ms
+        self.expires = (time.perf_counter() if started is None else started) + budget_ms / 1000.0
+
+    def remaining(self):
+        """Seconds left (negative once past the deadline)"""
+        return self.expires - time.perf_counter()
+
+
+class StageCosts:
+    """Running cost estimates per stage (thread-safe)"""
+
+    def __init__(self, smoothing=0.2, ttl=10.0):
+        self.smoothing = smoothing
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._costs = {}  # stage -> [mean, deviation, last observed]
+
+    def observe(self, stage, seconds):
+        now = time.monotonic()
+        with self._lock:
+            cost = self._costs.get(stage)
+            if cost is None or now - cost[2] > self.ttl:
+                self._costs[stage] = [seconds, seconds / 2, now]
+                return
+            error = seconds - cost[0]
+            cost[0] += self.smoothing * error
+            cost[1] += self.smoothing * (abs(error) - cost[1])
+            cost[2] = now
+
+    def observe_all(self, times, skip=()):
+        for stage, seconds in times.items():
+            if stage not in skip:
+                self.observe(stage, seconds)
+
+    def estimate(self, stage):
+        """Expected seconds for the stage, or None when there is no recent measurement"""
+        cost = self._costs.get(stage)
+        if cost is None or time.monotonic() - cost[2] > self.ttl:
+            return None
+        return cost[0] + 2 * cost[1]
+
+    def total(self, stages):
+        """Sum of the known estimates of the stages"""
+        return sum(e for e in map(self.estimate, stages) if e is not None)
+
+    def snapshot(self):
+        """{stage: estimated ms} of the current estimates"""
+        with self._lock:
+            stages = sorted(self._costs)
+        estimates = ((stage, self.estimate(stage)) for stage in stages)
+        return {stage: round(estimate * 1000, 3) for stage, estimate in estimates if estimate is not None}
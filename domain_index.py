@@ -0,0 +1,96 @@
+# ====================================================
+# DOMAIN SUFFIX INDEX
+# ====================================================
+# Reputation lookups keyed on reversed domain labels.
+# A lookup costs one hash probe per label of the queried
+# host, however many domains are indexed, and only
+# matches whole labels ("ap.org" never matches
+# "cheap.org").
+# ====================================================
+
+
+def normalize_domain(domain):
+    """Lowercase a domain and drop wildcards, leading dots and trailing dots"""
+    domain = domain.strip().lower()
+    if domain.startswith('*.'):
+        domain = domain[2:]
+    return domain.strip('.')
+
+
+def reverse_labels(domain):
+    """'news.bbc.co.uk' -> 'uk.co.bbc.news'"""
+    return '.'.join(reversed(domain.split('.')))
+
+
+class DomainIndex:
+    """Suffix index over domains
+
+    Entries are stored in a flat dict keyed by the reversed label string
+    ('com.bbc'), rather than a tree of per-label dicts, which keeps memory
+    to one small key per domain for lists with hundreds of thousands of
+    entries. A query walks the host's labels from the TLD down, probing
+    'com', 'com.bbc', 'com.bbc.news', ...
+    """
+
+    def __init__(self, domains=()):
+        self._entries = {}  # reversed labels -> (order, domain)
+        self.add_all(domains)
+
+    def add(self, domain):
+        domain = normalize_domain(domain)
+        if not domain:
+            return
+        key = reverse_labels(domain)
+        if key not in self._entries:
+            self._entries[key] = (len(self._entries), domain)
+
+    def add_all(self, domains):
+        for domain in domains:
+            self.add(domain)
+        return self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, host):
+        return self.lookup(host) is not None
+
+    def lookup(self, host):
+        """
+        Find the listed domain that host equals or is a subdomain of
+        Returns: the matching entry (earliest added if several), or None
+        """
+        labels = normalize_domain(host).split('.')
+        entries = self._entries
+        best = None
+        key = ''
+        for label in reversed(labels):
+            key = f"{key}.{label}" if key else label
+            entry = entries.get(key)
+            if entry is not None and (best is None or entry[0] < best[0]):
+                best = entry
+        return best[1] if best else None
+
+
+def iter_domain_file(path):
+    """
+    Stream domains from a list file without loading it whole
+    One domain per line; blank lines and '#' comments are skipped.
+    Extra columns (CSV or hosts-file style) are tolerated: the first
+    token that looks like a domain is used.
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            for token in line.replace(',', ' ').split():
+                if '.' in token and not token.replace('.', '').isdigit():
+                    yield token
+                    break
+
+
+def load_domain_list(path, index=None):
+    """Load a (possibly very large) domain list file into an index"""
+    index = index if index is not None else DomainIndex()
+    return index.add_all(iter_domain_file(path))
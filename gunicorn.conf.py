@@ -0,0 +1,49 @@
+# ====================================================
+# GUNICORN CONFIGURATION
+# ====================================================
+# Run: PRELOAD_MODELS=1 gunicorn -c gunicorn.conf.py app:app
+# Async: gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi_app:app
+#
+# With PRELOAD_MODELS=1 the app (and the tokenizer, model
+# and VADER lexicon) is imported once in the master before
+# workers fork, so every worker shares the same weights
+# copy-on-write instead of loading its own copy.
+# ====================================================
+
+import os
+
+from thread_budget import DEFAULT_WORKERS
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", DEFAULT_WORKERS))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))  # sync workers only
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")  # overridden by -k
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+preload_app = os.environ.get("PRELOAD_MODELS", "0") == "1"
+
+# Tokenizer threads must not be started before fork
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+# The app sizes its thread pools to cores // WEB_CONCURRENCY when imported
+# (thread_budget.py), so it must see the worker count gunicorn runs
+os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+
+
+def post_fork(server, worker):
+    # Without PRELOAD_MODELS the app is first imported here: size its thread
+    # budget to the final worker count (-w / --workers included)
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    # Warm-up runs in each worker (after fork) so torch's thread pools are
+    # created in the process that uses them; /ready turns 200 when done
+    import app
+    # With PRELOAD_MODELS=1 the app was imported in the master with the
+    # config file's worker count: resize torch's pool for the real one
+    app.rebudget_threads()
+    app.start_warm_up()
+
+
+def post_worker_init(worker):
+    # Worker signal handlers are reset after fork: (re)install the rule pack
+    # reload handler and start the file watcher in this worker
+    import app
+    app.watch_rule_pack()
@@ -0,0 +1,66 @@
+# ====================================================
+# LONG-DOCUMENT WINDOWING
+# ====================================================
+# Helpers for scoring articles longer than the model's
+# 512-token limit: pick a bounded set of overlapping
+# token windows and combine their class probabilities
+# into one {label, score} result.
+# ====================================================
+
+import math
+
+AGGREGATIONS = ('max', 'mean', 'weighted')
+
+
+def select_windows(count, limit):
+    """
+    Choose at most `limit` of `count` windows, evenly spread over the
+    document (first and last always included)
+    Returns: sorted window indices
+    """
+    if limit <= 0 or count <= limit:
+        return list(range(count))
+    if limit == 1:
+        return [0]
+    step = (count - 1) / (limit - 1)
+    return sorted({round(i * step) for i in range(limit)})
+
+
+def softmax(logits):
+    """Softmax over one row of logits (plain Python, no numpy needed)"""
+    peak = max(logits)
+    exps = [math.exp(x - peak) for x in logits]
+    total = sum(exps)
+    return [x / total for x in exps]
+
+
+def aggregate_window_scores(probabilities, lengths, id2label, method='max'):
+    """
+    Combine per-window class probabilities into one classification
+    probabilities: one probability row per window
+    lengths: number of real (non-padding) tokens in each window
+    method: 'max'      - label with the highest probability in any window
+            'mean'     - average of the windows
+            'weighted' - average weighted by window length in tokens
+    Returns: {'label', 'score', 'windows'}
+    """
+    if method not in AGGREGATIONS:
+        raise ValueError(f"Unknown window aggregation '{method}' (use one of {', '.join(AGGREGATIONS)})")
+    if not probabilities:
+        return None
+
+    classes = len(probabilities[0])
+    if method == 'max':
+        combined = [max(row[c] for row in probabilities) for c in range(classes)]
+    else:
+        weights = lengths if method == 'weighted' else [1] * len(probabilities)
+        total = float(sum(weights)) or 1.0
+        combined = [sum(w * row[c] for w, row in zip(weights, probabilities)) / total
+                    for c in range(classes)]
+
+    best = max(range(classes), key=lambda c: combined[c])
+    return {
+        'label': id2label.get(best, f"LABEL_{best}"),
+        'score': float(combined[best]),
+        'windows': len(probabilities)
+    }
@@ -0,0 +1,151 @@
+# ====================================================
+# DYNAMIC MICRO-BATCHING SCHEDULER
+# ====================================================
+# Concurrent single-item requests are queued, grouped
+# within a short wait window (up to a maximum batch
+# size) and scored in one batched forward pass. Each
+# caller blocks until its own result is ready.
+# ====================================================
+
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the scheduler queue is at its depth limit"""
+
+
+class MicroBatcher:
+    """Groups submitted items into batches for batch_fn
+
+    batch_fn: callable taking a list of items and returning a list of
+    results in the same order.
+    max_wait_ms: how long the first item of a batch may wait for company.
+    max_queue_depth: submissions beyond this raise QueueFullError.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0, max_queue_depth=1000,
+                 name="micro-batcher", wait_samples=1000):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_depth = max_queue_depth
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        self._pid = None
+
+        # Metrics
+        self.batch_sizes = Counter()
+        self.submitted = 0
+        self.rejected = 0
+        self.failed_batches = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent_waits = deque(maxlen=wait_samples)
+
+    def _ensure_worker(self):
+        # Threads do not survive fork: each process starts its own worker
+        if self._worker is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue_depth)
+            self._pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker.start()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, item, timeout=None):
+        """Queue one item and block until its result is available"""
+        return self.submit_async(item).result(timeout)
+
+    def submit_async(self, item):
+        """Queue one item; returns a Future for its result"""
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFullError(f"{self.name} queue is full ({self.max_queue_depth} pending)")
+        self.submitted += 1
+        return future
+
+    def _run(self):
+        work = self._queue
+        while True:
+            batch = [work.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(work.get(timeout=remaining))
+                    else:
+                        # Window closed: still take whatever is already queued
+                        batch.append(work.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        started = time.perf_counter()
+        waits = [started - enqueued for _, _, enqueued in batch]
+        self.batch_sizes[len(batch)] += 1
+        self.wait_count += len(waits)
+        self.wait_total += sum(waits)
+        self.wait_max = max(self.wait_max, max(waits))
+        self._recent_waits.extend(waits)
+
+        try:
+            results = self.batch_fn([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        waits = sorted(self._recent_waits)
+
+        def percentile(p):
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p / 100 * len(waits)))] * 1000, 3)
+
+        batches = sum(self.batch_sizes.values())
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_depth': self.queue_depth,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'batches': batches,
+            'failed_batches': self.failed_batches,
+            'mean_batch_size': round(sum(k * v for k, v in self.batch_sizes.items()) / batches, 2) if batches else 0.0,
+            'batch_size_distribution': {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            'queue_wait_ms': {
+                'mean': round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                'p50': percentile(50),
+                'p99': percentile(99),
+                'max': round(self.wait_max * 1000, 3)
+            }
+        }
@@ -0,0 +1,74 @@
+# ====================================================
+# MODEL REGISTRY
+# ====================================================
+# Load-once, thread-safe model loading. The first
+# caller of load(name, loader) runs the loader while
+# concurrent callers for the same name wait for it;
+# everyone then gets the same result. Failed loads are
+# remembered too, so a missing model is not retried on
+# every request.
+# ====================================================
+
+import threading
+import time
+from collections import Counter
+
+
+class ModelRegistry:
+    """Runs each named loader at most once per process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._name_locks = {}
+        self._results = {}
+        self._errors = {}
+        self._seconds = {}
+        self.load_counts = Counter()
+
+    def _name_lock(self, name):
+        with self._lock:
+            return self._name_locks.setdefault(name, threading.Lock())
+
+    def load(self, name, loader):
+        """
+        Return the result of loader() for `name`, calling it only once
+        An exception raised by the loader is re-raised to every caller.
+        """
+        if name in self._results:
+            return self._results[name]
+        with self._name_lock(name):
+            if name not in self._results:
+                started = time.perf_counter()
+                self.load_counts[name] += 1
+                try:
+                    result = loader()
+                except Exception as e:
+                    self._errors[name] = e
+                    result = None
+                self._seconds[name] = time.perf_counter() - started
+                self._results[name] = result
+        if name in self._errors:
+            raise self._errors[name]
+        return self._results[name]
+
+    def loaded(self, name):
+        return name in self._results
+
+    def reset(self, name=None):
+        """Forget one (or every) loaded entry so the next load() runs again"""
+        with self._lock:
+            names = [name] if name is not None else list(self._results)
+            for key in names:
+                self._results.pop(key, None)
+                self._errors.pop(key, None)
+                self._seconds.pop(key, None)
+
+    def stats(self):
+        return {
+            name: {
+                'loads': self.load_counts[name],
+                'seconds': round(self._seconds.get(name, 0.0), 3),
+                'error': str(self._errors[name]) if name in self._errors else None
+            }
+            for name in sorted(self._results)
+        }
@@ -0,0 +1,277 @@
+# ====================================================
+# NEAR-DUPLICATE INDEX (MINHASH + LSH)
+# ====================================================
+# Finds lightly edited copies of known fake articles.
+# Each article becomes a set of word shingles, summed
+# up by a MinHash signature; signatures are split into
+# bands and every band is hashed into one sorted key
+# array (locality-sensitive hashing), so a query is a
+# signature plus one vectorized binary search. The
+# candidates' signatures then estimate the Jaccard
+# similarity of their shingle sets.
+#
+# Build:  python near_duplicate.py build known_fake.jsonl known_fake.npz
+# Query:  python near_duplicate.py query known_fake.npz "article text"
+# ====================================================
+
+import sys
+import os
+import re
+import json
+import zlib
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+SHIFT_32 = np.uint64(32)
+LOW_32 = np.uint64(0xFFFFFFFF)
+# Odd 64-bit multipliers combining the word hashes of a shingle
+SHINGLE_MIX = np.random.RandomState(0).randint(1, 1 << 63, size=16, dtype=np.uint64) | np.uint64(1)
+
+# Inserts wait in a small hash table until there are this many (or 1/16 of
+# the index, whichever is larger), then are merged into the sorted keys
+MERGE_THRESHOLD = 1024
+
+
+def shingle_hashes(text, shingle_size=5):
+    """
+    32-bit hashes of the distinct word shingles of the text (empty array for no words)
+    Words are hashed once; each shingle hash mixes its words' hashes, so
+    no shingle strings are built.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    word_hashes = np.fromiter((zlib.crc32(w.encode('utf-8')) for w in words), dtype=np.uint64, count=len(words))
+    size = min(shingle_size, len(words))
+    count = len(words) - size + 1
+    mixed = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        mixed += word_hashes[offset:offset + count] * SHINGLE_MIX[offset]
+    return np.unique((mixed >> SHIFT_32) ^ (mixed & LOW_32))
+
+
+class NearDuplicateIndex:
+    """MinHash-LSH index of documents for near-duplicate lookup
+
+    num_perm: MinHash signature length (bands * rows).
+    bands: LSH bands; documents sharing any band become candidates. With
+    r = num_perm / bands rows per band, pairs above a Jaccard similarity of
+    roughly (1 / bands) ** (1 / r) are found with high probability.
+    """
+
+    def __init__(self, num_perm=128, bands=32, shingle_size=5, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.randint(1, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self._band_salt = rng.randint(0, 1 << 63, size=bands, dtype=np.uint64)
+
+        self.ids = []
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._keys = np.empty(0, dtype=np.uint64)       # sorted band keys
+        self._key_docs = np.empty(0, dtype=np.uint32)   # document of each key
+        self._pending = []                              # signatures not merged yet
+        self._pending_keys = {}                         # band key -> pending document numbers
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ------------------------------------------------
+    # Hashing
+    # ------------------------------------------------
+
+    def signature(self, text):
+        """MinHash signature of the text, or None when it has no words"""
+        hashes = shingle_hashes(text, self.shingle_size)
+        if not len(hashes):
+            return None
+        # Multiply-shift hashing: one random odd multiplier per permutation
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) >> SHIFT_32
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signatures):
+        """One 64-bit key per (document, band)"""
+        banded = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        return (banded * self._band_mix).sum(axis=2, dtype=np.uint64) + self._band_salt
+
+    # ------------------------------------------------
+    # Inserts
+    # ------------------------------------------------
+
+    def add(self, doc_id, text):
+        """Index one document; returns False when the text has no words"""
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        self.add_signature(doc_id, signature)
+        return True
+
+    def add_signature(self, doc_id, signature):
+        number = len(self.ids)
+        self.ids.append(doc_id)
+        self._pending.append(signature)
+        for key in self._band_keys(signature[None, :])[0].tolist():
+            self._pending_keys.setdefault(key, []).append(number)
+        if len(self._pending) >= max(MERGE_THRESHOLD, len(self._signatures) // 16):
+            self._merge_pending()
+
+    def add_many(self, documents):
+        """
+        Index (doc_id, text) pairs in bulk; returns how many were added
+        Signatures are merged in blocks that grow with the index (so
+        bulk loads stay O(n log n)), skipping the pending table.
+        """
+        self._merge_pending()
+        added = 0
+        ids, block = [], []
+        for doc_id, text in documents:
+            signature = self.signature(text)
+            if signature is None:
+                continue
+            ids.append(doc_id)
+            block.append(signature)
+            if len(block) >= max(MERGE_THRESHOLD, len(self._signatures)):
+                self.ids.extend(ids)
+                self._merge(np.vstack(block))
+                added += len(block)
+                ids, block = [], []
+        if block:
+            self.ids.extend(ids)
+            self._merge(np.vstack(block))
+            added += len(block)
+        return added
+
+    def _merge_pending(self):
+        if self._pending:
+            self._merge(np.vstack(self._pending))
+            self._pending = []
+            self._pending_keys = {}
+
+    def _merge(self, new):
+        """Append signatures (already in self.ids) and merge their band keys into the sorted arrays"""
+        first = len(self._signatures)
+        keys = self._band_keys(new).ravel()
+        docs = np.repeat(np.arange(first, first + len(new), dtype=np.uint32), self.bands)
+        order = np.argsort(keys, kind='stable')
+        keys, docs = keys[order], docs[order]
+        # Linear merge of two sorted arrays instead of re-sorting everything
+        positions = np.searchsorted(self._keys, keys, side='right')
+        self._keys = np.insert(self._keys, positions, keys)
+        self._key_docs = np.insert(self._key_docs, positions, docs)
+        self._signatures = np.vstack([self._signatures, new])
+
+    # ------------------------------------------------
+    # Queries
+    # ------------------------------------------------
+
+    def query(self, text, top_k=3, min_similarity=0.5):
+        """
+        Closest indexed documents to the text
+        Returns: [(doc_id, estimated Jaccard similarity)], best first
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        return self.query_signature(signature, top_k, min_similarity)
+
+    def query_signature(self, signature, top_k=3, min_similarity=0.5):
+        keys = self._band_keys(signature[None, :])[0]
+        starts = np.searchsorted(self._keys, keys, side='left')
+        ends = np.searchsorted(self._keys, keys, side='right')
+        hits = [self._key_docs[s:e] for s, e in zip(starts, ends) if e > s]
+        if self._pending_keys:
+            pending = [n for key in keys.tolist() for n in self._pending_keys.get(key, ())]
+            if pending:
+                hits.append(np.array(pending, dtype=np.uint32))
+        if not hits:
+            return []
+        candidates = np.unique(np.concatenate(hits))
+        # Candidates are sorted, so merged documents come before pending ones
+        merged = len(self._signatures)
+        signatures = self._signatures[candidates[candidates < merged]]
+        if candidates[-1] >= merged:
+            pending = [self._pending[n - merged] for n in candidates[candidates >= merged].tolist()]
+            signatures = np.vstack([signatures] + pending)
+        similarity = (signatures == signature).mean(axis=1)
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+        best = np.argsort(-similarity, kind='stable')[:top_k]
+        return [(self.ids[candidates[i]], round(float(similarity[i]), 4)) for i in best]
+
+    # ------------------------------------------------
+    # Persistence
+    # ------------------------------------------------
+
+    def save(self, path):
+        """
+        Write signatures, ids and settings to one .npz file
+        Band keys are rebuilt on load, which keeps the file to about
+        num_perm * 4 bytes per document plus the ids.
+        """
+        self._merge_pending()
+        ids = json.dumps(self.ids).encode('utf-8')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     config=np.array([self.num_perm, self.bands, self.shingle_size, self.seed], dtype=np.int64),
+                     signatures=self._signatures,
+                     ids=np.frombuffer(ids, dtype=np.uint8))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            num_perm, bands, shingle_size, seed = (int(v) for v in data['config'])
+            index = cls(num_perm=num_perm, bands=bands, shingle_size=shingle_size, seed=seed)
+            index.ids = json.loads(data['ids'].tobytes().decode('utf-8'))
+            signatures = data['signatures']
+        if len(signatures):
+            index._merge(signatures)
+        return index
+
+
+def iter_corpus(path, id_field='id', text_field='text'):
+    """
+    Yield (doc_id, text) from a JSONL file of {id, text} records or a
+    directory of .txt files (file name as id)
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.txt'):
+                with open(os.path.join(path, name), encoding='utf-8') as f:
+                    yield name[:-4], f.read()
+        return
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f):
+            if line.strip():
+                record = json.loads(line)
+                yield str(record.get(id_field, number)), record.get(text_field) or ''
+
+
+def build_index(corpus_path, **options):
+    index = NearDuplicateIndex(**options)
+    index.add_many(iter_corpus(corpus_path))
+    return index
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == 'build':
+        index = build_index(sys.argv[2])
+        index.save(sys.argv[3])
+        print(f"✓ Indexed {len(index)} documents into {sys.argv[3]}")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'query':
+        for doc_id, similarity in NearDuplicateIndex.load(sys.argv[2]).query(sys.argv[3], top_k=5, min_similarity=0.0):
+            print(f"{similarity:.3f}  {doc_id}")
+    else:
+        print("Usage: python near_duplicate.py build <corpus.jsonl|dir> <index.npz>")
+        print("       python near_duplicate.py query <index.npz> <text>")
+        sys.exit(1)
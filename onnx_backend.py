@@ -0,0 +1,149 @@
+# ====================================================
+# ONNX RUNTIME INFERENCE BACKEND (INT8)
+# ====================================================
+# CPU backend for the fake news classifier: the
+# transformer is exported to ONNX once, weights are
+# dynamically quantized to int8, and inference runs on
+# ONNX Runtime instead of PyTorch.
+#
+# Export (needs torch, onnx and onnxruntime):
+#   python onnx_backend.py export [output_dir]
+# Serve:
+#   ML_BACKEND=onnx python app.py
+# ====================================================
+
+import os
+import sys
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = "DavideRatti/fake_news_detector"
+DEFAULT_ONNX_DIR = os.environ.get("ONNX_MODEL_DIR", "onnx_model")
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+
+
+def export_model(model_name=DEFAULT_MODEL_NAME, output_dir=DEFAULT_ONNX_DIR, quantize=True):
+    """
+    Export the Hugging Face model to ONNX and quantize it to int8
+    Returns: path of the model file to serve
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.config.return_dict = False
+    model.eval()
+
+    os.makedirs(output_dir, exist_ok=True)
+    sample = tokenizer(["Export sample text."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = os.path.join(output_dir, FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+
+    # Tokenizer and label names travel with the model
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    int8_path = os.path.join(output_dir, INT8_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxTextClassifier:
+    """Drop-in replacement for the transformers text-classification pipeline
+
+    Called like the pipeline: a string gives [{'label', 'score'}], a list
+    of strings gives one {'label', 'score'} per string, scored in padded
+    batches of batch_size.
+    """
+
+    def __init__(self, model_path, tokenizer, id2label, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = tokenizer
+        self.id2label = {int(k): v for k, v in id2label.items()}
+        self.model_path = model_path
+
+    def __call__(self, inputs, batch_size=1, truncation=True, max_length=512, **kwargs):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        results = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            results.extend(self._classify(texts[start:start + batch_size], truncation, max_length))
+        return results
+
+    def logits(self, texts, truncation=True, max_length=512):
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=truncation,
+            max_length=max_length,
+            return_tensors="np"
+        )
+        return self.logits_from_encoding(encoded)
+
+    def logits_from_encoding(self, encoded):
+        """Run already-tokenized (padded) inputs through the model"""
+        feed = {name: np.asarray(encoded[name]).astype(np.int64) for name in self.input_names}
+        return self.session.run(None, feed)[0]
+
+    def _classify(self, texts, truncation, max_length):
+        logits = self.logits(texts, truncation, max_length)
+        # Softmax, as the pipeline does for single-label classifiers
+        shifted = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(shifted)
+        probs /= probs.sum(axis=-1, keepdims=True)
+        best = probs.argmax(axis=-1)
+        return [
+            {'label': self.id2label.get(int(i), f"LABEL_{int(i)}"), 'score': float(p[i])}
+            for i, p in zip(best, probs)
+        ]
+
+
+def load_classifier(model_dir=DEFAULT_ONNX_DIR, quantized=True, num_threads=None):
+    """Load an exported model directory as an OnnxTextClassifier"""
+    from transformers import AutoTokenizer, AutoConfig
+
+    model_file = INT8_FILE if quantized else FP32_FILE
+    model_path = os.path.join(model_dir, model_file)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"{model_path} not found; run: python onnx_backend.py export {model_dir}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    config = AutoConfig.from_pretrained(model_dir)
+    return OnnxTextClassifier(model_path, tokenizer, config.id2label, num_threads=num_threads)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'export':
+        print("Usage: python onnx_backend.py export [output_dir] [--no-quantize]")
+        sys.exit(1)
+    args = [a for a in sys.argv[2:] if not a.startswith('--')]
+    path = export_model(output_dir=args[0] if args else DEFAULT_ONNX_DIR,
+                        quantize='--no-quantize' not in sys.argv)
+    print(f"✓ Exported {path}")
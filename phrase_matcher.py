@@ -0,0 +1,135 @@
+# ====================================================
+# MULTI-PATTERN PHRASE MATCHER (AHO-CORASICK)
+# ====================================================
+# Compiles every rule phrase list into one automaton so
+# the lowered text is scanned a single time per request,
+# whatever the number of phrases.
+# ====================================================
+
+from collections import deque
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over phrases tagged by category.
+
+    Match semantics are the same as ``phrase in text``: a phrase is reported
+    once if it occurs anywhere in the text (overlaps included). Results keep
+    the order (and duplicates) of the lists the phrases were added from, so
+    callers see exactly what a loop over the original list would produce.
+    """
+
+    def __init__(self):
+        self._goto = [{}]       # state -> {char: next_state}
+        self._fail = [0]
+        self._out = [[]]        # state -> [entry_id, ...] (incl. fail links)
+        self._delta = []        # state -> {char: next_state}, filled while scanning
+        self._alphabet = frozenset()  # Every char of every phrase
+        self._entries = []      # entry_id -> (category, phrase)
+        self._categories = []
+        self._built = False
+
+    def add(self, phrase, category):
+        """Register a phrase under a category (call ``build`` afterwards)"""
+        entry_id = len(self._entries)
+        self._entries.append((category, phrase))
+        if category not in self._categories:
+            self._categories.append(category)
+
+        state = 0
+        for char in phrase:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(entry_id)
+        self._built = False
+
+    def add_all(self, phrases, category):
+        for phrase in phrases:
+            self.add(phrase, category)
+        return self
+
+    def build(self):
+        """Compute failure links breadth-first and merge output sets"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            current = queue.popleft()
+            for char, nxt in self._goto[current].items():
+                queue.append(nxt)
+                fallback = self._fail[current]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+        # Transitions with failure links folded in are memoized per state
+        # on first use, so the scan loop never walks failure links twice.
+        # Only chars of the phrases are memoized: any other char leads back
+        # to the root from every state, and memoizing those would let the
+        # text (not the rules) grow the tables without bound.
+        self._delta = [dict(edges) for edges in self._goto]
+        self._alphabet = frozenset(char for edges in self._goto for char in edges)
+        self._built = True
+        return self
+
+    def _transition(self, state, char):
+        goto = self._goto
+        while state and char not in goto[state]:
+            state = self._fail[state]
+        return goto[state].get(char, 0)
+
+    def tables(self):
+        """
+        The built automaton as plain lists, for serializing (rule_pack.py)
+        Returns: (goto, fail, out, entries, categories)
+        """
+        if not self._built:
+            self.build()
+        return self._goto, self._fail, self._out, self._entries, self._categories
+
+    @property
+    def categories(self):
+        return list(self._categories)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def scan(self, text_lower):
+        """
+        Scan already-lowered text once.
+        Returns: dict of category -> list of matched phrases
+        """
+        if not self._built:
+            self.build()
+
+        delta = self._delta
+        alphabet = self._alphabet
+        out = self._out
+        found = set()
+        state = 0
+
+        for char in text_lower:
+            nxt = delta[state].get(char)
+            if nxt is None:
+                if char in alphabet:
+                    nxt = delta[state][char] = self._transition(state, char)
+                else:
+                    nxt = 0
+            state = nxt
+            if out[state]:
+                found.update(out[state])
+
+        hits = {category: [] for category in self._categories}
+        for entry_id in sorted(found):
+            category, phrase = self._entries[entry_id]
+            hits[category].append(phrase)
+        return hits
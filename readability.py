@@ -0,0 +1,101 @@
+# ====================================================
+# READABILITY (FLESCH SCORES IN ONE PASS)
+# ====================================================
+# Flesch Reading Ease and Flesch-Kincaid Grade from a
+# single count of words, sentences and syllables,
+# following textstat's (en_US) definitions: textstat
+# re-tokenizes the text for each metric and hyphenates
+# every word again on every request.
+#
+# Syllables come from the same pyphen hyphenation
+# dictionary textstat uses, memoized per word in a
+# bounded table shared by all requests; without pyphen
+# a vowel-group estimate is used instead.
+# ====================================================
+
+import os
+import re
+import math
+from collections import Counter
+
+try:
+    from pyphen import Pyphen
+    _hyphenator = Pyphen(lang='en_US')
+except ImportError:
+    _hyphenator = None
+
+PUNCTUATION = re.compile(r'[^\w\s]')
+SENTENCE_PATTERN = re.compile(r'\b[^.!?]+[.!?]*')
+# Three words (whitespace tokens with a word character, which survive
+# punctuation removal), skipping punctuation-only tokens
+_WORD = r'[^\w\s]*\w\S*'
+_SKIP = r'(?:[^\w\s]+\s+)*'
+THREE_WORDS = re.compile(rf'\s*{_SKIP}(?:{_WORD}\s+{_SKIP}){{2}}[^\w\s]*\w')
+VOWEL_GROUPS = re.compile(r'[aeiouy]+')
+
+# Words kept in the syllable memo; once full, new words are counted but not stored
+SYLLABLE_CACHE_SIZE = int(os.environ.get("SYLLABLE_CACHE_SIZE", 100000))
+_syllables = {}
+
+
+def _round(number, points):
+    """textstat's rounding (half away from zero)"""
+    p = 10 ** points
+    return float(math.floor((number * p) + math.copysign(0.5, number))) / p
+
+
+def _estimate_syllables(word):
+    """Vowel groups, less a silent final 'e' (fallback without pyphen)"""
+    count = len(VOWEL_GROUPS.findall(word))
+    if word.endswith('e') and not word.endswith('le') and count > 1:
+        count -= 1
+    return max(1, count)
+
+
+def syllables(word):
+    """Syllables of a lowercase, punctuation-free word (memoized)"""
+    count = _syllables.get(word)
+    if count is None:
+        if _hyphenator is not None:
+            count = len(_hyphenator.positions(word)) + 1
+            # pyphen keeps its own unbounded per-word cache; this memo replaces it
+            _hyphenator.hd.cache.pop(word, None)
+        else:
+            count = _estimate_syllables(word)
+        if len(_syllables) < SYLLABLE_CACHE_SIZE:
+            _syllables[word] = count
+    return count
+
+
+def text_counts(text):
+    """
+    (words, sentences, syllables) as textstat counts them
+    A sentence with two words or fewer is not counted; there is always at
+    least one sentence.
+    """
+    words = Counter(PUNCTUATION.sub('', text.lower()).split())
+    syllable_count = sum(syllables(word) * n for word, n in words.items())
+    sentences = sum(1 for long_enough in map(THREE_WORDS.match, SENTENCE_PATTERN.findall(text)) if long_enough)
+    return sum(words.values()), max(1, sentences), syllable_count
+
+
+def readability_scores(text):
+    """Returns: (Flesch Reading Ease, Flesch-Kincaid Grade), rounded as textstat rounds them"""
+    words, sentences, syllable_count = text_counts(text)
+    sentence_length = _round(float(words / sentences), 1)
+    syllables_per_word = _round(float(syllable_count) / float(words), 1) if words else 0.0
+    reading_ease = 206.835 - float(1.015 * sentence_length) - float(84.6 * syllables_per_word)
+    grade = float(0.39 * sentence_length) + float(11.8 * syllables_per_word) - 15.59
+    return _round(reading_ease, 2), _round(grade, 1)
+
+
+def flesch_reading_ease(text):
+    return readability_scores(text)[0]
+
+
+def flesch_kincaid_grade(text):
+    return readability_scores(text)[1]
+
+
+def cache_info():
+    return {'words': len(_syllables), 'max_words': SYLLABLE_CACHE_SIZE, 'pyphen': _hyphenator is not None}
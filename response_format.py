@@ -0,0 +1,128 @@
+# ====================================================
+# RESPONSE SHAPING
+# ====================================================
+# Field selection for /predict responses, a fast JSON
+# encoder (orjson, when installed) and gzip / Brotli
+# compression negotiated from Accept-Encoding.
+# ====================================================
+
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Top-level fields of a detection result; 'details.<key>' selects one entry of details
+RESPONSE_FIELDS = ('result', 'confidence', 'explanation', 'source_credibility', 'details')
+COMPACT_FIELDS = ('result', 'confidence')
+
+# Parts of a result that cost something to build
+RESULT_PARTS = ('explanation', 'details')
+
+
+def parse_fields(fields=None, verbose=None):
+    """
+    Requested fields from a `fields` value (comma-separated string or list)
+    and a `verbose` flag; None means the full result
+    Raises ValueError for unknown fields.
+    """
+    if fields is None or fields == '':
+        if verbose is None or str(verbose).lower() not in ('false', '0', 'no'):
+            return None
+        return COMPACT_FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+        raise ValueError('fields must be a comma-separated string or a list of strings')
+    parsed = []
+    for field in (f.strip() for f in fields):
+        name, dot, key = field.partition('.')
+        if name not in RESPONSE_FIELDS or (dot and (name != 'details' or not key)):
+            raise ValueError(f"Unknown field '{field}' (choose from {', '.join(RESPONSE_FIELDS)}, details.<key>)")
+        if field not in parsed:
+            parsed.append(field)
+    return tuple(parsed)
+
+
+def result_parts(fields):
+    """Which of RESULT_PARTS the requested fields need"""
+    if fields is None:
+        return RESULT_PARTS
+    return tuple(part for part in RESULT_PARTS
+                 if any(f == part or f.startswith(part + '.') for f in fields))
+
+
+def select_fields(result, fields):
+    """
+    The requested fields of a result (error results are returned as they are)
+    A `degraded` flag is always kept.
+    """
+    if fields is None or 'error' in result:
+        return result
+    whole = {f for f in fields if '.' not in f}
+    selected = {}
+    for field in fields:
+        name, _, key = field.partition('.')
+        if name not in result:
+            continue
+        if not key:
+            selected[name] = result[name]
+        elif name not in whole and key in result[name]:
+            selected.setdefault(name, {})[key] = result[name][key]
+    if result.get('degraded'):
+        selected['degraded'] = True
+    return selected
+
+
+def dumps(payload):
+    """JSON bytes of the payload (orjson when installed)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Best content coding the client accepts: 'br' (if brotli is installed),
+    'gzip' or None
+    """
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+
+    def quality(coding):
+        return accepted.get(coding, accepted.get('*', 0.0))
+
+    best = None
+    for coding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        if quality(coding) > 0 and (best is None or quality(coding) > quality(best)):
+            best = coding
+    return best
+
+
+def compress(body, encoding, gzip_level=6, brotli_quality=4):
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
@@ -0,0 +1,99 @@
+# ====================================================
+# RESULT CACHE (LRU + TTL)
+# ====================================================
+# In-process cache for detect_fake_news results, keyed
+# by a content hash so repeated submissions of the same
+# article skip every analysis stage.
+# ====================================================
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_key(text, url, version):
+    """Hash the text, URL and model/rule version into a cache key"""
+    digest = hashlib.sha256()
+    for part in (version, url or '', text):
+        data = part.encode('utf-8', 'surrogatepass')
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a per-entry time-to-live"""
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        """Return a copy of the cached value, or None on miss/expiry"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def contains(self, key):
+        """Check for a live entry without touching LRU order or counters"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > self._clock()
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Compiled rule packs
+
+A rule pack replaces the built-in phrase and domain lists of app.py. It is
+written as a plain-text source file and compiled offline into one binary
+artifact: the phrase matcher automaton (failure links and merged outputs
+precomputed), hashed domain indexes and the lists themselves. Workers map
+the artifact read-only (RULE_PACK_PATH), so loading takes no parsing or
+building and every worker on the host shares the same pages.
+
+Source format: a `[section]` line starts each list, then one entry per
+line. `#` lines are comments, and `@file path` streams a large list file
+(relative to the source) into the section. Sections: keyword, known_fake,
+fact_checkable, trusted, untrusted, suspicious_domain.
+
+Run:
+  python rule_pack.py export -o rules.txt                 # built-in lists as a source file
+  python rule_pack.py compile rules.txt -o rules.pack     # atomic replace: workers reload it
+  python rule_pack.py info rules.pack
+"""
+
+import sys
+import os
+import argparse
+import hashlib
+import json
+import mmap
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+
+from phrase_matcher import PhraseMatcher
+from domain_index import normalize_domain, reverse_labels, iter_domain_file
+
+MAGIC = b'FNRPACK\x00'
+FORMAT_VERSION = 1
+
+# Source sections, in the order of app._rule_lists()
+PHRASE_SECTIONS = ('keyword', 'known_fake', 'fact_checkable')
+DOMAIN_SECTIONS = ('trusted', 'untrusted')
+SECTIONS = PHRASE_SECTIONS + DOMAIN_SECTIONS + ('suspicious_domain',)
+
+# ====================================================
+# SOURCE FILES
+# ====================================================
+
+def _iter_lines(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+
+def read_rule_source(path):
+    """
+    Parse a rule source file
+    Returns: dict of section -> list of entries (phrases lowercased, order
+             and duplicates kept)
+    Raises ValueError on an unknown section or an entry outside a section.
+    """
+    lists = {section: [] for section in SECTIONS}
+    base = os.path.dirname(os.path.abspath(path))
+    current = None
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                current = line[1:-1].strip()
+                if current not in lists:
+                    raise ValueError(f"{path}:{number}: unknown section [{current}] "
+                                     f"(choose from {', '.join(SECTIONS)})")
+                continue
+            if current is None:
+                raise ValueError(f"{path}:{number}: entry outside a [section]")
+            if line.startswith('@file '):
+                include = os.path.join(base, line[len('@file '):].strip())
+                entries = iter_domain_file(include) if current in DOMAIN_SECTIONS else _iter_lines(include)
+            else:
+                entries = [line]
+            if current in DOMAIN_SECTIONS:
+                lists[current].extend(entries)
+            else:
+                lists[current].extend(entry.lower() for entry in entries)
+    return lists
+
+
+def write_rule_source(lists, path):
+    """Write lists (section -> entries) as a rule source file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Fake news detection rule pack\n")
+        f.write("# Compile with: python rule_pack.py compile <this file> -o rules.pack\n")
+        for section in SECTIONS:
+            f.write(f"\n[{section}]\n")
+            for entry in lists.get(section, ()):
+                f.write(f"{entry}\n")
+
+# ====================================================
+# COMPILING
+# ====================================================
+# Layout: MAGIC, a little JSON header (uint32 length
+# first) with each section's offset, then the sections,
+# 8-byte aligned. Every array is native-endian uint32;
+# strings are UTF-8 blobs with an offsets array.
+
+def _string_table(strings):
+    offsets = array('I', [0])
+    data = bytearray()
+    for string in strings:
+        data += string.encode('utf-8')
+        offsets.append(len(data))
+    return offsets.tobytes(), bytes(data)
+
+
+def _automaton(phrase_lists):
+    matcher = PhraseMatcher()
+    for section in PHRASE_SECTIONS:
+        matcher.add_all(phrase_lists.get(section, ()), section)
+    goto, fail, out, entries, _ = matcher.tables()
+    categories = list(PHRASE_SECTIONS)  # Empty sections still get a (empty) hits list
+
+    # Edges of each state sorted by code point, for a binary search
+    edge_start, edge_char, edge_next = array('I'), array('I'), array('I')
+    out_start, out_ids = array('I'), array('I')
+    for edges, outputs in zip(goto, out):
+        edge_start.append(len(edge_char))
+        for code, nxt in sorted((ord(char), nxt) for char, nxt in edges.items()):
+            edge_char.append(code)
+            edge_next.append(nxt)
+        out_start.append(len(out_ids))
+        out_ids.extend(outputs)
+    edge_start.append(len(edge_char))
+    out_start.append(len(out_ids))
+
+    sections = {
+        'ac.edge_start': edge_start.tobytes(),
+        'ac.edge_char': edge_char.tobytes(),
+        'ac.edge_next': edge_next.tobytes(),
+        'ac.fail': array('I', fail).tobytes(),
+        'ac.out_start': out_start.tobytes(),
+        'ac.out': out_ids.tobytes(),
+        'ac.category': array('I', [categories.index(category) for category, _ in entries]).tobytes()
+    }
+    sections['ac.phrase.offsets'], sections['ac.phrase.data'] = _string_table(phrase for _, phrase in entries)
+    return sections, categories, len(goto)
+
+
+def _domain_index(name, domains):
+    # Same entries as DomainIndex (reversed labels, first occurrence wins),
+    # in an open-addressing hash table of crc32(key) -> entry number + 1
+    order = {}
+    for domain in domains:
+        domain = normalize_domain(domain)
+        if domain:
+            order.setdefault(reverse_labels(domain).encode('utf-8'), len(order))
+    keys = list(order)
+    slots = array('I', bytes(4 * _table_size(len(keys))))
+    mask = len(slots) - 1
+    for number, key in enumerate(keys):
+        slot = zlib.crc32(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = number + 1
+    sections = {f'dom.{name}.slots': slots.tobytes(), f'dom.{name}.order': array('I', order.values()).tobytes()}
+    sections[f'dom.{name}.offsets'], sections[f'dom.{name}.data'] = _string_table(key.decode('utf-8') for key in keys)
+    return sections
+
+
+def _table_size(entries):
+    # Power of two, at most half full
+    size = 8
+    while size < 2 * entries:
+        size *= 2
+    return size
+
+
+def compile_rules(lists, name='rules'):
+    """Compile lists (section -> entries) into rule pack bytes"""
+    sections = {}
+    for section in SECTIONS:
+        sections[f'list.{section}.offsets'], sections[f'list.{section}.data'] = _string_table(lists.get(section, ()))
+    automaton, categories, states = _automaton(lists)
+    sections.update(automaton)
+    for section in DOMAIN_SECTIONS:
+        sections.update(_domain_index(section, lists.get(section, ())))
+
+    digest = hashlib.sha256()
+    for key in sorted(sections):
+        digest.update(key.encode('utf-8'))
+        digest.update(sections[key])
+
+    header = {
+        'format': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'name': name,
+        'digest': digest.hexdigest(),
+        'compiled_at': time.time(),
+        'categories': categories,
+        'states': states,
+        'counts': {section: len(lists.get(section, ())) for section in SECTIONS},
+        'sections': {}
+    }
+    # Section offsets are relative to the (aligned) end of the header
+    position = 0
+    for key in sorted(sections):
+        header['sections'][key] = [position, len(sections[key])]
+        position = _align(position + len(sections[key]))
+    header['data_bytes'] = position
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    base = _align(len(MAGIC) + 4 + len(encoded))
+
+    out = bytearray(base + position)
+    out[:len(MAGIC)] = MAGIC
+    out[len(MAGIC):len(MAGIC) + 4] = len(encoded).to_bytes(4, 'little')
+    out[len(MAGIC) + 4:len(MAGIC) + 4 + len(encoded)] = encoded
+    for key, (offset, length) in header['sections'].items():
+        out[base + offset:base + offset + length] = sections[key]
+    return bytes(out)
+
+
+def _align(position, to=8):
+    return (position + to - 1) // to * to
+
+
+def write_pack(data, path):
+    """Write rule pack bytes atomically (readers see the old file or the new one, never part of one)"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# ====================================================
+# MAPPED RULE PACK
+# ====================================================
+
+class StringTable:
+    """Read-only list of strings in a rule pack (decoded on access)"""
+
+    def __init__(self, offsets, data, label):
+        self._offsets = offsets
+        self._data = data
+        self._label = label
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        # Names the pack and section rather than decoding every entry
+        return f"<{self._label}: {len(self)} entries>"
+
+
+class MappedMatcher:
+    """PhraseMatcher over a rule pack's automaton arrays (same scan results)
+
+    Transitions taken while scanning are memoized per process, as in
+    PhraseMatcher, so the binary searches run once per (state, char). As
+    there, only chars of the phrases are memoized, which bounds the memo
+    by the pack rather than by the text scanned.
+    """
+
+    def __init__(self, arrays, phrases, categories):
+        self._edge_start = arrays['ac.edge_start']
+        self._edge_char = arrays['ac.edge_char']
+        self._edge_next = arrays['ac.edge_next']
+        self._fail = arrays['ac.fail']
+        self._out_start = arrays['ac.out_start']
+        self._out = arrays['ac.out']
+        self._category = arrays['ac.category']
+        self._phrases = phrases
+        self._categories = list(categories)
+        self._rows = None  # state -> {char: next state, ~state if it has outputs}
+        self._alphabet = None  # Every char of every phrase (read on first scan)
+
+    @property
+    def categories(self):
+        return list(self._categories)
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def _goto(self, state, code):
+        lo, hi = self._edge_start[state], self._edge_start[state + 1]
+        i = bisect_left(self._edge_char, code, lo, hi)
+        if i < hi and self._edge_char[i] == code:
+            return self._edge_next[i]
+        return None
+
+    def _step(self, state, char):
+        code = ord(char)
+        current = state
+        while True:
+            nxt = self._goto(current, code)
+            if nxt is not None or current == 0:
+                break
+            current = self._fail[current]
+        nxt = nxt or 0
+        if self._out_start[nxt] != self._out_start[nxt + 1]:
+            nxt = ~nxt
+        row = self._rows[state]
+        if row is None:
+            row = self._rows[state] = {}
+        row[char] = nxt
+        return nxt
+
+    def scan(self, text_lower):
+        """
+        Scan already-lowered text once.
+        Returns: dict of category -> list of matched phrases
+        """
+        rows = self._rows
+        if rows is None:
+            self._alphabet = frozenset(map(chr, set(self._edge_char)))
+            rows = self._rows = [None] * len(self._fail)
+        alphabet = self._alphabet
+        # Any other char leads back to the root from every state
+        root = ~0 if self._out_start[0] != self._out_start[1] else 0
+        matched = set()
+        state = 0
+
+        for char in text_lower:
+            row = rows[state]
+            nxt = row.get(char) if row is not None else None
+            if nxt is None:
+                nxt = self._step(state, char) if char in alphabet else root
+            if nxt < 0:
+                state = ~nxt
+                matched.add(state)
+            else:
+                state = nxt
+
+        found = set()
+        for state in matched:
+            found.update(self._out[self._out_start[state]:self._out_start[state + 1]])
+        hits = {category: [] for category in self._categories}
+        for entry_id in sorted(found):
+            hits[self._categories[self._category[entry_id]]].append(self._phrases[entry_id])
+        return hits
+
+
+class MappedDomainIndex:
+    """DomainIndex over a rule pack's hash table of reversed-label keys (same lookups)"""
+
+    def __init__(self, slots, order, offsets, data):
+        self._slots = slots
+        self._mask = len(slots) - 1
+        self._order = order
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, host):
+        return self.lookup(host) is not None
+
+    def _find(self, key):
+        slots, offsets, data = self._slots, self._offsets, self._data
+        slot = zlib.crc32(key) & self._mask
+        while slots[slot]:
+            number = slots[slot] - 1
+            if data[offsets[number]:offsets[number + 1]] == key:
+                return self._order[number]
+            slot = (slot + 1) & self._mask
+        return None
+
+    def lookup(self, host):
+        """
+        Find the listed domain that host equals or is a subdomain of
+        Returns: the matching entry (earliest listed if several), or None
+        """
+        labels = normalize_domain(host).split('.')
+        best = None
+        key = ''
+        for label in reversed(labels):
+            key = f"{key}.{label}" if key else label
+            order = self._find(key.encode('utf-8'))
+            if order is not None and (best is None or order < best[0]):
+                best = (order, key)
+        return reverse_labels(best[1]) if best else None
+
+
+class RulePack:
+    """A compiled rule pack over a buffer (normally a read-only mmap of the file)
+
+    Nothing is copied out of the buffer when it is opened: the lists,
+    matcher and domain indexes read from it directly. The mapping stays
+    open while anything still holds one of them, so a replaced pack is
+    released only once the requests using it have finished.
+    """
+
+    def __init__(self, buffer, path=None):
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a rule pack (bad magic)")
+        length = int.from_bytes(view[len(MAGIC):len(MAGIC) + 4], 'little')
+        header = json.loads(bytes(view[len(MAGIC) + 4:len(MAGIC) + 4 + length]))
+        if header.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported rule pack format {header.get('format')} (expected {FORMAT_VERSION})")
+        if header.get('byteorder') != sys.byteorder:
+            raise ValueError(f"Rule pack compiled for {header.get('byteorder')}-endian machines; recompile it")
+        base = _align(len(MAGIC) + 4 + length)
+        if len(view) != base + header['data_bytes']:
+            raise ValueError(f"Truncated rule pack ({len(view)} of {base + header['data_bytes']} bytes)")
+
+        self.path = path
+        self.header = header
+        self.name = header['name']
+        self.digest = header['digest']
+        self.size = len(view)
+        self.loaded_at = time.time()
+
+        sections = {}
+        for key, (offset, size) in header['sections'].items():
+            section = view[base + offset:base + offset + size]
+            sections[key] = section if key.endswith('.data') else section.cast('I')
+
+        label = f"rule pack {self.digest[:16]}"
+        self.lists = {section: StringTable(sections[f'list.{section}.offsets'], sections[f'list.{section}.data'],
+                                           f"{section} from {label}")
+                      for section in SECTIONS}
+        self.matcher = MappedMatcher(sections, StringTable(sections['ac.phrase.offsets'], sections['ac.phrase.data'],
+                                                           f"phrases from {label}"), header['categories'])
+        self.trusted, self.untrusted = (
+            MappedDomainIndex(sections[f'dom.{name}.slots'], sections[f'dom.{name}.order'], sections[f'dom.{name}.offsets'],
+                              sections[f'dom.{name}.data'])
+            for name in DOMAIN_SECTIONS)
+
+    @classmethod
+    def open(cls, path):
+        """Map a rule pack file read-only (raises OSError / ValueError)"""
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapping, path)
+
+    def info(self):
+        return {
+            'name': self.name,
+            'digest': self.digest,
+            'path': self.path,
+            'compiled_at': self.header['compiled_at'],
+            'loaded_at': self.loaded_at,
+            'bytes': self.size,
+            'counts': self.header['counts']
+        }
+
+# ====================================================
+# FILE WATCHER
+# ====================================================
+
+def file_signature(path):
+    """Identity of a file's current content (a replaced file gets a new inode)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class FileWatcher:
+    """Calls on_change(path) from a daemon thread whenever the file is replaced or modified"""
+
+    def __init__(self, path, on_change, interval=2.0, name="rule-pack-watch"):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.name = name
+        self._signature = file_signature(path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """Run on_change if the file changed since the last check; returns whether it did"""
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        self.on_change(self.path)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Warning: watching {self.path} failed: {e}")
+
+# ====================================================
+# COMMAND LINE
+# ====================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="write the built-in lists of app.py as a rule source file")
+    export.add_argument('-o', '--output', required=True)
+    build = commands.add_parser('compile', help="compile a rule source file into a rule pack")
+    build.add_argument('source')
+    build.add_argument('-o', '--output', required=True)
+    build.add_argument('--name', default=None, help="pack name (default: the source file name)")
+    show = commands.add_parser('info', help="describe a compiled rule pack")
+    show.add_argument('pack')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        import app
+        lists = dict(zip(SECTIONS, app._rule_lists()))
+        write_rule_source(lists, args.output)
+        print(f"Wrote {sum(map(len, lists.values()))} entries to {args.output}")
+    elif args.command == 'compile':
+        started = time.perf_counter()
+        data = compile_rules(read_rule_source(args.source), args.name or os.path.basename(args.source))
+        write_pack(data, args.output)
+        pack = RulePack(data)
+        print(f"Compiled {args.output}: {len(data)} bytes, digest {pack.digest[:16]}, "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms")
+    else:
+        print(json.dumps(RulePack.open(args.pack).info(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+# ====================================================
+# SENTIMENT ENGINE (PRECOMPILED VADER)
+# ====================================================
+# VADER's rules (as in nltk.sentiment.vader) over a
+# lexicon compiled once into a lookup table, scoring
+# whitespace tokens the caller already has (the shared
+# TextFeatures tokens). nltk rebuilds a punctuation x
+# word table and searches the token list for every
+# token on every call, which makes long articles
+# quadratic; here each text is one linear pass.
+#
+# Scores are the same as SentimentIntensityAnalyzer's,
+# including its quirks (a repeated word is scored with
+# the context of its first occurrence).
+# ====================================================
+
+import math
+import re
+import string
+
+NLTK_LEXICON = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+
+B_INCR = 0.293
+B_DECR = -0.293
+C_INCR = 0.733
+N_SCALAR = -0.74
+
+NEGATE = frozenset({
+    "aint", "arent", "cannot", "cant", "couldnt", "darent", "didnt", "doesnt",
+    "ain't", "aren't", "can't", "couldn't", "daren't", "didn't", "doesn't",
+    "dont", "hadnt", "hasnt", "havent", "isnt", "mightnt", "mustnt", "neither",
+    "don't", "hadn't", "hasn't", "haven't", "isn't", "mightn't", "mustn't",
+    "neednt", "needn't", "never", "none", "nope", "nor", "not", "nothing",
+    "nowhere", "oughtnt", "shant", "shouldnt", "uhuh", "wasnt", "werent",
+    "oughtn't", "shan't", "shouldn't", "uh-uh", "wasn't", "weren't", "without",
+    "wont", "wouldnt", "won't", "wouldn't", "rarely", "seldom", "despite",
+})
+
+BOOSTER_DICT = dict(
+    [(word, B_INCR) for word in (
+        "absolutely", "amazingly", "awfully", "completely", "considerably", "decidedly",
+        "deeply", "effing", "enormously", "entirely", "especially", "exceptionally",
+        "extremely", "fabulously", "flipping", "flippin", "fricking", "frickin",
+        "frigging", "friggin", "fully", "fucking", "greatly", "hella", "highly",
+        "hugely", "incredibly", "intensely", "majorly", "more", "most", "particularly",
+        "purely", "quite", "really", "remarkably", "so", "substantially", "thoroughly",
+        "totally", "tremendously", "uber", "unbelievably", "unusually", "utterly", "very")]
+    + [(word, B_DECR) for word in (
+        "almost", "barely", "hardly", "just enough", "kind of", "kinda", "kindof",
+        "kind-of", "less", "little", "marginally", "occasionally", "partly", "scarcely",
+        "slightly", "somewhat", "sort of", "sorta", "sortof", "sort-of")]
+)
+
+SPECIAL_CASE_IDIOMS = {
+    "the shit": 3, "the bomb": 3, "bad ass": 1.5, "yeah right": -2,
+    "cut the mustard": 2, "kiss of death": -1.5, "hand to mouth": -2,
+}
+
+# Leading/trailing punctuation VADER strips from a word
+PUNC_LIST = frozenset([".", "!", "?", ",", ";", ":", "-", "'", '"',
+                       "!!", "!!!", "??", "???", "?!?", "!?!", "?!?!", "!?!?"])
+PUNCTUATION = string.punctuation
+HAS_PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]")
+
+NEUTRAL = {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+
+
+def compile_lexicon(lexicon_text):
+    """VADER lexicon file contents (word, mean, ...) -> {word: valence}"""
+    lexicon = {}
+    for line in lexicon_text.split("\n"):
+        if line.strip():
+            word, measure = line.strip().split("\t")[0:2]
+            lexicon[word] = float(measure)
+    return lexicon
+
+
+def _strip_punctuation(token):
+    """
+    VADER's word form of a token: a leading or trailing run from PUNC_LIST
+    is dropped when what is left is a punctuation-free word of 2+ characters
+    """
+    if token[0] in PUNCTUATION:
+        word = token.lstrip(PUNCTUATION)
+        mark = token[:len(token) - len(word)]
+    elif token[-1] in PUNCTUATION:
+        word = token.rstrip(PUNCTUATION)
+        mark = token[len(word):]
+    else:
+        return token
+    if len(word) > 1 and mark in PUNC_LIST and not HAS_PUNCTUATION.search(word):
+        return word
+    return token
+
+
+class SentimentEngine:
+    """VADER polarity scores from a precompiled lexicon
+
+    lexicon: {lowercase word or emoticon: mean valence}.
+    """
+
+    def __init__(self, lexicon):
+        self.lexicon = lexicon
+
+    @classmethod
+    def from_nltk(cls, lexicon_file=NLTK_LEXICON):
+        """Compile the lexicon nltk's SentimentIntensityAnalyzer would load"""
+        import nltk.data
+        return cls(compile_lexicon(nltk.data.load(lexicon_file)))
+
+    def polarity_scores(self, text, tokens=None):
+        """
+        {'neg', 'neu', 'pos', 'compound'} as SentimentIntensityAnalyzer returns them
+        tokens: text.split(), when the caller already has it
+        """
+        words = [_strip_punctuation(t) for t in (text.split() if tokens is None else tokens) if len(t) > 1]
+        return self._score(words, self._valences(words), text)
+
+    def polarity_scores_many(self, texts, token_lists=None):
+        """Scores for a list of texts in one call; duplicates are scored once"""
+        token_lists = token_lists or [None] * len(texts)
+        scored = {}
+        results = []
+        for text, tokens in zip(texts, token_lists):
+            scores = scored.get(text)
+            if scores is None:
+                scores = scored[text] = self.polarity_scores(text, tokens)
+            results.append(dict(scores))
+        return results
+
+    # ------------------------------------------------
+    # VADER rules
+    # ------------------------------------------------
+
+    def _valences(self, words):
+        lexicon = self.lexicon
+        lower = [w.lower() for w in words]
+        count = len(words)
+        upper = sum(1 for w in words if w.isupper())
+        is_cap_diff = 0 < count - upper < count
+
+        first_index = {}
+        for i, word in enumerate(words):
+            first_index.setdefault(word, i)
+
+        sentiments = []
+        valences = {}  # first position -> valence
+        for word in words:
+            # nltk looks the word up with list.index(), i.e. its first occurrence,
+            # so every repeat of a word gets the same valence
+            i = first_index[word]
+            if i in valences:
+                sentiments.append(valences[i])
+                continue
+            item = lower[i]
+            if (i < count - 1 and item == "kind" and lower[i + 1] == "of") or item in BOOSTER_DICT:
+                sentiments.append(0)
+                valences[i] = 0
+                continue
+            valence = 0
+            if item in lexicon:
+                valence = lexicon[item]
+                if is_cap_diff and word.isupper():
+                    valence = valence + C_INCR if valence > 0 else valence - C_INCR
+                for start_i in range(3):
+                    if i > start_i and lower[i - (start_i + 1)] not in lexicon:
+                        s = self._scalar_inc_dec(words[i - (start_i + 1)], lower[i - (start_i + 1)],
+                                                 valence, is_cap_diff)
+                        if start_i == 1 and s != 0:
+                            s = s * 0.95
+                        if start_i == 2 and s != 0:
+                            s = s * 0.9
+                        valence = valence + s
+                        valence = self._never_check(valence, words, lower, start_i, i)
+                        if start_i == 2:
+                            valence = self._idioms_check(valence, words, i)
+                valence = self._least_check(valence, lower, i)
+            sentiments.append(valence)
+            valences[i] = valence
+
+        # "but": words before it count half, words after it one and a half times
+        if "but" in lower:
+            bi = lower.index("but")
+            for sidx, sentiment in enumerate(sentiments):
+                if sidx < bi:
+                    sentiments[sidx] = sentiment * 0.5
+                elif sidx > bi:
+                    sentiments[sidx] = sentiment * 1.5
+        return sentiments
+
+    @staticmethod
+    def _negated(word_lower):
+        return word_lower in NEGATE or "n't" in word_lower
+
+    @staticmethod
+    def _scalar_inc_dec(word, word_lower, valence, is_cap_diff):
+        scalar = 0.0
+        if word_lower in BOOSTER_DICT:
+            scalar = BOOSTER_DICT[word_lower]
+            if valence < 0:
+                scalar *= -1
+            if word.isupper() and is_cap_diff:
+                if valence > 0:
+                    scalar += C_INCR
+                else:
+                    scalar -= C_INCR
+        return scalar
+
+    def _never_check(self, valence, words, lower, start_i, i):
+        if start_i == 0:
+            if self._negated(lower[i - 1]):
+                valence = valence * N_SCALAR
+        if start_i == 1:
+            if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+                valence = valence * 1.5
+            elif self._negated(lower[i - 2]):
+                valence = valence * N_SCALAR
+        if start_i == 2:
+            if (words[i - 3] == "never" and (words[i - 2] == "so" or words[i - 2] == "this")
+                    or (words[i - 1] == "so" or words[i - 1] == "this")):
+                valence = valence * 1.25
+            elif self._negated(lower[i - 3]):
+                valence = valence * N_SCALAR
+        return valence
+
+    @staticmethod
+    def _idioms_check(valence, words, i):
+        onezero = f"{words[i - 1]} {words[i]}"
+        twoonezero = f"{words[i - 2]} {words[i - 1]} {words[i]}"
+        twoone = f"{words[i - 2]} {words[i - 1]}"
+        threetwoone = f"{words[i - 3]} {words[i - 2]} {words[i - 1]}"
+        threetwo = f"{words[i - 3]} {words[i - 2]}"
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[seq]
+                break
+        if len(words) - 1 > i:
+            zeroone = f"{words[i]} {words[i + 1]}"
+            if zeroone in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[zeroone]
+        if len(words) - 1 > i + 1:
+            zeroonetwo = f"{words[i]} {words[i + 1]} {words[i + 2]}"
+            if zeroonetwo in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[zeroonetwo]
+        if threetwo in BOOSTER_DICT or twoone in BOOSTER_DICT:
+            valence = valence + B_DECR
+        return valence
+
+    def _least_check(self, valence, lower, i):
+        if i > 1 and lower[i - 1] == "least" and lower[i - 1] not in self.lexicon:
+            if lower[i - 2] != "at" and lower[i - 2] != "very":
+                valence = valence * N_SCALAR
+        elif i > 0 and lower[i - 1] == "least" and lower[i - 1] not in self.lexicon:
+            valence = valence * N_SCALAR
+        return valence
+
+    @staticmethod
+    def _score(words, sentiments, text):
+        if not sentiments:
+            return dict(NEUTRAL)
+        sum_s = float(sum(sentiments))
+
+        # Emphasis from exclamation points (up to 4) and question marks (2 or more)
+        ep_amplifier = min(text.count("!"), 4) * 0.292
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        punct_emph_amplifier = ep_amplifier + qm_amplifier
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+        compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+
+        pos_sum = neg_sum = 0.0
+        neu_count = 0
+        for sentiment_score in sentiments:
+            if sentiment_score > 0:
+                pos_sum += float(sentiment_score) + 1
+            if sentiment_score < 0:
+                neg_sum += float(sentiment_score) - 1
+            if sentiment_score == 0:
+                neu_count += 1
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += punct_emph_amplifier
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= punct_emph_amplifier
+        total = pos_sum + math.fabs(neg_sum) + neu_count
+        return {
+            'neg': round(math.fabs(neg_sum / total), 3),
+            'neu': round(math.fabs(neu_count / total), 3),
+            'pos': round(math.fabs(pos_sum / total), 3),
+            'compound': round(compound, 4),
+        }
@@ -0,0 +1,38 @@
+# ====================================================
+# STAGE TIMING
+# ====================================================
+# Lap timer for the detection pipeline: one
+# perf_counter() call per stage, cheap enough to leave
+# on for every request.
+# ====================================================
+
+from time import perf_counter
+
+PIPELINE_STAGES = (
+    'keywords', 'linguistic', 'source', 'sentiment', 'readability',
+    'ml', 'fact_check', 'similarity', 'scoring', 'explanation'
+)
+
+
+class StageClock:
+    """Records the time since the previous lap under each stage name"""
+
+    __slots__ = ('times', 'started', '_last')
+
+    def __init__(self):
+        self.times = {}
+        self.started = self._last = perf_counter()
+
+    def lap(self, stage):
+        now = perf_counter()
+        self.times[stage] = now - self._last
+        self._last = now
+
+    def record(self, stage, seconds):
+        """Attribute time measured elsewhere (e.g. a share of batch work) and restart the lap"""
+        self.times[stage] = seconds
+        self._last = perf_counter()
+
+    @property
+    def total(self):
+        return self._last - self.started
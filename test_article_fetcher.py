@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Article fetcher test - URL-only requests are fetched (against a local
+stand-in news site), the article body is extracted, repeat fetches are
+served from the cache or revalidated with ETag / Last-Modified, per-host
+limits and timeouts hold, and fetch time shows up as its own stage
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+import asgi_app
+import article_fetcher
+from article_fetcher import ArticleFetcher, FetchError, extract_article
+
+ARTICLE_HTML = """<!DOCTYPE html>
+<html><head><title>Site name | Page</title>
+<meta property="og:title" content="SHOCKING: Miracle cure they don't want you to know about">
+<script>var tracking = "Doctors HATE this";</script><style>p { color: red; }</style></head>
+<body>
+<nav><a href="/">Home</a> <a href="/world">World</a> <p>Subscribe to our newsletter for more great stories!</p></nav>
+<article>
+<p>Doctors HATE this one weird trick! This miracle cure will change your life forever, and big pharma
+is hiding it from you.</p>
+<p>Click here now before they delete this! Share before it's banned! You won't believe what happens next.</p>
+<p>Thousands of readers have already tried it &amp; the results are unbelievable.</p>
+</article>
+<aside><p>Related: ten celebrities who look nothing like they used to, number seven will surprise you.</p></aside>
+<footer><p>Copyright 2024 Example Media Group. All rights reserved worldwide.</p></footer>
+</body></html>"""
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+
+class Site(BaseHTTPRequestHandler):
+    requests = []
+    moved = False
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append((self.path, dict(self.headers)))
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            self.route()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def send(self, status, body=b'', content_type='text/html; charset=utf-8', headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (timeout tests)
+
+    def route(self):
+        path = self.path.split('?')[0]
+        if path == '/etag':
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send(304)
+            else:
+                self.send(200, ARTICLE_HTML.encode('utf-8'), headers=[('ETag', ETAG)])
+        elif path == '/modified':
+            if self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+                self.send(304)
+            else:
+                self.send(200, ARTICLE_HTML.encode('utf-8'), headers=[('Last-Modified', LAST_MODIFIED)])
+        elif path == '/plain':
+            self.send(200, b'The council approved the budget on Tuesday after a public hearing.', 'text/plain')
+        elif path == '/slow':
+            time.sleep(0.3)
+            self.send(200, ARTICLE_HTML.encode('utf-8'))
+        elif path == '/redirect':
+            self.send(302, headers=[('Location', '/etag')])
+        elif path == '/moved':
+            if type(self).moved:
+                self.send(302, headers=[('Location', '/etag')])
+            else:
+                self.send(200, b'<p>The page before it moved, long enough to count as an article.</p>',
+                          headers=[('ETag', ETAG)])
+        elif path == '/trickle':
+            # A byte every 50 ms: each read succeeds long before the read timeout
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', '200')
+            self.end_headers()
+            try:
+                for _ in range(200):
+                    self.wfile.write(b' ')
+                    self.wfile.flush()
+                    time.sleep(0.05)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        elif path == '/redirect-ip':
+            self.send(302, headers=[('Location', f"http://127.0.0.1:{self.server.server_address[1]}/etag")])
+        elif path == '/image':
+            self.send(200, b'\x89PNG', 'image/png')
+        elif path == '/empty':
+            self.send(200, b'<html><body><script>x()</script></body></html>')
+        else:
+            self.send(404, b'not found')
+
+
+def main():
+    print("=" * 70)
+    print("ARTICLE FETCHER TEST")
+    print("=" * 70)
+
+    results = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Site)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # 1. Extraction keeps the article and drops page furniture
+    title, body = extract_article(ARTICLE_HTML)
+    results.append(("Title from og:title", title.startswith("SHOCKING: Miracle cure")))
+    results.append(("Article paragraphs extracted", "one weird trick" in body and "results are unbelievable" in body
+                    and "&amp;" not in body))
+    results.append(("Scripts, nav, aside and footer dropped", all(
+        junk not in body for junk in ("tracking", "newsletter", "celebrities", "Copyright", "color: red"))))
+
+    # 2. Private hosts are refused unless allowed
+    try:
+        ArticleFetcher().fetch(base + '/etag')
+        blocked = False
+    except FetchError as e:
+        blocked = e.status == 400
+    results.append(("Loopback host refused by default", blocked and not Site.requests))
+
+    # The name resolves to a public address for the check, then to loopback
+    # when connecting (DNS rebinding): the connected peer is refused
+    saved_host_check, saved_address_check = article_fetcher._is_public_host, article_fetcher._is_public_address
+    try:
+        article_fetcher._is_public_host = lambda host: True
+        try:
+            ArticleFetcher().fetch(base + '/redirect')
+            blocked = False
+        except FetchError as e:
+            blocked = e.status == 400 and 'address 127.0.0.1' in str(e)
+        results.append(("Rebound name refused at the connected address", blocked and not Site.requests))
+
+        # Every redirect hop is checked before it is followed
+        article_fetcher._is_public_host = lambda host: host == 'localhost'
+        article_fetcher._is_public_address = lambda address: True
+        try:
+            ArticleFetcher().fetch(f"http://localhost:{server.server_address[1]}/redirect-ip")
+            blocked = False
+        except FetchError as e:
+            blocked = e.status == 400 and 'host 127.0.0.1' in str(e)
+        results.append(("Redirect to a non-public host refused", blocked
+                        and [path for path, _ in Site.requests] == ['/redirect-ip']))
+    finally:
+        article_fetcher._is_public_host, article_fetcher._is_public_address = saved_host_check, saved_address_check
+    del Site.requests[:]
+
+    fetcher = ArticleFetcher(allow_private_hosts=True, fresh_seconds=0)
+
+    # 3. Conditional GET with ETag
+    first = fetcher.fetch(base + '/etag')
+    second = fetcher.fetch(base + '/etag')
+    sent = Site.requests[-1][1]
+    results.append(("ETag revalidation answered with 304", first.source == 'network' and second.source == 'revalidated'
+                    and sent.get('If-None-Match') == ETAG and second.text == first.text))
+
+    # 4. Conditional GET with Last-Modified
+    fetcher.fetch(base + '/modified')
+    again = fetcher.fetch(base + '/modified')
+    results.append(("Last-Modified revalidation", again.source == 'revalidated'
+                    and Site.requests[-1][1].get('If-Modified-Since') == LAST_MODIFIED))
+
+    # 5. Fresh entries are served without a request
+    fresh = ArticleFetcher(allow_private_hosts=True, fresh_seconds=60)
+    fresh.fetch(base + '/etag')
+    count = len(Site.requests)
+    cached = fresh.fetch(base + '/etag')
+    results.append(("Fresh entry served from cache", cached.source == 'cache' and len(Site.requests) == count))
+
+    # 6. Plain text, redirects and errors
+    results.append(("Plain text passed through", fetcher.fetch(base + '/plain').text.startswith("The council")))
+    results.append(("Redirect followed", fetcher.fetch(base + '/redirect').title.startswith("SHOCKING")))
+    before_move = fetcher.fetch(base + '/moved')
+    Site.moved = True
+    after_move = fetcher.fetch(base + '/moved')
+    results.append(("Validators not sent to a redirect target", before_move.text.startswith("The page before")
+                    and after_move.source == 'network' and after_move.title.startswith("SHOCKING")
+                    and 'If-None-Match' not in Site.requests[-1][1]))
+    fetcher.fetch(base + '/moved')
+    results.append(("Redirected entry revalidated without the target's validators",
+                    [('If-None-Match' in headers) for _, headers in Site.requests[-2:]] == [False, False]))
+    statuses = []
+    for path in ('/missing', '/image', '/empty'):
+        try:
+            fetcher.fetch(base + path)
+            statuses.append(None)
+        except FetchError as e:
+            statuses.append(e.status)
+    results.append(("404 is 502, non-HTML is 422, no text is 422", statuses == [502, 422, 422]))
+    try:
+        ArticleFetcher().fetch('ftp://example.com/file')
+        bad_scheme = False
+    except FetchError as e:
+        bad_scheme = e.status == 400
+    results.append(("Non-http URL is a 400", bad_scheme))
+
+    # 7. Timeouts
+    started = time.perf_counter()
+    try:
+        fetcher.fetch(base + '/slow', timeout=0.1)
+        timed_out = False
+    except FetchError as e:
+        timed_out = e.status == 504
+    results.append(("Slow site times out with 504", timed_out and time.perf_counter() - started < 0.3))
+
+    trickling = ArticleFetcher(allow_private_hosts=True, timeout=(1.0, 0.5), max_seconds=0.4, cache_size=0)
+    for budget in (None, 0.3):
+        started = time.perf_counter()
+        try:
+            trickling.fetch(base + '/trickle', timeout=budget)
+            timed_out = False
+        except FetchError as e:
+            timed_out = e.status == 504
+        elapsed = time.perf_counter() - started
+        results.append((f"Trickling body cut off at the {'max_seconds' if budget is None else 'budget'} "
+                        f"limit ({elapsed:.2f} s)", timed_out and elapsed < (budget or 0.4) + 0.2))
+
+    # 8. Per-host concurrency limit
+    limited = ArticleFetcher(allow_private_hosts=True, max_per_host=2, fresh_seconds=0, cache_size=0)
+    while Site.active:
+        time.sleep(0.05)  # Let the timed-out request finish
+    Site.peak = 0
+    threads = [threading.Thread(target=limited.fetch, args=(base + f'/slow?n={n}',)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.append((f"At most 2 concurrent fetches per host (peak {Site.peak})", Site.peak == 2))
+    results.append(("No host slots kept once fetches finish", limited._host_slots == {}
+                    and fetcher._host_slots == {} and trickling._host_slots == {}))
+
+    # 9. /predict with only a url scores the fetched article
+    saved = app.ARTICLE_FETCHER
+    app.ARTICLE_FETCHER = ArticleFetcher(allow_private_hosts=True)
+    try:
+        app.RESULT_CACHE.clear()
+        client = app.app.test_client()
+        response = client.post('/predict', json={'url': base + '/etag'})
+        data = response.get_json()
+        app.RESULT_CACHE.clear()
+        title, body = extract_article(ARTICLE_HTML)
+        direct = app.detect_fake_news(f"{title}\n\n{body}", base + '/etag')
+        results.append(("URL-only /predict scores the article", response.status_code == 200
+                        and data['result'] == direct['result'] and data['confidence'] == direct['confidence']
+                        and data['article']['title'].startswith("SHOCKING")))
+
+        compact = client.post('/predict?verbose=false', json={'url': base + '/etag'}).get_json()
+        results.append(("Compact response has no article info", set(compact) == {'result', 'confidence'}))
+
+        response = client.post('/predict', json={'url': base + '/missing'})
+        results.append(("Fetch failure mapped to its status", response.status_code == 502
+                        and 'error' in response.get_json()))
+
+        response = client.post('/predict', json={'url': base + '/slow?budget'}, headers={'X-Latency-Budget-Ms': '50'})
+        results.append(("Fetch bounded by the latency budget", response.status_code == 504))
+
+        metrics = client.get('/metrics').get_data(as_text=True)
+        results.append(("Fetch stage in /metrics", 'fakenews_stage_duration_seconds_count{stage="fetch"}' in metrics
+                        and 'fakenews_article_fetches_total{outcome="error"}' in metrics))
+
+        # Async server: the fetch runs on its own pool
+        scope = {'type': 'http', 'method': 'POST', 'path': '/predict', 'query_string': b'', 'headers': []}
+        chunks = [{'type': 'http.request', 'body': json.dumps({'url': base + '/etag'}).encode(), 'more_body': False}]
+        sent = []
+
+        async def receive():
+            return chunks.pop(0) if chunks else {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        import asyncio
+        asyncio.run(asgi_app.app(scope, receive, send))
+        body = json.loads(sent[1]['body'])
+        results.append(("URL-only request on the async server", sent[0]['status'] == 200
+                        and body['result'] == data['result'] and 'article' in body))
+    finally:
+        app.ARTICLE_FETCHER = saved
+        app.RESULT_CACHE.clear()
+        server.shutdown()
+
+    print()
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'} {name}")
+
+    passed = sum(1 for _, p in results if p)
+    print()
+    print(f"TOTAL: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Async serving test - the ASGI app answers like the Flask app, passes
+other routes through to Flask, and sheds load past its limits with
+429 / 503 and Retry-After
+"""
+
+import sys
+import os
+import json
+import gzip
+import time
+import asyncio
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+import asgi_app
+from admission import AdmissionControl, Overloaded
+
+async def call(path, payload=None, method='POST', query=b'', headers=(), body=None):
+    """Drive the ASGI app with one request; returns (status, {header: value}, body)"""
+    if body is None:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+             'headers': [(b'content-type', b'application/json')] + [(k.encode(), v.encode()) for k, v in headers],
+             'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1)}
+    chunks = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return chunks.pop(0) if chunks else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app.app(scope, receive, send)
+    start = sent[0]
+    response_headers = {k.decode(): v.decode() for k, v in start['headers']}
+    return start['status'], response_headers, b''.join(m.get('body', b'') for m in sent[1:])
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def main():
+    print("=" * 70)
+    print("ASYNC SERVING TEST")
+    print("=" * 70)
+
+    results = []
+    client = app.app.test_client()
+    text = "SHOCKING! Doctors HATE this one weird trick! Miracle cure they don't want you to know!"
+
+    # Same results as the Flask endpoints
+    app.RESULT_CACHE.clear()
+    status, headers, body = run(call('/predict', {'text': text, 'url': 'http://example.com'}))
+    app.RESULT_CACHE.clear()
+    expected = client.post('/predict', json={'text': text, 'url': 'http://example.com'}).get_json()
+    results.append(("/predict matches the Flask endpoint", status == 200 and json.loads(body) == expected))
+    results.append(("JSON content type", headers.get('content-type') == 'application/json'))
+
+    status, _, body = run(call('/predict', {'text': text}, query=b'verbose=false'))
+    results.append(("Field selection from the query string", status == 200 and set(json.loads(body)) == {'result', 'confidence'}))
+
+    items = [{'text': text}, {'text': 'The council approved the budget on Tuesday after a public hearing.'}, {'text': ''}]
+    status, _, body = run(call('/predict_batch', {'items': items}))
+    expected = client.post('/predict_batch', json={'items': items}).get_json()
+    results.append(("/predict_batch matches the Flask endpoint", status == 200 and json.loads(body) == expected))
+
+    status, headers, body = run(call('/predict', {'text': text}, headers=[('Accept-Encoding', 'gzip')]))
+    results.append(("Gzip compression", headers.get('content-encoding') == 'gzip'
+                    and json.loads(gzip.decompress(body))['result'] == expected['results'][0]['result']))
+
+    # Input errors
+    status, _, body = run(call('/predict', {'fields': 'result'}))
+    results.append(("Missing text and url is a 400", status == 400 and json.loads(body)['error'] == 'Text or url is required'))
+    status, _, _ = run(call('/predict', body=b'{not json'))
+    results.append(("Invalid JSON is a 400", status == 400))
+    status, _, _ = run(call('/predict', {'text': text, 'fields': 'nope'}))
+    results.append(("Unknown field is a 400", status == 400))
+    saved_limit = asgi_app.MAX_BODY_BYTES
+    asgi_app.MAX_BODY_BYTES = 100
+    try:
+        status, _, _ = run(call('/predict', {'text': 'x' * 200}))
+    finally:
+        asgi_app.MAX_BODY_BYTES = saved_limit
+    results.append(("Oversized body is a 413", status == 413))
+
+    # Other routes go to Flask
+    status, _, body = run(call('/health', method='GET'))
+    results.append(("/health served through the WSGI bridge", status == 200 and json.loads(body)['status'] == 'ok'))
+    status, headers, body = run(call('/metrics', method='GET'))
+    results.append(("/metrics lists admission metrics", status == 200
+                    and b'fakenews_requests_in_flight' in body and headers['content-type'].startswith('text/plain')))
+    status, _, _ = run(call('/nope', method='GET'))
+    results.append(("Unknown route is a 404", status == 404))
+
+    # Slow rule stages run off the event loop: /health answers meanwhile
+    saved_detect = app.detect_fake_news
+
+    def slow_detect(*args, **kwargs):
+        time.sleep(0.3)
+        return saved_detect(*args, **kwargs)
+
+    app.detect_fake_news = slow_detect
+    try:
+        async def health_during_predict():
+            prediction = asyncio.ensure_future(call('/predict', {'text': text + ' slow'}))
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            status, _, _ = await call('/health', method='GET')
+            waited = time.perf_counter() - started
+            return status, waited, (await prediction)[0]
+        status, waited, predicted = run(health_during_predict())
+    finally:
+        app.detect_fake_news = saved_detect
+    results.append((f"Event loop free during detection (/health in {waited * 1000:.0f} ms)",
+                    status == 200 and predicted == 200 and waited < 0.2))
+
+    # Load shedding: one slot, one queue place, slow inference
+    saved = (asgi_app.ADMISSION, app._ml_is_costly, app.ml_could_change_verdict, app.ml_classify_text)
+    asgi_app.ADMISSION = AdmissionControl(max_in_flight=1, max_queue=1, queue_timeout=0.1)
+    app._ml_is_costly = lambda: True
+    app.ml_could_change_verdict = lambda text, url=None, rules=None: True
+
+    def slow_inference(text):
+        time.sleep(0.3)
+        return None
+
+    app.ml_classify_text = slow_inference
+    try:
+        async def spike():
+            return await asyncio.gather(*(call('/predict', {'text': f"{text} {n}"}) for n in range(5)))
+        started = time.perf_counter()
+        responses = run(spike())
+        elapsed = time.perf_counter() - started
+    finally:
+        asgi_app.ADMISSION, app._ml_is_costly, app.ml_could_change_verdict, app.ml_classify_text = saved
+    statuses = sorted(status for status, _, _ in responses)
+    results.append(("One served, one timed out, three shed", statuses == [200, 429, 429, 429, 503]))
+    results.append(("Shed responses carry Retry-After",
+                    all(int(h.get('retry-after', 0)) >= 1 for s, h, _ in responses if s != 200)))
+    results.append(("Shed responses are fast", elapsed < 0.6))
+    results.append(("Shedding counted in metrics",
+                    'fakenews_requests_shed_total{reason="queue_full"} 3' in app.METRICS.render()))
+
+    # Too-short texts get their fixed result without a transformer pass
+    inferred = []
+    saved = (app._ml_is_costly, app.ml_could_change_verdict, app.ml_classify_text)
+    app._ml_is_costly = lambda: True
+    app.ml_could_change_verdict = lambda text, url=None, rules=None: True
+    app.ml_classify_text = lambda text: inferred.append(text)
+    try:
+        status, _, short = run(call('/predict', {'text': 'too short'}))
+    finally:
+        app._ml_is_costly, app.ml_could_change_verdict, app.ml_classify_text = saved
+    results.append(("Short text skips inference", status == 200 and json.loads(short)['result'] == 'Doubtful' and not inferred))
+
+    # Admission control
+    async def admission_cases():
+        admission = AdmissionControl(max_in_flight=2, max_queue=2, queue_timeout=1.0)
+        await admission.acquire()
+        await admission.acquire()
+        waiter = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        queued = admission.queue_depth == 1
+        admission.release()
+        await waiter
+        handed_over = admission.in_flight == 2 and admission.queue_depth == 0
+
+        cancelled = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        cleaned_up = admission.queue_depth == 0
+
+        admission.release()
+        admission.release()
+        drained = admission.in_flight == 0
+
+        # Shed by the queue timeout, then cancelled before it resumed
+        admission.max_in_flight = 1
+        await admission.acquire()
+        expired = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        admission._expire(admission._waiters[0])
+        expired.cancel()
+        await asyncio.gather(expired, return_exceptions=True)
+        no_leak = admission.in_flight == 1 and admission.queue_depth == 0
+        admission.release()
+        admission.max_in_flight = 2
+
+        admission.observe(2.0)
+        admission.in_flight = 2
+        return queued, handed_over, cleaned_up, drained, no_leak, admission.retry_after()
+
+    queued, handed_over, cleaned_up, drained, no_leak, retry_after = run(admission_cases())
+    results.append(("Requests queue past the in-flight limit", queued))
+    results.append(("Released slot goes to the waiter", handed_over))
+    results.append(("Cancelled waiter leaves the queue", cleaned_up))
+    results.append(("Slots drain to zero", drained))
+    results.append(("Shed then cancelled waiter frees no slot", no_leak))
+    results.append(("Retry-After follows the backlog", retry_after == 2))
+    results.append(("Queue timeout maps to 503", Overloaded('queue_timeout').status == 503
+                    and Overloaded('queue_full').status == 429))
+
+    # Lifespan
+    async def lifespan():
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        await asgi_app.app({'type': 'lifespan'}, receive, send)
+        return sent
+
+    results.append(("Lifespan startup and shutdown",
+                    run(lifespan()) == ['lifespan.startup.complete', 'lifespan.shutdown.complete']))
+
+    print()
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'} {name}")
+
+    passed = sum(1 for _, p in results if p)
+    print()
+    print(f"TOTAL: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Batch prediction test - /predict_batch must return the same results
+as /predict, in input order, with per-item errors
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+class FakeClassifier:
+    """Stands in for the transformer pipeline and records batch calls"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size=1, **kwargs):
+        self.calls.append((len(texts), batch_size))
+        return [{'label': 'Fake' if 'FREE' in t else 'Real', 'score': 0.9} for t in texts]
+
+def main():
+    print("=" * 70)
+    print("BATCH PREDICTION TEST")
+    print("=" * 70)
+
+    client = app.app.test_client()
+    examples = FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+    items = [{'text': e['text'], 'url': e['url']} for e in examples]
+    items.insert(2, {'url': 'https://example.com'})
+    items.insert(5, 'not an object')
+
+    results = []
+
+    response = client.post('/predict_batch', json={'items': items, 'batch_size': 4})
+    body = response.get_json()
+    results.append(("Batch endpoint returns 200", response.status_code == 200))
+    results.append(("One result per item", body['count'] == len(items)))
+
+    # Input order and parity with single-item scoring
+    same = True
+    for item, result in zip(items, body['results']):
+        if isinstance(item, dict) and item.get('text'):
+            single = client.post('/predict', json=item).get_json()
+            same = same and single == result
+    results.append(("Matches /predict in input order", same))
+
+    errors_inline = 'error' in body['results'][2] and 'error' in body['results'][5]
+    results.append(("Per-item errors inline", errors_inline))
+
+    bad = client.post('/predict_batch', json={'items': []})
+    results.append(("Empty batch rejected", bad.status_code == 400))
+
+    # Texts go through the classifier in batches, results in input order
+    saved = app.ML_AVAILABLE, app.fake_news_classifier
+    fake = FakeClassifier()
+    app.ML_AVAILABLE, app.fake_news_classifier = True, fake
+    try:
+        texts = ['FREE money now', 'normal news', 'FREE gift', 'more news']
+        labels = [r['label'] for r in app.ml_classify_texts(texts, batch_size=2)]
+        results.append(("Classifier called once per batch list", fake.calls == [(4, 2)]))
+        results.append(("ML results in input order", labels == ['Fake', 'Real', 'Fake', 'Real']))
+    finally:
+        app.ML_AVAILABLE, app.fake_news_classifier = saved
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Bulk scoring test - the JSONL CLI must match detect_fake_news record for
+record, in both output orders, and resume an interrupted run
+"""
+
+import sys
+import os
+import json
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Same configuration as the workers the CLI starts
+os.environ['RULE_ONLY'] = '1'
+
+from app import detect_fake_news
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bulk_score.py')
+
+def run_cli(*args):
+    env = dict(os.environ, RULE_ONLY='1')
+    completed = subprocess.run([sys.executable, SCRIPT, *args, '--quiet'], env=env,
+                               capture_output=True, text=True, timeout=300)
+    return completed.returncode
+
+def read_output(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    print("=" * 70)
+    print("BULK SCORING TEST")
+    print("=" * 70)
+
+    examples = FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+    records = [{'id': f"ex-{i}", 'text': e['text'], 'url': e['url']} for i, e in enumerate(examples)]
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'archive.jsonl')
+        with open(source, 'w', encoding='utf-8') as f:
+            for i, record in enumerate(records):
+                f.write(json.dumps(record) + '\n')
+                if i == 2:
+                    f.write('\n')              # blank lines are skipped
+                if i == 5:
+                    f.write('{not json\n')     # bad lines get an error record
+        expected = {r['id']: detect_fake_news(r['text'], r['url']) for r in records}
+
+        ordered = os.path.join(tmp, 'ordered.jsonl')
+        code = run_cli(source, '-o', ordered, '--workers', '2', '--chunk-size', '3')
+        output = read_output(ordered)
+        offsets = [r['offset'] for r in output]
+        results.append(("CLI exits cleanly", code == 0))
+        results.append(("One line per non-blank input line", len(output) == len(records) + 1))
+        results.append(("Input order preserved", offsets == sorted(offsets)))
+        results.append(("Results match detect_fake_news",
+                        all(r['result'] == expected[r['id']] for r in output if 'result' in r)))
+        results.append(("Bad line reported with its offset",
+                        [r['offset'] for r in output if 'error' in r] == [7]))
+
+        unordered = os.path.join(tmp, 'unordered.jsonl')
+        run_cli(source, '-o', unordered, '--workers', '3', '--chunk-size', '2', '--order', 'completion')
+        results.append(("Completion order covers every record",
+                        sorted(r['offset'] for r in read_output(unordered)) == offsets))
+
+        # Interrupted run: a few complete lines plus half a record
+        resumed = os.path.join(tmp, 'resumed.jsonl')
+        with open(ordered, encoding='utf-8') as f:
+            lines = f.readlines()
+        with open(resumed, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:4])
+            f.write(lines[4][:20])
+        run_cli(source, '-o', resumed, '--resume', '--workers', '2')
+        with open(resumed, encoding='utf-8') as f:
+            results.append(("Resume completes without duplicates", f.readlines() == lines))
+
+        started = os.path.join(tmp, 'started.jsonl')
+        run_cli(source, '-o', started, '--start', '10', '--workers', '1')
+        results.append(("Start offset skips earlier lines",
+                        [r['offset'] for r in read_output(started)] == [o for o in offsets if o >= 10]))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
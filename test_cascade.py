@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cascade test - skipping the transformer, VADER and readability must never
+change a verdict, and must actually skip them for clear-cut texts
+(stand-in stages, no model download)
+"""
+
+import sys
+import os
+import zlib
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+def _spread(text, salt):
+    """Deterministic pseudo-random value in [0, 1) per text"""
+    return (zlib.crc32((salt + text).encode('utf-8')) % 1000) / 1000.0
+
+class FakeSentiment:
+    def __init__(self):
+        self.calls = 0
+
+    def polarity_scores(self, text):
+        self.calls += 1
+        compound = _spread(text, 'vader') * 2 - 1
+        return {'compound': compound, 'pos': 0.0, 'neu': 0.0, 'neg': 0.0}
+
+class FakeClassifier:
+    def __init__(self):
+        self.texts = 0
+
+    def __call__(self, texts, batch_size=1, **kwargs):
+        batch = [texts] if isinstance(texts, str) else texts
+        self.texts += len(batch)
+        return [{'label': 'Fake' if _spread(t, 'label') < 0.5 else 'Real', 'score': 0.5 + _spread(t, 'score') / 2}
+                for t in batch]
+
+class FakeReadability:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return _spread(text, 'flesch') * 110 - 5, 10.0
+
+def corpus():
+    examples = FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+    items = [(e['text'], e['url']) for e in examples]
+    # Same texts from other sources, so source reliability varies too
+    for url in (None, 'https://www.reuters.com/world', 'https://fakenews.com/x', 'https://blog.example.net/post'):
+        items.extend((e['text'], url) for e in examples)
+    return items
+
+def main():
+    print("=" * 70)
+    print("CASCADE TEST")
+    print("=" * 70)
+
+    sentiment, classifier, readability = FakeSentiment(), FakeClassifier(), FakeReadability()
+    saved = (app.ML_AVAILABLE, app.sentiment_analyzer, app.fake_news_classifier, app.readability_scores, app.sent_tokenize, app.CASCADE_MODE)
+    results = []
+    try:
+        app.ML_AVAILABLE = True
+        app.sentiment_analyzer = sentiment
+        app.fake_news_classifier = classifier
+        app.readability_scores = readability
+        app.sent_tokenize = lambda text: [s for s in text.split('.') if s.strip()]
+
+        items = corpus()
+        app.CASCADE_MODE = False
+        full = [app._run_detection(text, url, app._ML_NOT_RUN) for text, url in items]
+        full_calls = classifier.texts
+
+        app.CASCADE_MODE = True
+        classifier.texts = 0
+        cascade = [app._run_detection(text, url, app._ML_NOT_RUN) for text, url in items]
+        cascade_calls = classifier.texts
+
+        results.append(("Verdicts identical to the full pipeline",
+                        [r['result'] for r in full] == [r['result'] for r in cascade]))
+        results.append(("Cascade score stays between bounds of the same verdict",
+                        all(app.verdict_for_score(r['details']['final_score'], r['source_credibility'])[0]
+                            == r['result'] for r in cascade)))
+        skipped_ml = sum(1 for r in cascade if 'ml' in r['details']['cascade']['skipped'])
+        results.append(("Transformer skipped for settled texts", skipped_ml > 0 and cascade_calls < full_calls))
+        results.append(("Transformer runs when it could matter", cascade_calls > 0))
+        results.append(("Skipped stages are reported as empty",
+                        all(r['details']['ml_classification'] is None for r in cascade
+                            if 'ml' in r['details']['cascade']['skipped'])))
+        results.append(("Full pipeline reports no cascade", all('cascade' not in r['details'] for r in full)))
+
+        classifier.texts = 0
+        batch = app.detect_fake_news_batch([{'text': t, 'url': u} for t, u in items])
+        results.append(("Batch verdicts match", [r['result'] for r in batch] == [r['result'] for r in full]))
+        # Batches decide before sentiment and readability are known, so they may classify a few more
+        results.append(("Batch skips the transformer for settled texts",
+                        cascade_calls <= classifier.texts < full_calls))
+
+        print(f"  transformer calls: {full_calls} full, {cascade_calls} cascade "
+              f"({skipped_ml}/{len(items)} short-circuited)")
+    finally:
+        (app.ML_AVAILABLE, app.sentiment_analyzer, app.fake_news_classifier, app.readability_scores, app.sent_tokenize, app.CASCADE_MODE) = saved
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
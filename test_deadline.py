@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Latency budget test - the ML stage is skipped (degraded: true) when its
+cost estimate does not fit in what is left of the request's budget, and
+degraded results are flagged, counted and never cached
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from deadline import Deadline, StageCosts, parse_budget
+
+TEXT = "SHOCKING! Doctors HATE this one weird trick! Miracle cure they don't want you to know!"
+
+def main():
+    print("=" * 70)
+    print("LATENCY BUDGET TEST")
+    print("=" * 70)
+
+    results = []
+
+    # Budgets
+    results.append(("Budget parsed from header text", parse_budget('250') == 250.0))
+    rejected = 0
+    for bad in ('soon', -5, 0, float('nan'), True, None):
+        try:
+            parse_budget(bad)
+        except ValueError:
+            rejected += 1
+    results.append(("Invalid budgets rejected", rejected == 6))
+    deadline = Deadline(100)
+    results.append(("Deadline counts down", 0.09 < deadline.remaining() <= 0.1))
+
+    # Cost estimates
+    costs = StageCosts(ttl=0.2)
+    results.append(("Unknown stage has no estimate", costs.estimate('ml') is None))
+    for seconds in (0.1, 0.1, 0.1):
+        costs.observe('ml', seconds)
+    steady = costs.estimate('ml')
+    costs.observe('ml', 0.5)
+    results.append(("Estimate tracks the cost with a margin", 0.1 < steady < 0.2 and costs.estimate('ml') > 0.25))
+    costs.observe('scoring', 0.001)
+    results.append(("Estimates summed over stages", abs(costs.total(['ml', 'scoring', 'other'])
+                                                         - costs.estimate('ml') - costs.estimate('scoring')) < 1e-12))
+    time.sleep(0.25)
+    results.append(("Stale estimates are dropped", costs.estimate('ml') is None and costs.snapshot() == {}))
+
+    # Degradation in the pipeline: an expensive fake transformer
+    calls = []
+
+    def slow_inference(text):
+        calls.append(text)
+        time.sleep(0.05)
+        return {'label': 'FAKE', 'score': 0.9}
+
+    saved = (app._ml_is_costly, app.ml_classify_text, app.ml_could_change_verdict, app.STAGE_COSTS)
+    app._ml_is_costly = lambda: True
+    app.ml_classify_text = slow_inference
+    app.STAGE_COSTS = StageCosts()
+    client = app.app.test_client()
+    try:
+        app.RESULT_CACHE.clear()
+        full = app.detect_fake_news(TEXT)
+        results.append(("Without a budget the ML stage runs", len(calls) == 1 and 'degraded' not in full
+                        and full['details']['ml_classification'] is not None))
+        results.append(("ML cost measured", app.STAGE_COSTS.estimate('ml') >= 0.05))
+
+        app.RESULT_CACHE.clear()
+        degraded_before = app.DEGRADED.value(stage='ml')
+        degraded = app.detect_fake_news(TEXT, deadline=Deadline(10))
+        results.append(("Tight budget skips the ML stage", len(calls) == 1 and degraded.get('degraded') is True
+                        and degraded['details']['ml_classification'] is None
+                        and degraded['details']['degraded'] == {'skipped': ['ml']}))
+        results.append(("Degradation counted", app.DEGRADED.value(stage='ml') == degraded_before + 1))
+        again = app.detect_fake_news(TEXT)
+        results.append(("Degraded results are not cached", len(calls) == 2 and 'degraded' not in again))
+
+        app.RESULT_CACHE.clear()
+        roomy = app.detect_fake_news(TEXT, deadline=Deadline(5000))
+        results.append(("Roomy budget keeps the ML stage", len(calls) == 3 and 'degraded' not in roomy))
+        cached = app.detect_fake_news(TEXT, deadline=Deadline(1))
+        results.append(("Cached results are served whatever the budget", len(calls) == 3 and 'degraded' not in cached))
+
+        # Endpoints: header or body field, flag kept in compact responses
+        app.RESULT_CACHE.clear()
+        response = client.post('/predict?verbose=false', json={'text': TEXT},
+                               headers={'X-Latency-Budget-Ms': '5'}).get_json()
+        results.append(("Header budget, flag in compact response",
+                        response == {'result': degraded['result'], 'confidence': degraded['confidence'], 'degraded': True}))
+        response = client.post('/predict', json={'text': TEXT, 'latency_budget_ms': 5}).get_json()
+        results.append(("Body budget", response.get('degraded') is True))
+        status = client.post('/predict', json={'text': TEXT, 'latency_budget_ms': 'soon'}).status_code
+        results.append(("Invalid budget is a 400", status == 400))
+
+        # Async server: the pooled inference is skipped as well
+        import asgi_app
+
+        async def call(headers):
+            scope = {'type': 'http', 'method': 'POST', 'path': '/predict', 'query_string': b'',
+                     'headers': [(k.encode(), v.encode()) for k, v in headers]}
+            chunks = [{'type': 'http.request', 'body': json.dumps({'text': TEXT}).encode(), 'more_body': False}]
+            sent = []
+
+            async def receive():
+                return chunks.pop(0)
+
+            async def send(message):
+                sent.append(message)
+
+            await asgi_app.app(scope, receive, send)
+            return json.loads(sent[1]['body'])
+
+        app.ml_could_change_verdict = lambda text, url=None, rules=None: True
+        calls.clear()
+        response = asyncio.run(call([('x-latency-budget-ms', '5')]))
+        results.append(("Async server degrades too", response.get('degraded') is True and not calls))
+        response = asyncio.run(call([]))
+        results.append(("Async server runs pooled ML without a budget", 'degraded' not in response and len(calls) == 1))
+
+        # Cascade mode: only degraded when the transformer could still change the verdict
+        app.CASCADE_MODE = True
+        app.RESULT_CACHE.clear()
+        settled = app.detect_fake_news("URGENT! WIN CASH NOW! Guaranteed $1000 daily income with ZERO investment! "
+                                       "This exclusive offer is available for LIMITED TIME ONLY! Act now! "
+                                       "Free money waiting for you!", "https://get-rich-quick.com",
+                                       deadline=Deadline(1))
+        cascade_degraded = app.detect_fake_news("The council met on Tuesday to discuss the new budget proposal.",
+                                                deadline=Deadline(1))
+        results.append(("Cascade: settled verdict is not degraded", 'degraded' not in settled
+                        and 'ml' in settled['details']['cascade']['skipped']))
+        results.append(("Cascade: needed ML stage is degraded", cascade_degraded.get('degraded') is True))
+    finally:
+        app.CASCADE_MODE = False
+        app._ml_is_costly, app.ml_classify_text, app.ml_could_change_verdict, app.STAGE_COSTS = saved
+        app.RESULT_CACHE.clear()
+
+    print()
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'} {name}")
+
+    passed = sum(1 for _, p in results if p)
+    print()
+    print(f"TOTAL: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Domain index test - source lookups match whole labels only
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from domain_index import DomainIndex, load_domain_list
+from app import check_source_reliability
+
+def main():
+    print("=" * 70)
+    print("DOMAIN INDEX TEST")
+    print("=" * 70)
+
+    results = []
+    index = DomainIndex(['ap.org', 'bbc.com', 'nih.gov', 'ncbi.nlm.nih.gov', 'gov.uk'])
+
+    results.append(("Exact domain", index.lookup('bbc.com') == 'bbc.com'))
+    results.append(("Subdomain", index.lookup('news.bbc.com') == 'bbc.com'))
+    results.append(("No match inside a label", index.lookup('cheap.org') is None))
+    results.append(("No match on a prefix", index.lookup('bbc.com.evil.net') is None))
+    results.append(("Earliest listed entry wins", index.lookup('pubmed.ncbi.nlm.nih.gov') == 'nih.gov'))
+    results.append(("Multi-label suffix", index.lookup('www.gov.uk') == 'gov.uk'))
+
+    # Source reliability uses label boundaries and ignores ports/credentials
+    level, _ = check_source_reliability('https://cheap.org/deal')
+    results.append(("cheap.org is not trusted", level == 'medium'))
+    level, _ = check_source_reliability('https://user@www.BBC.com:443/news')
+    results.append(("Host parsed from full URL", level == 'high'))
+    level, details = check_source_reliability('https://fake-news.com/story')
+    results.append(("Untrusted domain", level == 'low' and 'fake-news.com' in details[0]))
+
+    # Loader skips comments and extra columns
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write("# reputation list\n\nexample.net\n0.0.0.0 ads.example.com\n*.wild.org,spam\n")
+        path = f.name
+    try:
+        loaded = load_domain_list(path)
+        results.append(("Loader parses list file",
+                        len(loaded) == 3 and 'x.wild.org' in loaded and 'ads.example.com' in loaded))
+    finally:
+        os.remove(path)
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
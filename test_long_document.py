@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Long-document test - window selection, score aggregation and windowed
+inference over the tiny synthetic ONNX model (no download)
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from long_document import select_windows, softmax, aggregate_window_scores
+
+try:
+    import app
+    from onnx_backend import OnnxTextClassifier
+    from test_onnx_backend import build_model, build_tokenizer, DEPS_AVAILABLE
+except ImportError as e:
+    print(f"Skipping windowed inference checks: {e}")
+    DEPS_AVAILABLE = False
+
+LABELS = {0: 'Fake', 1: 'Real'}
+
+def windowed_checks(results):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tiny.onnx')
+        build_model(path)
+        classifier = OnnxTextClassifier(path, build_tokenizer(), LABELS, num_threads=1)
+
+        saved = (app.ML_AVAILABLE, app.fake_news_classifier, app.tokenizer, app.ml_backend_in_use,
+                 app.ML_MAX_LENGTH, app.ML_WINDOW_OVERLAP, app.ML_MAX_WINDOWS, app.ML_LONG_DOCUMENTS)
+        try:
+            app.ML_AVAILABLE = True
+            app.fake_news_classifier = classifier
+            app.tokenizer = classifier.tokenizer
+            app.ml_backend_in_use = 'onnx'
+            app.ML_MAX_LENGTH = 8
+            app.ML_WINDOW_OVERLAP = 2
+            app.ML_MAX_WINDOWS = 8
+
+            # The only 'fake' token sits far past the first window
+            text = ' '.join(['real'] * 3 + ['news'] * 30 + ['fake'] * 3)
+
+            app.ML_LONG_DOCUMENTS = False
+            truncated = app.ml_classify_text(text)
+            results.append(("Truncation only sees the opening", truncated['label'] == 'Real'))
+
+            app.ML_LONG_DOCUMENTS = True
+            windowed = app.ml_classify_text(text)
+            results.append(("Windows reach the end of the article",
+                            windowed['label'] == 'Fake' and windowed['windows'] > 1))
+
+            app.ML_MAX_WINDOWS = 2
+            results.append(("Window count is capped", app.ml_classify_text(text)['windows'] == 2))
+
+            texts = [text, "real news", "fake"]
+            batched = app.ml_classify_texts(texts, batch_size=3)
+            singles = [app.ml_classify_text(t) for t in texts]
+            results.append(("Batched windows match single calls",
+                            [r['label'] for r in batched] == [r['label'] for r in singles]
+                            and all(abs(a['score'] - b['score']) < 1e-6 for a, b in zip(batched, singles))))
+        finally:
+            (app.ML_AVAILABLE, app.fake_news_classifier, app.tokenizer, app.ml_backend_in_use,
+             app.ML_MAX_LENGTH, app.ML_WINDOW_OVERLAP, app.ML_MAX_WINDOWS, app.ML_LONG_DOCUMENTS) = saved
+
+def main():
+    print("=" * 70)
+    print("LONG-DOCUMENT TEST")
+    print("=" * 70)
+
+    results = []
+    results.append(("All windows kept under the limit", select_windows(3, 8) == [0, 1, 2]))
+    chosen = select_windows(20, 4)
+    results.append(("Capped windows span the document",
+                    len(chosen) == 4 and chosen[0] == 0 and chosen[-1] == 19))
+    results.append(("Softmax sums to one", abs(sum(softmax([1.0, 2.0, 3.0])) - 1.0) < 1e-9))
+
+    rows = [[0.9, 0.1], [0.2, 0.8], [0.3, 0.7]]
+    best = aggregate_window_scores(rows, [10, 10, 10], LABELS, 'max')
+    results.append(("Max aggregation keeps the strongest window",
+                    best['label'] == 'Fake' and abs(best['score'] - 0.9) < 1e-9))
+    mean = aggregate_window_scores(rows, [10, 10, 10], LABELS, 'mean')
+    results.append(("Mean aggregation", mean['label'] == 'Real' and abs(mean['score'] - 1.6 / 3) < 1e-9))
+    weighted = aggregate_window_scores(rows, [100, 1, 1], LABELS, 'weighted')
+    results.append(("Weighted aggregation favours long windows", weighted['label'] == 'Fake'))
+    try:
+        aggregate_window_scores(rows, [1, 1, 1], LABELS, 'median')
+        results.append(("Unknown aggregation rejected", False))
+    except ValueError:
+        results.append(("Unknown aggregation rejected", True))
+
+    if DEPS_AVAILABLE:
+        windowed_checks(results)
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Metrics test - /metrics serves Prometheus text with stage timers,
+verdict counts, cache counters and input-size histograms
+"""
+
+import sys
+import os
+import timeit
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from metrics import Histogram
+from stage_timing import PIPELINE_STAGES
+
+def main():
+    print("=" * 70)
+    print("METRICS TEST")
+    print("=" * 70)
+
+    results = []
+    client = app.app.test_client()
+
+    text = "URGENT! WIN CASH NOW! Guaranteed $1000 daily income with ZERO investment! Act now!"
+    client.post('/predict', json={'text': text, 'url': 'https://get-rich-quick.com'})
+    client.post('/predict', json={'text': text, 'url': 'https://get-rich-quick.com'})
+
+    response = client.get('/metrics')
+    body = response.get_data(as_text=True)
+    results.append(("Prometheus content type", response.headers['Content-Type'].startswith('text/plain; version=0.0.4')))
+    results.append(("Every stage is timed",
+                    all(f'fakenews_stage_duration_seconds_count{{stage="{s}"}}' in body for s in PIPELINE_STAGES)))
+    results.append(("Verdict counts (cached and not)",
+                    'fakenews_detections_total{verdict="Fake",cached="false"} 1' in body
+                    and 'fakenews_detections_total{verdict="Fake",cached="true"} 1' in body))
+    results.append(("Cache counters exported", 'fakenews_cache_hits_total 1' in body))
+    results.append(("Input size histogram", 'fakenews_input_chars_bucket{le="100"} 2' in body))
+    results.append(("Model load time exported", 'fakenews_model_load_seconds' in body))
+
+    # Buckets are cumulative with a +Inf bucket equal to the count
+    hist = Histogram('h', 'test', buckets=(1, 2))
+    for value in (0.5, 1, 1.5, 3):
+        hist.observe(value)
+    lines = hist.collect()
+    results.append(("Cumulative buckets", lines[2:5] == ['h_bucket{le="1"} 2', 'h_bucket{le="2"} 3',
+                                                         'h_bucket{le="+Inf"} 4']))
+
+    # Cheap enough to leave on: an observation costs a few microseconds
+    per_call = timeit.timeit(lambda: hist.observe(0.7), number=20000) / 20000
+    results.append((f"Observe cost {per_call * 1e6:.2f}us < 5us", per_call < 5e-6))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-batcher test - concurrent single submissions are grouped into
+batches and every caller gets its own result
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from micro_batcher import MicroBatcher, QueueFullError
+
+def main():
+    print("=" * 70)
+    print("MICRO-BATCHER TEST")
+    print("=" * 70)
+
+    results = []
+    calls = []
+
+    def batch_fn(items):
+        calls.append(len(items))
+        time.sleep(0.01)  # Stand-in for a forward pass
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=20, max_queue_depth=100)
+    outputs = {}
+
+    def worker(n):
+        outputs[n] = batcher.submit(n)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    results.append(("Each caller gets its own result", outputs == {n: n * 2 for n in range(32)}))
+    results.append(("Requests are grouped", len(calls) < 32 and max(calls) > 1))
+    results.append(("Batch size limit respected", max(calls) <= 8))
+
+    stats = batcher.stats()
+    results.append(("Batch-size distribution recorded",
+                    sum(int(k) * v for k, v in stats['batch_size_distribution'].items()) == 32))
+    results.append(("Queue wait recorded", stats['queue_wait_ms']['max'] > 0))
+
+    # Queue depth limit
+    blocker = threading.Event()
+    slow = MicroBatcher(lambda items: blocker.wait() and items, max_batch_size=1,
+                        max_wait_ms=0, max_queue_depth=2)
+    slow.submit_async('a')
+    time.sleep(0.05)  # 'a' is now being processed
+    slow.submit_async('b')
+    slow.submit_async('c')
+    try:
+        slow.submit_async('d')
+        rejected = False
+    except QueueFullError:
+        rejected = True
+    blocker.set()
+    results.append(("Queue-depth limit enforced", rejected and slow.stats()['rejected'] == 1))
+
+    # Errors reach every caller in the batch
+    def failing(items):
+        raise ValueError("boom")
+    broken = MicroBatcher(failing, max_batch_size=4, max_wait_ms=1)
+    try:
+        broken.submit(1)
+        raised = False
+    except ValueError:
+        raised = True
+    results.append(("Batch errors propagate", raised))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
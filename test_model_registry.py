@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Model registry test - concurrent first requests must load the models
+exactly once, and the thread budget must split cores between workers
+"""
+
+import sys
+import os
+import subprocess
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from model_registry import ModelRegistry
+from thread_budget import thread_budget, apply_env_budget, DEFAULT_WORKERS
+
+THREADS = 16
+
+def hammer(target):
+    """Run target in THREADS threads released at the same moment; returns their results"""
+    barrier = threading.Barrier(THREADS)
+    results = [None] * THREADS
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+class FakeSentiment:
+    def polarity_scores(self, text):
+        return {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}
+
+def main():
+    print("=" * 70)
+    print("MODEL REGISTRY TEST")
+    print("=" * 70)
+    results = []
+
+    registry = ModelRegistry()
+
+    def slow_loader():
+        time.sleep(0.05)
+        return object()
+
+    loaded = hammer(lambda: registry.load('model', slow_loader))
+    results.append(("Concurrent loads run the loader once", registry.load_counts['model'] == 1))
+    results.append(("Every caller gets the same model", all(r is loaded[0] for r in loaded)))
+
+    def broken_loader():
+        time.sleep(0.02)
+        raise RuntimeError("weights missing")
+
+    errors = hammer(lambda: registry.load('broken', broken_loader))
+    results.append(("Failed load is not retried", registry.load_counts['broken'] == 1))
+    results.append(("Every caller sees the failure", all(isinstance(e, RuntimeError) for e in errors)))
+    results.append(("Stats report the error", registry.stats()['broken']['error'] == 'weights missing'))
+
+    registry.reset('model')
+    registry.load('model', slow_loader)
+    results.append(("Reset allows a reload", registry.load_counts['model'] == 2))
+
+    # Concurrent first requests against the service itself
+    saved = (app.ML_AVAILABLE, app.sent_tokenize, app.sentiment_analyzer, app._load_models, app.MODEL_REGISTRY)
+    try:
+        calls = []
+
+        def fake_load_models():
+            calls.append(threading.get_ident())
+            time.sleep(0.05)
+            app.sentiment_analyzer = FakeSentiment()
+            return True
+
+        app.ML_AVAILABLE = True
+        app.sent_tokenize = lambda text: [text]
+        app.sentiment_analyzer = None
+        app._load_models = fake_load_models
+        app.MODEL_REGISTRY = ModelRegistry()
+        text = "The city council approved a new environmental protection law yesterday."
+        verdicts = hammer(lambda: app.detect_fake_news(text)['result'])
+        results.append(("Concurrent first requests load models once", len(calls) == 1))
+        results.append(("All requests answered", len(set(verdicts)) == 1 and isinstance(verdicts[0], str)))
+    finally:
+        (app.ML_AVAILABLE, app.sent_tokenize, app.sentiment_analyzer, app._load_models, app.MODEL_REGISTRY) = saved
+
+    cores = os.cpu_count() or 1
+    results.append(("ML_THREADS sets the budget", thread_budget({'ML_THREADS': '3'}) == 3))
+    results.append(("Cores are split between workers",
+                    thread_budget({'WEB_CONCURRENCY': '2'}) == max(1, cores // 2)))
+    results.append(("Budget is at least one thread", thread_budget({'WEB_CONCURRENCY': str(cores * 4)}) == 1))
+
+    # With WEB_CONCURRENCY unset, gunicorn.conf.py's default worker count
+    # must reach the budget the app computes at import
+    env = {k: v for k, v in os.environ.items() if k not in ('WEB_CONCURRENCY', 'ML_THREADS')}
+    probe = ("import os, runpy; config = runpy.run_path('gunicorn.conf.py'); "
+             "from thread_budget import thread_budget; print(config['workers'], os.environ.get('WEB_CONCURRENCY'), thread_budget())")
+    output = subprocess.run([sys.executable, '-c', probe], cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                            capture_output=True, text=True).stdout.split()
+    results.append(("Default gunicorn workers split the cores", output == [str(DEFAULT_WORKERS),
+                    str(DEFAULT_WORKERS), str(max(1, cores // DEFAULT_WORKERS))]))
+    import thread_budget as budget_module
+    saved_cpu_count = budget_module.os.cpu_count
+    budget_module.os.cpu_count = lambda: 8
+    try:
+        results.append(("Unset WEB_CONCURRENCY means the default workers",
+                        thread_budget({}) == 8 // DEFAULT_WORKERS))
+    finally:
+        budget_module.os.cpu_count = saved_cpu_count
+
+    # post_fork re-applies the budget for the final worker count
+    set_threads = []
+    saved = (app.torch, app.ML_THREADS, os.environ.get('WEB_CONCURRENCY'), os.environ.get('ML_THREADS'))
+    try:
+        app.torch = type('FakeTorch', (), {'set_num_threads': staticmethod(set_threads.append),
+                                           'set_num_interop_threads': staticmethod(lambda n: None)})
+        os.environ.pop('ML_THREADS', None)
+        os.environ['WEB_CONCURRENCY'] = '8'
+        threads = app.rebudget_threads()
+        results.append(("Worker re-applies the budget after fork", threads == max(1, cores // 8)
+                        and app.ML_THREADS == threads and set_threads == [threads]))
+    finally:
+        app.torch, app.ML_THREADS = saved[:2]
+        for name, value in zip(('WEB_CONCURRENCY', 'ML_THREADS'), saved[2:]):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    environ = {'OMP_NUM_THREADS': '7'}
+    apply_env_budget(1, environ)
+    results.append(("Operator settings win", environ['OMP_NUM_THREADS'] == '7'
+                    and environ['MKL_NUM_THREADS'] == '1' and environ['TOKENIZERS_PARALLELISM'] == 'false'))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate index test - lightly edited copies of indexed articles must
+be found with a sensible similarity estimate, across inserts and reloads
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    import numpy
+    from near_duplicate import NearDuplicateIndex, MERGE_THRESHOLD
+    DEPS_AVAILABLE = True
+except ImportError as e:
+    print(f"Skipping near-duplicate test: {e}")
+    DEPS_AVAILABLE = False
+
+import app
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES
+
+def light_edit(text):
+    """Reword a couple of places, as recirculated copies do"""
+    return text.replace("the ", "this ", 1).replace("!", ".", 1) + " Share before it gets deleted!"
+
+def main():
+    print("=" * 70)
+    print("NEAR-DUPLICATE INDEX TEST")
+    print("=" * 70)
+    if not DEPS_AVAILABLE:
+        return True
+
+    results = []
+    index = NearDuplicateIndex()
+    added = index.add_many((f"fake-{i}", e['text']) for i, e in enumerate(FAKE_NEWS_EXAMPLES))
+    results.append(("Corpus indexed", added == len(FAKE_NEWS_EXAMPLES) == len(index)))
+    results.append(("Empty text is not indexed", not index.add('empty', '!!!')))
+
+    exact = index.query(FAKE_NEWS_EXAMPLES[2]['text'])
+    results.append(("Exact copy found with similarity 1.0", exact[:1] == [('fake-2', 1.0)]))
+
+    edited = index.query(light_edit(FAKE_NEWS_EXAMPLES[4]['text']))
+    results.append(("Edited copy found first", edited and edited[0][0] == 'fake-4' and 0.5 <= edited[0][1] < 1.0))
+    results.append(("Unrelated article not matched",
+                    all(not index.query(e['text']) for e in REAL_NEWS_EXAMPLES)))
+
+    # Incremental inserts are visible before and after they are merged
+    new_text = "Secret memo proves the election machines were switched off by foreign hackers overnight"
+    index.add('fresh', new_text)
+    results.append(("Pending insert is searchable", index.query(new_text)[:1] == [('fresh', 1.0)]))
+    for n in range(MERGE_THRESHOLD):
+        index.add(f"filler-{n}", f"filler article number {n} about local weather and traffic {n * 7}")
+    results.append(("Inserts merged into sorted keys",
+                    index.ids.index('fresh') < len(index._signatures) == len(index._keys) // index.bands))
+    results.append(("Merged insert still found", index.query(new_text)[:1] == [('fresh', 1.0)]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'known_fake.npz')
+        index.save(path)
+        loaded = NearDuplicateIndex.load(path)
+        probes = [light_edit(e['text']) for e in FAKE_NEWS_EXAMPLES] + [new_text]
+        results.append(("Reload gives identical answers",
+                        len(loaded) == len(index) and all(loaded.query(p) == index.query(p) for p in probes)))
+        results.append(("File holds about 512 bytes per document",
+                        os.path.getsize(path) < len(index) * (index.num_perm * 4 + 64) + 4096))
+
+        # Service integration: near-duplicates raise the similarity stage
+        saved = app.KNOWN_FAKE_INDEX
+        try:
+            app.KNOWN_FAKE_INDEX = path
+            app.MODEL_REGISTRY.reset('near_duplicate_index')
+            similarity = app.check_semantic_similarity(light_edit(FAKE_NEWS_EXAMPLES[4]['text']))
+            results.append(("Service reports near-duplicates",
+                            similarity['similar'] and similarity['near_duplicates'][0]['id'] == 'fake-4'
+                            and similarity['confidence'] >= 50))
+            clean = app.check_semantic_similarity(REAL_NEWS_EXAMPLES[0]['text'])
+            results.append(("Clean article stays clean", not clean['similar'] and clean['near_duplicates'] == []))
+            results.append(("Cache version tracks the index", f"known-fake-{len(index)}" in app.rules_version()))
+        finally:
+            app.KNOWN_FAKE_INDEX = saved
+            app.MODEL_REGISTRY.reset('near_duplicate_index')
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
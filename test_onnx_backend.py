@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ONNX backend test - OnnxTextClassifier must keep the pipeline's
+{label, score} contract (runs on a tiny synthetic model, no download)
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    import numpy as np
+    import onnx
+    from onnx import helper, TensorProto
+    from tokenizers import Tokenizer
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+    from transformers import PreTrainedTokenizerFast
+    from onnx_backend import OnnxTextClassifier
+    DEPS_AVAILABLE = True
+except ImportError as e:
+    print(f"Skipping ONNX backend test: {e}")
+    DEPS_AVAILABLE = False
+
+VOCAB = {'[PAD]': 0, '[UNK]': 1, 'fake': 2, 'real': 3, 'news': 4}
+
+def build_tokenizer():
+    tok = Tokenizer(WordLevel(VOCAB, unk_token='[UNK]'))
+    tok.pre_tokenizer = Whitespace()
+    return PreTrainedTokenizerFast(tokenizer_object=tok, pad_token='[PAD]', unk_token='[UNK]')
+
+def build_model(path):
+    """logits = sum over tokens of W[input_id] * mask, with 'fake' -> class 0, 'real' -> class 1"""
+    weights = np.zeros((len(VOCAB), 2), dtype=np.float32)
+    weights[VOCAB['fake']] = [2.0, 0.0]
+    weights[VOCAB['real']] = [0.0, 2.0]
+    graph = helper.make_graph(
+        [
+            helper.make_node('Gather', ['W', 'input_ids'], ['emb']),
+            helper.make_node('Cast', ['attention_mask'], ['maskf'], to=TensorProto.FLOAT),
+            helper.make_node('Unsqueeze', ['maskf', 'axis'], ['mask3']),
+            helper.make_node('Mul', ['emb', 'mask3'], ['masked']),
+            helper.make_node('ReduceSum', ['masked', 'axes1'], ['logits'], keepdims=0),
+        ],
+        'tiny',
+        [helper.make_tensor_value_info('input_ids', TensorProto.INT64, ['batch', 'seq']),
+         helper.make_tensor_value_info('attention_mask', TensorProto.INT64, ['batch', 'seq'])],
+        [helper.make_tensor_value_info('logits', TensorProto.FLOAT, ['batch', 2])],
+        [helper.make_tensor('W', TensorProto.FLOAT, weights.shape, weights.flatten()),
+         helper.make_tensor('axis', TensorProto.INT64, [1], [2]),
+         helper.make_tensor('axes1', TensorProto.INT64, [1], [1])],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 14)])
+    model.ir_version = 8
+    onnx.save(model, path)
+
+def main():
+    print("=" * 70)
+    print("ONNX BACKEND TEST")
+    print("=" * 70)
+    if not DEPS_AVAILABLE:
+        return True
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tiny.onnx')
+        build_model(path)
+        classifier = OnnxTextClassifier(path, build_tokenizer(), {0: 'Fake', 1: 'Real'}, num_threads=1)
+
+        single = classifier("fake fake news", truncation=True, max_length=512)
+        results.append(("String input returns [{label, score}]",
+                        isinstance(single, list) and len(single) == 1 and set(single[0]) == {'label', 'score'}))
+        expected = float(1 / (1 + np.exp(-4.0)))
+        results.append(("Softmax score and label", single[0]['label'] == 'Fake'
+                        and abs(single[0]['score'] - expected) < 1e-6))
+
+        texts = ["real news", "fake", "news real real real", "fake fake real"]
+        batched = classifier(texts, batch_size=3)
+        singles = [classifier(t)[0] for t in texts]
+        results.append(("Batches keep input order", [r['label'] for r in batched] == ['Real', 'Fake', 'Real', 'Fake']))
+        results.append(("Padding does not change scores",
+                        all(abs(a['score'] - b['score']) < 1e-6 for a, b in zip(batched, singles))))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Phrase matcher test - the Aho-Corasick scan must agree with the
+plain `phrase in text` loops it replaced
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from phrase_matcher import PhraseMatcher
+from app import FAKE_NEWS_KEYWORDS, KNOWN_FAKE_PATTERNS, FACT_CHECKABLE_PHRASES, scan_rule_phrases
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+def naive_scan(text):
+    """The original per-list substring loops"""
+    text_lower = text.lower()
+    return {
+        'keyword': [k for k in FAKE_NEWS_KEYWORDS if k in text_lower],
+        'known_fake': [p for p in KNOWN_FAKE_PATTERNS if p in text_lower],
+        'fact_checkable': [p for p in FACT_CHECKABLE_PHRASES if p in text_lower],
+    }
+
+def main():
+    print("=" * 70)
+    print("PHRASE MATCHER TEST")
+    print("=" * 70)
+
+    texts = [e['text'] for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES]
+    texts += [
+        "Instant results! INSTANT RESULTS! limited time offer, act now.",
+        "covid vaccine causes 5g causes; flat earthers and the moon landing fake",
+        "According to official data, statistics show the study shows nothing.",
+        "",
+    ]
+
+    results = []
+
+    # 1. Same hits (order and duplicates included) as the naive loops
+    agree = all(scan_rule_phrases(t) == naive_scan(t) for t in texts)
+    results.append(("Agrees with substring loops", agree))
+
+    # 2. Overlapping and nested phrases are all reported
+    matcher = PhraseMatcher().add_all(['he', 'she', 'his', 'hers'], 'w').build()
+    nested = matcher.scan('ushers') == {'w': ['he', 'she', 'hers']}
+    results.append(("Overlapping/nested phrases", nested))
+
+    # 3. Categories with no hit are still present
+    empty = PhraseMatcher().add_all(['abc'], 'a').add_all(['xyz'], 'b').build()
+    results.append(("Empty categories kept", empty.scan('abc') == {'a': ['abc'], 'b': []}))
+
+    # 4. Text the rules never mention cannot grow the memoized transitions
+    matcher = PhraseMatcher().add_all(FAKE_NEWS_KEYWORDS + KNOWN_FAKE_PATTERNS, 'w').build()
+    hostile = ''.join(chr(c) + 'e ' for c in range(0x4e00, 0x4e00 + 20000))
+    matcher.scan(hostile)
+    memo = sum(len(row) for row in matcher._delta)
+    matcher.scan(''.join(chr(c) + 'e ' for c in range(0xac00, 0xac00 + 20000)))
+    bound = len(matcher._delta) * len(matcher._alphabet)
+    results.append((f"Memo bounded by the rules ({memo} entries, at most {bound})",
+                    memo <= bound and sum(len(row) for row in matcher._delta) == memo))
+    results.append(("Unknown chars still break phrases", matcher.scan('shocking\u4e00truth')['w'] == []
+                    and matcher.scan('\u4e00shocking truth\u4e00')['w'] == ['shocking truth']))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
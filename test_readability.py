@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Readability test - the built-in engine must give textstat's Flesch scores
+(within rounding tolerance) and keep its syllable memo bounded
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.dirname(__file__))
+
+import readability
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+try:
+    import textstat
+except ImportError:
+    textstat = None
+
+TOLERANCE = 0.05
+
+def reference_corpus():
+    texts = [e['text'] for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES]
+    texts += ["", "Hi.", "Wait... what?! No way -- really?", "a-b c--d ... !!! ok",
+              "Don't stop. I can't! Really?? Yes it's true, isn't it.",
+              "Naïve café owners in Zürich said the crème brûlée was excellent."]
+    # Shuffled words and punctuation, for the tokenizing edge cases
+    rng = random.Random(18)
+    vocab = ' '.join(texts).split() + ['-', '--', '...', '!?', '"', "'s", '3.5', 'U.S.']
+    texts += [' '.join(rng.choice(vocab) for _ in range(rng.randint(1, 120))) for _ in range(500)]
+    return texts
+
+def main():
+    print("=" * 70)
+    print("READABILITY TEST")
+    print("=" * 70)
+    results = []
+
+    if textstat is not None:
+        worst = 0.0
+        for text in reference_corpus():
+            expected = (textstat.flesch_reading_ease(text), textstat.flesch_kincaid_grade(text))
+            actual = readability.readability_scores(text)
+            worst = max(worst, *(abs(a - b) for a, b in zip(expected, actual)))
+        print(f"  largest difference from textstat: {worst}")
+        results.append(("Scores match textstat on the reference corpus", worst <= TOLERANCE))
+    else:
+        print("  textstat not installed, skipping the comparison")
+
+    results.append(("Empty text", readability.readability_scores("") == (206.84, -15.7)))
+    results.append(("Short sentences are not counted",
+                    readability.text_counts("Yes. No. The council met today.")[1] == 1))
+    results.append(("Wrappers agree", (readability.flesch_reading_ease(FAKE_NEWS_EXAMPLES[0]['text']),
+                                       readability.flesch_kincaid_grade(FAKE_NEWS_EXAMPLES[0]['text']))
+                    == readability.readability_scores(FAKE_NEWS_EXAMPLES[0]['text'])))
+
+    saved = (readability.SYLLABLE_CACHE_SIZE, dict(readability._syllables))
+    try:
+        readability.SYLLABLE_CACHE_SIZE = 10
+        readability._syllables.clear()
+        words = [f"word{i}" for i in range(50)]
+        first = readability.text_counts(' '.join(words))
+        second = readability.text_counts(' '.join(words))
+        results.append(("Syllable memo stays bounded", len(readability._syllables) == 10))
+        results.append(("Counts are the same past the bound", first == second))
+        if readability._hyphenator is not None:
+            results.append(("pyphen's own cache does not grow",
+                            not any(w in readability._hyphenator.hd.cache for w in words)))
+    finally:
+        readability.SYLLABLE_CACHE_SIZE = saved[0]
+        readability._syllables.clear()
+        readability._syllables.update(saved[1])
+
+    results.append(("Fallback syllable estimate", [readability._estimate_syllables(w) for w in
+                                                   ('the', 'make', 'table', 'reading', 'rhythm')] == [1, 1, 2, 2, 1]))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
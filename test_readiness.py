@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Readiness test - /ready must report 503 until the warm-up inference is done
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+
+def main():
+    print("=" * 70)
+    print("READINESS TEST")
+    print("=" * 70)
+
+    client = app.app.test_client()
+    results = []
+
+    response = client.get('/ready')
+    results.append(("Not ready before warm-up", response.status_code == 503 and not response.get_json()['ready']))
+
+    app.start_warm_up().join(timeout=120)
+
+    response = client.get('/ready')
+    results.append(("Ready after warm-up", response.status_code == 200 and response.get_json()['ready']))
+
+    # Warm-up is idempotent
+    results.append(("Second warm-up is a no-op", app.warm_up_models() is True))
+
+    # Warm-up must not leave an entry in the result cache
+    key = app.result_cache_key(app.WARM_UP_TEXT)
+    results.append(("Warm-up bypasses result cache", not app.RESULT_CACHE.contains(key)))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
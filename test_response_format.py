@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Response shaping test - field selection, skipped explanation/details,
+JSON encoders and Accept-Encoding negotiation
+"""
+
+import sys
+import os
+import gzip
+import json
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+import response_format
+from response_format import parse_fields, select_fields, negotiate_encoding
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES
+
+def main():
+    print("=" * 70)
+    print("RESPONSE SHAPING TEST")
+    print("=" * 70)
+    results = []
+    client = app.app.test_client()
+    example = FAKE_NEWS_EXAMPLES[0]
+
+    results.append(("verbose=false is result and confidence", parse_fields(verbose='false') == ('result', 'confidence')))
+    results.append(("No options is the full result", parse_fields() is None and parse_fields(verbose=True) is None))
+    results.append(("Field list parsing", parse_fields('result, details.sentiment') == ('result', 'details.sentiment')
+                    and parse_fields(['confidence']) == ('confidence',)))
+    for bad in ('nonsense', 'details.', 'result.x'):
+        try:
+            parse_fields(bad)
+            results.append((f"Unknown field {bad!r} rejected", False))
+        except ValueError:
+            results.append((f"Unknown field {bad!r} rejected", True))
+
+    full_result = {'result': 'Fake', 'confidence': 80.0, 'details': {'a': 1, 'b': 2}}
+    results.append(("Selecting detail keys", select_fields(full_result, ('result', 'details.b', 'details.c'))
+                    == {'result': 'Fake', 'details': {'b': 2}}))
+    results.append(("Whole details win over detail keys",
+                    select_fields(full_result, ('details.a', 'details')) == {'details': {'a': 1, 'b': 2}}))
+    results.append(("Errors pass through", select_fields({'error': 'x'}, ('result',)) == {'error': 'x'}))
+
+    # Compact responses skip the explanation and details
+    calls = []
+    real_explanation = app.generate_explanation
+    app.generate_explanation = lambda *args: calls.append(1) or real_explanation(*args)
+    try:
+        app.RESULT_CACHE.clear()
+        full = client.post('/predict', json=example).get_json()
+        app.RESULT_CACHE.clear()
+        calls.clear()
+        compact = client.post('/predict?verbose=false', json=example).get_json()
+        results.append(("Compact response has only result and confidence",
+                        compact == {'result': full['result'], 'confidence': full['confidence']}))
+        results.append(("Compact response skips the explanation", not calls))
+
+        selected = client.post('/predict', json=dict(example, fields='result,details.final_score')).get_json()
+        results.append(("Fields in the JSON body", selected == {
+            'result': full['result'], 'details': {'final_score': full['details']['final_score']}}))
+
+        # A cached compact result must not answer a full request, and a cached full one answers compact ones
+        again = client.post('/predict', json=example).get_json()
+        results.append(("Full request after a compact one is complete", again == full))
+        calls.clear()
+        client.post('/predict?fields=result,explanation', json=example)
+        results.append(("Partial request served from the cached full result", not calls))
+    finally:
+        app.generate_explanation = real_explanation
+
+    response = client.post('/predict?fields=bogus', json=example)
+    results.append(("Bad fields give 400", response.status_code == 400 and 'Unknown field' in response.get_json()['error']))
+
+    items = [{'text': e['text'], 'url': e['url']} for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES] + [{'url': 'x'}]
+    batch = client.post('/predict_batch', json={'items': items, 'verbose': False}).get_json()
+    results.append(("Compact batch", all(set(r) == {'result', 'confidence'} for r in batch['results'][:-1])
+                    and 'error' in batch['results'][-1]))
+
+    # Encoders
+    payload = client.post('/predict', json=example).get_json()
+    results.append(("Fast encoder output is the same JSON", json.loads(response_format.dumps(payload)) == payload))
+    saved = app.JSON_ENCODER
+    try:
+        app.JSON_ENCODER = 'stdlib'
+        stdlib = client.post('/predict', json=example).get_json()
+    finally:
+        app.JSON_ENCODER = saved
+    results.append(("stdlib encoder gives the same response", stdlib == payload))
+
+    # Compression
+    results.append(("gzip negotiated", negotiate_encoding('gzip, deflate') == 'gzip'))
+    results.append(("q=0 refuses a coding", negotiate_encoding('gzip;q=0, identity') is None))
+    results.append(("Wildcard accepted", negotiate_encoding('*') in ('br', 'gzip')))
+    results.append(("No header, no compression", negotiate_encoding(None) is None))
+    results.append(("br only with brotli installed",
+                    (negotiate_encoding('br') == 'br') == (response_format.brotli is not None)))
+
+    response = client.post('/predict', json=example, headers={'Accept-Encoding': 'gzip'})
+    results.append(("Full response gzipped", response.headers.get('Content-Encoding') == 'gzip'
+                    and json.loads(gzip.decompress(response.get_data())) == payload
+                    and 'Accept-Encoding' in response.headers.get('Vary', '')))
+    response = client.post('/predict?verbose=false', json=example, headers={'Accept-Encoding': 'gzip'})
+    results.append(("Small response sent as is", 'Content-Encoding' not in response.headers
+                    and set(response.get_json()) == {'result', 'confidence'}))
+    response = client.post('/predict', json=example)
+    results.append(("Identity without Accept-Encoding", 'Content-Encoding' not in response.headers
+                    and response.get_json() == payload))
+
+    app.RESULT_CACHE.clear()
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Result cache test - LRU eviction, TTL expiry, hit/miss counters and
+automatic invalidation when the rules change
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from result_cache import ResultCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def main():
+    print("=" * 70)
+    print("RESULT CACHE TEST")
+    print("=" * 70)
+
+    results = []
+
+    # 1. LRU eviction keeps the most recently used entries
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    results.append(("LRU evicts least recently used", cache.get('b') is None and cache.get('a') == 1))
+
+    # 2. TTL expiry
+    clock = FakeClock()
+    cache = ResultCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.put('a', {'x': 1})
+    clock.now = 4.9
+    fresh = cache.get('a') == {'x': 1}
+    clock.now = 5.0
+    results.append(("Entries expire after TTL", fresh and cache.get('a') is None))
+
+    # 3. Cached values are copies
+    cache.put('d', {'x': [1]})
+    cache.get('d')['x'].append(2)
+    results.append(("Returned values are copies", cache.get('d') == {'x': [1]}))
+
+    # 4. detect_fake_news hits the cache on repeated submissions
+    app.RESULT_CACHE.clear()
+    text = "SHOCKING: Lose 50 pounds in 3 days! Doctors HATE this one weird trick!"
+    hits_before = app.RESULT_CACHE.hits
+    first = app.detect_fake_news(text, "https://example.com")
+    second = app.detect_fake_news(text, "https://example.com")
+    results.append(("Repeat submission is a hit", app.RESULT_CACHE.hits == hits_before + 1 and first == second))
+
+    # 5. URL is part of the key
+    other = app.result_cache_key(text, "https://example.org")
+    results.append(("URL changes the key", other != app.result_cache_key(text, "https://example.com")))
+
+    # 6. Rule-list changes invalidate cached results and reach the verdict
+    old_version = app.rules_version()
+    keyword_count = first['details']['keyword_count']
+    app.FAKE_NEWS_KEYWORDS.append('lose 50 pounds')
+    app.bump_rules()
+    try:
+        changed = app.rules_version() != old_version
+        hits_before = app.RESULT_CACHE.hits
+        result = app.detect_fake_news(text, "https://example.com")
+        results.append(("Rule change invalidates entries",
+                        changed and app.RESULT_CACHE.hits == hits_before))
+        results.append(("Added keyword is matched", result['details']['keyword_count'] == keyword_count + 1))
+    finally:
+        app.FAKE_NEWS_KEYWORDS.pop()
+        app.bump_rules()
+
+    # Same-length edit in place: the content hash still sees it
+    old_version = app.rules_version()
+    saved_keyword, app.FAKE_NEWS_KEYWORDS[0] = app.FAKE_NEWS_KEYWORDS[0], 'lose 50 pounds'
+    app.bump_rules()
+    try:
+        changed = app.rules_version() != old_version
+        result = app.detect_fake_news(text, "https://example.com")
+        results.append(("In-place edit changes the version and the verdict",
+                        changed and result['details']['keyword_count'] == keyword_count + 1))
+    finally:
+        app.FAKE_NEWS_KEYWORDS[0] = saved_keyword
+        app.bump_rules()
+    results.append(("Restored lists give the old verdict",
+                    app.rules_version() == old_version and app.detect_fake_news(text, "https://example.com") == first))
+
+    # Requests only read the snapshot: the lists are not rescanned while unchanged
+    scans = []
+    saved_lists, saved_build = app._rule_lists, app.build_rules
+    app._rule_lists = lambda: scans.append('lists') or saved_lists()
+    app.build_rules = lambda lists: scans.append('build') or saved_build(lists)
+    try:
+        rules = app.current_rules()
+        app.RESULT_CACHE.clear()
+        app.detect_fake_news(text, "https://example.org")
+        app.app.test_client().get('/health')
+        same = all(app.current_rules() is rules for _ in range(1000))
+    finally:
+        app._rule_lists, app.build_rules = saved_lists, saved_build
+    results.append(("Unchanged rules are not rescanned per request", same and not scans))
+
+    # 7. Counters surfaced through /health
+    health = app.app.test_client().get('/health').get_json()
+    results.append(("/health reports cache stats", health['cache']['hits'] == app.RESULT_CACHE.hits))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Rule-only mode test - RULE_ONLY=1 must never import the heavy ML
+libraries, and must score exactly like the rule-based fallback
+"""
+
+import sys
+import os
+import json
+import subprocess
+sys.path.insert(0, os.path.dirname(__file__))
+
+CHILD = """
+import json, sys
+sys.path.insert(0, {root!r})
+HEAVY = ('torch', 'transformers', 'nltk', 'textstat', 'pyphen')
+import app
+loaded_on_import = [m for m in HEAVY if m in sys.modules]
+result = app.detect_fake_news({text!r}, 'https://www.bbc.com/news')
+print(json.dumps({{
+    'ml_available': app.ML_AVAILABLE,
+    'loaded_on_import': loaded_on_import,
+    'loaded': [m for m in HEAVY if m in sys.modules],
+    'result': result,
+}}))
+"""
+
+TEXT = ("The city council approved a new environmental protection law yesterday. "
+        "The measure received support from 256 lawmakers while 89 voted against it.")
+
+def run(rule_only):
+    env = dict(os.environ)
+    env.pop('RULE_ONLY', None)
+    if rule_only:
+        env['RULE_ONLY'] = '1'
+    code = CHILD.format(root=os.path.dirname(os.path.abspath(__file__)), text=TEXT)
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    print("=" * 70)
+    print("RULE-ONLY MODE TEST")
+    print("=" * 70)
+
+    results = []
+    rule_only = run(rule_only=True)
+    results.append(("ML disabled", rule_only['ml_available'] is False))
+    results.append(("No heavy module imported", rule_only['loaded'] == []))
+    results.append(("Detection works", rule_only['result']['result'] == 'Real'))
+
+    default = run(rule_only=False)
+    results.append(("Import alone loads nothing heavy",
+                    default['loaded_on_import'] == []))
+    if not default['ml_available']:
+        # Without ML libraries both modes take the same rule-based path
+        results.append(("Same scores as rule-based fallback", default['result'] == rule_only['result']))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
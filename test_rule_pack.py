@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Rule pack test - a compiled, memory-mapped pack gives the same phrase hits,
+domain lookups and verdicts as the built-in lists, and the service swaps
+to a new pack on a file change or signal without failing the requests
+that are running
+"""
+
+import sys
+import os
+import time
+import signal
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+import rule_pack
+from rule_pack import RulePack, FileWatcher, compile_rules, read_rule_source, write_rule_source, write_pack
+from domain_index import DomainIndex
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+HOSTS = ['bbc.com', 'news.bbc.com', 'www.reuters.com', 'cheap.org', 'ap.org', 'fake-news.com',
+         'x.hoax-site.com', 'example.com', 'pubmed.ncbi.nlm.nih.gov', 'a.b.nih.gov', 'gov.uk', 'uk', '']
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+def main():
+    print("=" * 70)
+    print("RULE PACK TEST")
+    print("=" * 70)
+
+    results = []
+    tmp = tempfile.mkdtemp()
+    texts = [e['text'] for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES]
+
+    # 1. Export -> source -> compile round-trips the built-in lists
+    builtin = dict(zip(rule_pack.SECTIONS, app._rule_lists()))
+    source = os.path.join(tmp, 'rules.txt')
+    write_rule_source(builtin, source)
+    lists = read_rule_source(source)
+    results.append(("Source file round-trips the built-in lists", lists == builtin))
+
+    path = os.path.join(tmp, 'rules.pack')
+    write_pack(compile_rules(lists, 'builtin'), path)
+    started = time.perf_counter()
+    pack = RulePack.open(path)
+    open_ms = (time.perf_counter() - started) * 1000
+    results.append((f"Pack maps without building anything ({open_ms:.2f} ms)", open_ms < 20))
+    results.append(("Lists read from the pack", all(list(pack.lists[s]) == builtin[s] for s in rule_pack.SECTIONS)))
+
+    # 2. Same phrase hits and domain lookups as the in-memory structures
+    results.append(("Same phrase hits as PhraseMatcher", all(
+        pack.matcher.scan(t.lower()) == app.current_rules().matcher.scan(t.lower()) for t in texts + ["ushers", ""])))
+    hostile = ''.join(chr(c) + 'e ' for c in range(0x4e00, 0x4e00 + 20000))
+    pack.matcher.scan(hostile)
+    memo = sum(len(row) for row in pack.matcher._rows if row)
+    pack.matcher.scan(''.join(chr(c) + 'e ' for c in range(0xac00, 0xac00 + 20000)))
+    bound = len(pack.matcher._rows) * len(pack.matcher._alphabet)
+    results.append((f"Memo bounded by the pack ({memo} entries, at most {bound})", memo <= bound and
+                    sum(len(row) for row in pack.matcher._rows if row) == memo and
+                    pack.matcher.scan('\u4e00shocking truth\u4e00') == app.current_rules().matcher.scan(
+                        '\u4e00shocking truth\u4e00')))
+    trusted, untrusted = DomainIndex(builtin['trusted']), DomainIndex(builtin['untrusted'])
+    results.append(("Same domain lookups as DomainIndex", all(
+        pack.trusted.lookup(h) == trusted.lookup(h) and pack.untrusted.lookup(h) == untrusted.lookup(h)
+        for h in HOSTS)))
+
+    # 3. Source files: comments, @file includes, errors
+    with open(os.path.join(tmp, 'more-trusted.txt'), 'w') as f:
+        f.write("# big list\nlocal-paper.example,42\n0.0.0.0 other-paper.example\n")
+    custom = os.path.join(tmp, 'custom.txt')
+    with open(custom, 'w') as f:
+        f.write("# custom pack\n[keyword]\nMiracle Cure\nlizard people\n\n[trusted]\n@file more-trusted.txt\n"
+                "[untrusted]\nbad.example\n[suspicious_domain]\nprize\n")
+    lists = read_rule_source(custom)
+    results.append(("Comments, lowercasing and @file includes", lists['keyword'] == ['miracle cure', 'lizard people']
+                    and lists['trusted'] == ['local-paper.example', 'other-paper.example']))
+    with open(os.path.join(tmp, 'bad.txt'), 'w') as f:
+        f.write("[keywords]\nfoo\n")
+    try:
+        read_rule_source(os.path.join(tmp, 'bad.txt'))
+        rejected = False
+    except ValueError:
+        rejected = True
+    results.append(("Unknown section rejected", rejected))
+
+    with open(os.path.join(tmp, 'broken.pack'), 'wb') as f:
+        f.write(compile_rules(lists)[:-8])
+    try:
+        RulePack.open(os.path.join(tmp, 'broken.pack'))
+        rejected = False
+    except ValueError:
+        rejected = True
+    results.append(("Truncated pack rejected", rejected))
+
+    # 4. The service swaps packs, keeping running requests on the old one
+    text = "Researchers say lizard people run the council, in a report published on Tuesday."
+    saved = (app._active_rules, app.RULE_PACK_PATH, app._rule_pack_watch)
+    try:
+        app.RESULT_CACHE.clear()
+        before = app.detect_fake_news(text, 'https://local-paper.example/story')
+        version = app.rules_version()
+        old_rules = app.current_rules()
+        old_features = app.get_text_features(text, old_rules)
+
+        app.RULE_PACK_PATH = path
+        write_pack(compile_rules(read_rule_source(custom), 'custom'), path)
+        results.append(("Reload swaps in the new pack", app.reload_rule_pack() and app.current_rules().pack.name == 'custom'))
+        after = app.detect_fake_news(text, 'https://local-paper.example/story')
+        results.append(("New rules used right away", (before['details']['keyword_count'],
+                        before['details']['source_reliability'], after['details']['keyword_count'],
+                        after['details']['source_reliability']) == (0, 'medium', 1, 'high')))
+        results.append(("New pack gets a new cache version", app.rules_version() != version))
+        results.append(("Running request keeps the old matcher", old_features.phrase_hits['keyword'] == []))
+        held = app.detect_fake_news(text, 'https://local-paper.example/story', rules=old_rules)
+        results.append(("Request holding the old rules scores and caches under them",
+                        held == before and app.RESULT_CACHE.contains(
+                            app.result_cache_key(text, 'https://local-paper.example/story', rules=old_rules))))
+        results.append(("Built-in lists left untouched by the pack", app.FAKE_NEWS_KEYWORDS == builtin['keyword']))
+
+        with open(path, 'wb') as f:
+            f.write(b'not a rule pack')
+        results.append(("Bad pack leaves the current rules in place",
+                        not app.reload_rule_pack() and app.current_rules().pack.name == 'custom'))
+
+        # Requests keep succeeding while packs are swapped under them, and
+        # each one sees a single pack (never the new matcher with the old indexes)
+        errors, mixed, stop = [], [], threading.Event()
+        consistent = {(0, 'medium'), (1, 'high')}
+
+        def traffic():
+            while not stop.is_set():
+                try:
+                    app.RESULT_CACHE.clear()
+                    for t in texts[:5]:
+                        app.detect_fake_news(t, 'https://bbc.com/news')
+                    details = app.detect_fake_news(text, 'https://local-paper.example/story')['details']
+                    if (details['keyword_count'], details['source_reliability']) not in consistent:
+                        mixed.append(details)
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=traffic) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for n in range(20):
+            write_pack(compile_rules(builtin if n % 2 else read_rule_source(custom), f'pack-{n}'), path)
+            app.reload_rule_pack()
+        stop.set()
+        for t in threads:
+            t.join()
+        results.append((f"No failed requests across 20 swaps ({len(errors)} errors)", not errors))
+        results.append((f"No request mixed two packs ({len(mixed)} mixed)", not mixed))
+
+        # File watcher and signal
+        changes = []
+        watcher = FileWatcher(path, changes.append, interval=0.02).start()
+        write_pack(compile_rules(builtin, 'watched'), path)
+        results.append(("Watcher sees the replaced file", wait_for(lambda: changes == [path])))
+        watcher.stop()
+
+        app._rule_pack_watch = (None, None)
+        saved_interval, app.RULE_PACK_WATCH_SECONDS = app.RULE_PACK_WATCH_SECONDS, 0
+        saved_handler = signal.getsignal(signal.SIGHUP)
+        try:
+            app.watch_rule_pack()
+            write_pack(compile_rules(read_rule_source(custom), 'signalled'), path)
+            os.kill(os.getpid(), signal.SIGHUP)
+            results.append(("SIGHUP reloads the pack", wait_for(lambda: app.current_rules().pack.name == 'signalled')))
+        finally:
+            signal.signal(signal.SIGHUP, saved_handler)
+            app.RULE_PACK_WATCH_SECONDS = saved_interval
+
+        health = app.app.test_client().get('/health').get_json()
+        results.append(("Pack info on /health", health['rule_pack']['name'] == 'signalled'))
+        metrics = app.app.test_client().get('/metrics').get_data(as_text=True)
+        results.append(("Loads counted in /metrics", 'fakenews_rule_pack_loads_total{outcome="error"} 1' in metrics))
+    finally:
+        (app._active_rules, app.RULE_PACK_PATH, app._rule_pack_watch) = saved
+        app.RESULT_CACHE.clear()
+
+    print()
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'} {name}")
+
+    passed = sum(1 for _, p in results if p)
+    print()
+    print(f"TOTAL: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Sentiment engine test - the precompiled engine must give the same scores
+as nltk's VADER analyzer, alone, in batches and inside the pipeline
+(a generated lexicon stands in when the VADER lexicon is not downloaded)
+"""
+
+import sys
+import os
+import json
+import random
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from sentiment import SentimentEngine, compile_lexicon, BOOSTER_DICT, NEGATE, SPECIAL_CASE_IDIOMS, NLTK_LEXICON
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+try:
+    import nltk.data
+    from nltk.sentiment import SentimentIntensityAnalyzer
+except ImportError:
+    SentimentIntensityAnalyzer = None
+
+EXAMPLES = FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+
+def lexicons():
+    """(name, lexicon file for nltk) pairs: the real VADER lexicon if present, and a generated one"""
+    found = []
+    try:
+        nltk.data.find(NLTK_LEXICON)
+        found.append(('VADER lexicon', NLTK_LEXICON))
+    except LookupError:
+        pass
+    rng = random.Random(19)
+    vocab = sorted({w.strip('.,!?"\'').lower() for e in EXAMPLES for w in e['text'].split()} - {''})
+    lexicon = {w: round(rng.uniform(-3.5, 3.5), 1) for w in vocab if rng.random() < 0.4}
+    lexicon.update({'good': 1.9, 'bad': -2.5, 'least': -0.5, 'shit': -2.6, 'bomb': -2.2, 'death': -2.9,
+                    'right': 0.4, 'at': 0.0, ':)': 2.0, ':(': -1.9})
+    path = os.path.join(tempfile.mkdtemp(), 'lexicon.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(f"{word}\t{value}\t0.5\t[1]" for word, value in lexicon.items()))
+    found.append(('generated lexicon', 'file:' + path))
+    return found, vocab
+
+def corpus(vocab):
+    texts = [e['text'] for e in EXAMPLES]
+    texts += ["", "!!!", "GOOD news but BAD timing!!", "This is not good. It is the least bad option.",
+              "It was kind of good, sort of bad, never so good :) :(", "The bomb was the shit, yeah right??",
+              "It's at least good. Very least bad. I can't say it's good; isn't it?"]
+    # Shuffled corpus words mixed with every rule's trigger words
+    pool = vocab + list(BOOSTER_DICT) + list(NEGATE) + list(SPECIAL_CASE_IDIOMS) + [
+        'but', 'BUT', 'kind', 'of', 'never', 'so', 'this', 'least', ':)', '"good"', 'good!!', 'GOOD',
+        "'bad'", 'bad?!?', 'NOT', 'VERY', '-good-', '...']
+    rng = random.Random(7)
+    texts += [' '.join(rng.choice(pool) for _ in range(rng.randint(1, 40))) + rng.choice(['', '!', '??', '????', '!!!!!'])
+              for _ in range(2000)]
+    return texts
+
+class CountingEngine(SentimentEngine):
+    def __init__(self, lexicon):
+        super().__init__(lexicon)
+        self.batch_calls = 0
+
+    def polarity_scores_many(self, texts, token_lists=None):
+        self.batch_calls += 1
+        return super().polarity_scores_many(texts, token_lists)
+
+def main():
+    print("=" * 70)
+    print("SENTIMENT ENGINE TEST")
+    print("=" * 70)
+    if SentimentIntensityAnalyzer is None:
+        print("nltk not installed, skipping")
+        return True
+
+    results = []
+    found, vocab = lexicons()
+    texts = corpus(vocab)
+    for name, lexicon_file in found:
+        reference = SentimentIntensityAnalyzer(lexicon_file=lexicon_file)
+        engine = SentimentEngine(compile_lexicon(nltk.data.load(lexicon_file)))
+        expected = [reference.polarity_scores(t) for t in texts]
+        single = [engine.polarity_scores(t) for t in texts]
+        tokens = [engine.polarity_scores(t, t.split()) for t in texts]
+        mismatches = [t for t, e, s in zip(texts, expected, single) if e != s]
+        for t in mismatches[:3]:
+            print(f"  mismatch: {t!r}")
+        results.append((f"Scores match nltk VADER ({name}, {len(texts)} texts)", not mismatches))
+        results.append((f"Shared tokens give the same scores ({name})", tokens == single))
+        results.append((f"Batch call gives the same scores ({name})", engine.polarity_scores_many(texts) == single))
+
+    # Inside the pipeline: one engine call per batch, same results as single requests
+    engine = CountingEngine(compile_lexicon(nltk.data.load(found[-1][1])))
+    saved = (app.ML_AVAILABLE, app.sentiment_analyzer, app.sent_tokenize, app.CASCADE_MODE)
+    try:
+        app.ML_AVAILABLE = True
+        app.sentiment_analyzer = engine
+        app.sent_tokenize = lambda text: [s for s in text.split('.') if s.strip()]
+        app.CASCADE_MODE = False
+        items = [{'text': e['text'], 'url': e['url']} for e in EXAMPLES]
+        app.RESULT_CACHE.clear()
+        single = [app._run_detection(item['text'], item['url'], None) for item in items]
+        app.RESULT_CACHE.clear()
+        batch = app.detect_fake_news_batch(items)
+        results.append(("Batch pipeline matches single requests",
+                        [json.dumps(r, sort_keys=True) for r in batch] == [json.dumps(r, sort_keys=True) for r in single]))
+        results.append(("Batch sentiment is one engine call", engine.batch_calls == 1))
+        results.append(("Pipeline reports engine scores", all(
+            r['details']['sentiment'] == engine.polarity_scores(item['text']) for r, item in zip(batch, items))))
+    finally:
+        (app.ML_AVAILABLE, app.sentiment_analyzer, app.sent_tokenize, app.CASCADE_MODE) = saved
+        app.RESULT_CACHE.clear()
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Text features test - stages reading shared TextFeatures must give exactly
+the scores of the original per-stage text walks
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import analyze_linguistic_patterns, get_text_features
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+def original_linguistic_patterns(text):
+    """analyze_linguistic_patterns as it was before TextFeatures (rule-only mode)"""
+    score = 0
+    details = []
+    caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+    if caps_ratio > 0.3:
+        score += 25
+        details.append("Excessive capitalization detected")
+    exclamation_count = text.count('!')
+    question_count = text.count('?')
+    if exclamation_count > 3:
+        score += 20
+        details.append(f"Excessive exclamation marks ({exclamation_count})")
+    if question_count > 5:
+        score += 15
+        details.append(f"Excessive question marks ({question_count})")
+    word_count = len(text.split())
+    sentence_count = text.count('.') + 1
+    if word_count < 10:
+        score += 15
+        details.append("Text too short for reliable analysis")
+    elif word_count < 50 and sentence_count < 3:
+        score += 10
+        details.append("Insufficient content depth")
+    if text.count('.') < word_count / 20 and word_count > 20:
+        score += 10
+        details.append("Poor punctuation structure")
+    words = text.lower().split()
+    if len(words) > 0:
+        word_freq = {}
+        for word in words:
+            if len(word) > 3:
+                word_freq[word] = word_freq.get(word, 0) + 1
+        max_repeat = max(word_freq.values()) if word_freq else 0
+        repeat_percentage = (max_repeat / len(words)) * 100
+        if max_repeat > len(words) * 0.15:
+            score += 25
+            details.append(f"Excessive word repetition detected ({repeat_percentage:.1f}%)")
+        elif max_repeat > len(words) * 0.08:
+            score += 15
+            details.append(f"Moderate word repetition detected ({repeat_percentage:.1f}%)")
+    return min(score, 100), details
+
+def main():
+    print("=" * 70)
+    print("TEXT FEATURES TEST")
+    print("=" * 70)
+
+    texts = [e['text'] for e in FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES]
+    texts += [
+        "Click click click now now now! Free free free! Buy buy buy!",
+        "What? Why? How? When? Where? Who? Really?",
+        "Short one. Two. Three. " * 5,
+        "word " * 300,
+    ]
+
+    results = []
+
+    same = all(analyze_linguistic_patterns(t) == original_linguistic_patterns(t) for t in texts)
+    results.append(("Linguistic scores unchanged", same))
+
+    features = get_text_features("Hello WORLD! Is this real? Yes. Yes.")
+    counts = (features.upper_count, features.exclamation_count, features.question_count,
+              features.period_count, features.word_count)
+    results.append(("Character-class counts", counts == (9, 1, 1, 2, 7)))
+    results.append(("Word frequencies skip short words", dict(features.word_frequencies) == {
+        'hello': 1, 'world!': 1, 'this': 1, 'real?': 1, 'yes.': 2}))
+
+    # Values are computed once and reused
+    results.append(("Lowered text computed once", features.text_lower is features.text_lower))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
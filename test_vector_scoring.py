@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Vectorized scoring test - batch scoring must give exactly the scalar
+path's scores, verdicts and confidences (same values and same int/float
+types, so the JSON is byte-identical)
+"""
+
+import sys
+import os
+import json
+import random
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    import numpy
+    from vector_scoring import feature_row, score_rows
+    DEPS_AVAILABLE = True
+except ImportError as e:
+    print(f"Skipping vectorized scoring test: {e}")
+    DEPS_AVAILABLE = False
+
+import app
+from test_examples import FAKE_NEWS_EXAMPLES, REAL_NEWS_EXAMPLES, DOUBTFUL_NEWS_EXAMPLES
+
+def scalar(row_args):
+    keyword_count, pattern_score, source_level, sentiment, readability, ml_result, fact_check, similarity = row_args
+    fake_score = app.compute_fake_score(
+        keyword_count, pattern_score, source_level,
+        app.sentiment_points(sentiment, keyword_count) if sentiment is not None else 0,
+        app.readability_points(readability) if readability is not None else 0.0,
+        app.ml_points(ml_result), fact_check, similarity)
+    result, confidence = app.verdict_for_score(fake_score, source_level)
+    return fake_score, result, confidence
+
+def random_stage_outputs(rng):
+    """Stage outputs with values on and around every threshold of the rules"""
+    compound = rng.choice([-1.0, -0.81, -0.8, -0.5, -0.2, 0.0, 0.2, 0.21, 0.85, 0.86, 1.0, rng.uniform(-1, 1)])
+    ml_result = rng.choice([
+        None,
+        {'label': rng.choice(['Fake', 'Real', 'FAKE', 'LABEL_0']), 'score': rng.choice([0.6, 0.61, 0.75, 0.76, rng.random()])}
+    ])
+    similar = rng.random() < 0.4
+    return (
+        rng.choice([0, 1, 2, 3, 4, 5, 6, 8, 12]),
+        rng.choice([0, 5, 10, 15, 20, 25, 30, 45, 60, 70, 100]),
+        rng.choice(['low', 'medium', 'high']),
+        None if rng.random() < 0.1 else {'compound': compound},
+        None if rng.random() < 0.1 else {'suspicion_score': rng.choice([0, 3, 5])},
+        ml_result,
+        {'checked': rng.random() < 0.5, 'verdict': rng.choice(['needs_verification', None])},
+        {'similar': similar, 'confidence': rng.choice([20, 40, 80, 57.3, 100.0]) if similar else 0.0},
+    )
+
+def corpus():
+    examples = FAKE_NEWS_EXAMPLES + REAL_NEWS_EXAMPLES + DOUBTFUL_NEWS_EXAMPLES
+    items = [{'text': e['text'], 'url': e['url']} for e in examples]
+    for url in (None, 'https://www.bbc.com/news', 'https://fakenews.com/x'):
+        items.extend({'text': e['text'], 'url': url} for e in examples)
+    items.append({'text': 'too short'})
+    return items
+
+def main():
+    print("=" * 70)
+    print("VECTORIZED SCORING TEST")
+    print("=" * 70)
+    if not DEPS_AVAILABLE:
+        return True
+
+    results = []
+    rng = random.Random(17)
+    cases = [random_stage_outputs(rng) for _ in range(20000)]
+    expected = [scalar(c) for c in cases]
+    vectorized = score_rows([feature_row(*c) for c in cases])
+    mismatches = [(c, e, v) for c, e, v in zip(cases, expected, vectorized) if repr(e) != repr(v)]
+    for case, e, v in mismatches[:3]:
+        print(f"  mismatch: {case} scalar={e!r} vector={v!r}")
+    results.append(("20,000 random feature rows match the scalar rules", not mismatches))
+    results.append(("Empty batch", score_rows([]) == []))
+
+    # Whole pipeline: batch endpoint against one-at-a-time scoring, byte for byte
+    items = corpus()
+    app.RESULT_CACHE.clear()
+    single = [app._run_detection(item['text'], item.get('url'), app._ML_NOT_RUN) for item in items]
+    app.RESULT_CACHE.clear()
+    batch = app.detect_fake_news_batch(items)
+    results.append(("Batch results byte-identical to the scalar path",
+                    [json.dumps(r, sort_keys=True) for r in batch] == [json.dumps(r, sort_keys=True) for r in single]))
+
+    cached = app.detect_fake_news_batch(items)
+    results.append(("Cached batch returns the same results", cached == batch))
+
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nTOTAL: {passed_count}/{len(results)} tests passed")
+    return passed_count == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
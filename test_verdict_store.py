@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Verdict store test - results persist in SQLite across store instances and
+processes, writes are batched off the caller's thread, old entries are
+evicted past the size limit, and detect_fake_news reads the store before
+running any analysis stage
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from result_cache import ResultCache
+from verdict_store import VerdictStore
+
+def main():
+    print("=" * 70)
+    print("VERDICT STORE TEST")
+    print("=" * 70)
+
+    results = []
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, 'verdicts.db')
+
+    # 1. Writes are queued, committed in batches and readable by other instances
+    store = VerdictStore(path, flush_interval=0.05)
+    value = {'result': 'Fake', 'confidence': 87.25, 'details': {'keyword_count': 3, 'sentiment': None}}
+    store.put('k1', 'v1', value)
+    results.append(("Writes are queued, not made by the caller", store.written == 0))
+    store.flush()
+    results.append(("Stored result round-trips", store.get('k1') == value))
+    other = VerdictStore(path)
+    results.append(("Shared with another store on the same file", other.get('k1') == value))
+
+    # 2. Another process (a forked worker) sees the same entries
+    pid = os.fork()
+    if pid == 0:
+        child = VerdictStore(path, flush_interval=0.01)
+        child.put('from-child', 'v1', {'result': 'Real'})
+        child.flush()
+        os._exit(0 if child.get('k1') == value else 1)
+    _, status = os.waitpid(pid, 0)
+    results.append(("Shared across processes", status == 0 and store.get('from-child') == {'result': 'Real'}))
+
+    # 3. Size-based eviction keeps the newest entries
+    small = VerdictStore(os.path.join(tmp, 'small.db'), max_entries=10, flush_interval=0.01, batch_size=4)
+    for n in range(25):
+        small.put(f'k{n}', 'v1', {'n': n})
+    small.flush()
+    results.append(("Evicted down to the size limit", len(small) <= 10 and small.evicted >= 15))
+    results.append(("Newest entries kept", small.get('k24') == {'n': 24} and small.get('k0') is None))
+
+    # 4. Warm-load takes the newest entries of one version
+    small.put('old-version', 'v0', {'n': -1})
+    small.flush()
+    cache = ResultCache(max_entries=3, ttl_seconds=60)
+    loaded = small.load_into(cache, 'v1', 3)
+    results.append(("Warm-load fills the cache with the newest entries",
+                    loaded == 3 and cache.get('k24') == {'n': 24} and cache.get('old-version') is None))
+
+    # 5. Point reads are cheap
+    started = time.perf_counter()
+    for _ in range(2000):
+        store.get('k1')
+    per_read_ms = (time.perf_counter() - started) / 2000 * 1000
+    results.append((f"Point read is cheap ({per_read_ms:.3f} ms)", per_read_ms < 0.5))
+
+    # 6. detect_fake_news reads the store before any analysis stage
+    text = "SHOCKING! Doctors HATE this one weird trick! Miracle cure they don't want you to know!"
+    saved_store, saved_run = app.VERDICT_STORE, app._run_detection
+    app.VERDICT_STORE = VerdictStore(os.path.join(tmp, 'app.db'), flush_interval=0.01)
+    runs = []
+
+    def counting_run(*args, **kwargs):
+        runs.append(args[0])
+        return saved_run(*args, **kwargs)
+
+    app._run_detection = counting_run
+    try:
+        app.RESULT_CACHE.clear()
+        first = app.detect_fake_news(text)
+        app.VERDICT_STORE.flush()
+        app.RESULT_CACHE.clear()  # as after a restart
+        second = app.detect_fake_news(text)
+        results.append(("Restart is served from the store", second == first and len(runs) == 1))
+
+        app.RESULT_CACHE.clear()
+        compact = app.detect_fake_news(text, fields=('result', 'confidence'))
+        results.append(("Compact request served from the stored full result",
+                        compact == {'result': first['result'], 'confidence': first['confidence']} and len(runs) == 1))
+
+        app.RESULT_CACHE.clear()
+        batch = app.detect_fake_news_batch([{'text': text}, {'text': 'The council approved the budget on Tuesday.'}])
+        app.VERDICT_STORE.flush()
+        results.append(("Batch reads and fills the store", batch[0] == first and len(runs) == 1
+                        and app.VERDICT_STORE.written >= 2))
+
+        app.RESULT_CACHE.clear()
+        loaded = app.warm_load_verdicts()
+        results.append(("Warm-load at startup", loaded >= 2 and app.RESULT_CACHE.contains(app.result_cache_key(text))))
+
+        client = app.app.test_client()
+        health = client.get('/health').get_json()
+        results.append(("Store stats on /health", health['verdict_store']['written'] >= 2))
+    finally:
+        app.VERDICT_STORE, app._run_detection = saved_store, saved_run
+        app.RESULT_CACHE.clear()
+
+    print()
+    for name, passed in results:
+        print(f"{'[PASS]' if passed else '[FAIL]'} {name}")
+
+    passed = sum(1 for _, p in results if p)
+    print()
+    print(f"TOTAL: {passed}/{len(results)} tests passed")
+    return passed == len(results)
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
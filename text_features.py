@@ -0,0 +1,81 @@
+# ====================================================
+# SHARED TEXT FEATURES
+# ====================================================
+# Everything the analysis stages derive from the raw
+# text, computed once per request and shared between
+# stages instead of re-lowering / re-splitting the text
+# in each one.
+# ====================================================
+
+from collections import Counter
+from functools import cached_property
+
+
+class TextFeatures:
+    """Per-request view of the text
+
+    Attributes are computed on first access and then reused, so a stage
+    that never needs (say) sentence splitting does not pay for it.
+    sentence_splitter: callable like nltk's sent_tokenize; without one the
+    text is split on '.' (the rule-only fallback).
+    matcher: PhraseMatcher used for phrase_hits.
+    """
+
+    def __init__(self, text, sentence_splitter=None, matcher=None):
+        self.text = text
+        self._sentence_splitter = sentence_splitter
+        self._matcher = matcher
+
+    @cached_property
+    def text_lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self):
+        """Whitespace tokens of the original text"""
+        return self.text.split()
+
+    @cached_property
+    def words_lower(self):
+        """Whitespace tokens of the lowered text"""
+        return self.text_lower.split()
+
+    @property
+    def word_count(self):
+        return len(self.tokens)
+
+    @cached_property
+    def sentences(self):
+        if self._sentence_splitter is not None:
+            return self._sentence_splitter(self.text)
+        return self.text.split('.')
+
+    @property
+    def sentence_count(self):
+        return len(self.sentences)
+
+    @cached_property
+    def upper_count(self):
+        return sum(1 for c in self.text if c.isupper())
+
+    @cached_property
+    def exclamation_count(self):
+        return self.text.count('!')
+
+    @cached_property
+    def question_count(self):
+        return self.text.count('?')
+
+    @cached_property
+    def period_count(self):
+        return self.text.count('.')
+
+    @cached_property
+    def word_frequencies(self):
+        """Counts of lowered words longer than 3 characters"""
+        return Counter(word for word in self.words_lower if len(word) > 3)
+
+    @cached_property
+    def phrase_hits(self):
+        """Rule phrases found in the text, grouped by category"""
+        return self._matcher.scan(self.text_lower)
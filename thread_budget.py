@@ -0,0 +1,55 @@
+# ====================================================
+# CPU THREAD BUDGET
+# ====================================================
+# Every torch, BLAS and tokenizers thread pool sizes
+# itself to all cores by default, so N workers on one
+# machine run N x cores threads. The budget gives each
+# worker an equal share of the cores instead.
+#
+# ML_THREADS sets the per-worker budget directly;
+# otherwise it is cores // WEB_CONCURRENCY (unset:
+# DEFAULT_WORKERS). gunicorn.conf.py exports it before
+# the app is imported, and post_fork re-applies the
+# budget for the final worker count (-w included).
+# ====================================================
+
+import os
+
+# Gunicorn workers when WEB_CONCURRENCY is not set
+DEFAULT_WORKERS = 2
+
+# Read by OpenMP / BLAS builds and the tokenizers (Rayon) pool at import time
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                   'NUMEXPR_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'RAYON_RS_NUM_CPUS')
+
+
+def thread_budget(environ=None):
+    """Threads each worker process may use"""
+    environ = os.environ if environ is None else environ
+    if environ.get('ML_THREADS'):
+        return max(1, int(environ['ML_THREADS']))
+    workers = max(1, int(environ.get('WEB_CONCURRENCY', DEFAULT_WORKERS)))
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def apply_env_budget(threads, environ=None):
+    """
+    Cap the native thread pools through their environment variables
+    Must run before numpy, torch or tokenizers are imported; variables the
+    operator already set are left alone.
+    """
+    environ = os.environ if environ is None else environ
+    for name in THREAD_ENV_VARS:
+        environ.setdefault(name, str(threads))
+    if threads == 1:
+        environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+
+def apply_torch_budget(torch, threads):
+    """Size torch's intra-op pool (inter-op gets one thread: requests are the parallelism)"""
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before the first parallel op ran in this process
+        pass
@@ -0,0 +1,238 @@
+# ====================================================
+# PERSISTENT VERDICT STORE (SQLITE)
+# ====================================================
+# On-disk second level behind the in-memory result
+# cache: detect_fake_news results keyed by content hash
+# (which includes the model and rule-set version), in a
+# local SQLite file shared by every gunicorn worker and
+# kept across restarts.
+#
+# - Reads are one primary-key lookup on a per-thread
+#   connection; WAL mode lets them run alongside the
+#   writer (and other processes).
+# - Writes are queued and committed in batches by a
+#   background thread, never on the request path; when
+#   the queue is full, results are simply not stored.
+# - Past max_entries the oldest entries are deleted
+#   (down to 90%), so the file stays bounded.
+# - load_into() warm-loads the newest entries of the
+#   current version into the memory cache at startup.
+# ====================================================
+
+import os
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    result BLOB NOT NULL,
+    created REAL NOT NULL
+)
+"""
+
+
+def _encode(result):
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(result, separators=(',', ':')).encode('utf-8')
+
+
+def _decode(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class VerdictStore:
+    """SQLite-backed result store with batched background writes
+
+    max_entries: rows kept; older rows are deleted beyond this.
+    flush_interval: seconds a queued write may wait before it is committed.
+    max_pending: queued writes beyond this are dropped.
+    """
+
+    def __init__(self, path, max_entries=100000, flush_interval=0.2, batch_size=256, max_pending=10000,
+                 name="verdict-store"):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_interval = max(0.0, flush_interval)
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max_pending
+        self.name = name
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._queue = None
+        self._writer = None
+        self._pid = None
+
+        # Schema and WAL mode are set up once, before any worker forks
+        with sqlite3.connect(path, timeout=30) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(SCHEMA)
+        db.close()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.failed_flushes = 0
+
+    # ------------------------------------------------
+    # Connections
+    # ------------------------------------------------
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA synchronous=NORMAL")  # WAL: durable up to the last checkpoint
+        return db
+
+    def _reader(self):
+        # One connection per thread and process (connections must not cross a fork)
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.db = self._connect()
+            local.pid = os.getpid()
+        return local.db
+
+    # ------------------------------------------------
+    # Reads
+    # ------------------------------------------------
+
+    def get(self, key):
+        """Stored result for the key, or None"""
+        row = self._reader().execute("SELECT result FROM verdicts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(row[0])
+
+    def load_into(self, cache, version, limit):
+        """
+        Put the newest `limit` entries of a version into a cache (oldest
+        first, so the newest end up most recently used)
+        Returns: number of entries loaded
+        """
+        if limit <= 0:
+            return 0
+        rows = self._reader().execute(
+            "SELECT key, result FROM verdicts WHERE version = ? ORDER BY rowid DESC LIMIT ?",
+            (version, limit)).fetchall()
+        for key, result in reversed(rows):
+            cache.put(key, _decode(result))
+        return len(rows)
+
+    def __len__(self):
+        return self._reader().execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    # ------------------------------------------------
+    # Writes
+    # ------------------------------------------------
+
+    def _ensure_writer(self):
+        # Threads do not survive fork: each process starts its own writer
+        if self._writer is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_pending)
+            self._pid = os.getpid()
+            self._writer = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._writer.start()
+
+    def put(self, key, version, result):
+        """Queue a result for writing (dropped when the queue is full)"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((key, version, _encode(result), time.time()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        db = self._connect()
+        work = self._queue
+        while True:
+            batch = [work.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(work.get(timeout=remaining) if remaining > 0 else work.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(db, batch)
+            for _ in batch:
+                work.task_done()
+
+    def _write(self, db, batch):
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany("INSERT OR REPLACE INTO verdicts (key, version, result, created) VALUES (?, ?, ?, ?)",
+                           batch)
+            self._evict(db)
+            db.execute("COMMIT")
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.failed_flushes += 1
+            print(f"Warning: verdict store write failed: {e}")
+            try:
+                db.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def _evict(self, db):
+        # Replaced rows get a new rowid, so rowid order is write order, and
+        # the rowid span bounds the row count without scanning the table
+        low, high = db.execute("SELECT MIN(rowid), MAX(rowid) FROM verdicts").fetchone()
+        if low is None or high - low + 1 <= self.max_entries:
+            return
+        count = db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * 0.9)
+        db.execute("DELETE FROM verdicts WHERE rowid IN (SELECT rowid FROM verdicts ORDER BY rowid LIMIT ?)",
+                   (excess,))
+        self.evicted += excess
+
+    def flush(self, timeout=None):
+        """Block until every queued write is committed (a no-op if nothing was written)"""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        if timeout is None:
+            self._queue.join()
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def clear(self):
+        self.flush()
+        db = self._reader()
+        db.execute("DELETE FROM verdicts")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'path': self.path,
+            'max_entries': self.max_entries,
+            'pending_writes': self._queue.qsize() if self._queue is not None else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'written': self.written,
+            'dropped': self.dropped,
+            'evicted': self.evicted,
+            'failed_flushes': self.failed_flushes
+        }